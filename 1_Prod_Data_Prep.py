@@ -1,81 +1,155 @@
 import pandas as pd
+import numpy as np
 import re
+import os
+import argparse
+from array import array
 
-def read_simulation_data(file_path):
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-    
-    data = {}
+from production_store import save_production_store
+from instrumentation import enable, finish, path_size, span, traced, traced_iter
+
+RUN_PATTERN = re.compile(r"SUMMARY OF RUN:\s+(.+?)\s+:")
+DATE_PATTERN = re.compile(r"^\d{2}-\w{3}-\d{4}")
+
+
+def is_date_line(line):
+    # Fast path for "DD-MON-YYYY ..." lines; the regex only confirms the rare near-misses
+    return (
+        len(line) >= 11 and line[2] == "-" and line[6] == "-"
+        and line[0].isdigit() and line[1].isdigit()
+        and DATE_PATTERN.match(line) is not None
+    )
+
+
+def iter_simulation_runs(file_path):
+    # Stream the summary file and yield (run_name, columns) one run at a time,
+    # so peak memory is one run rather than the whole file
     current_run = None
-    temp_list = []
+    dates, years, gpt_values, opt_values = [], array("i"), array("d"), array("d")
 
-    for line in lines:
-        line = line.strip()
-        
-        # Detect run name
-        if line.startswith("SUMMARY OF RUN:"):
-            match = re.search(r"SUMMARY OF RUN:\s+(.+?)\s+:", line)
-            if match:
-                if current_run and temp_list:  # Save previous run's data
-                    data[current_run] = pd.DataFrame(temp_list, columns=["Date", "Year", "GPT", "OPT"])
-                current_run = match.group(1).replace(" ", "_")  # Format run name for filenames
-                temp_list = []
-        
-        # Extract date, GPT, and OPT values
-        elif line and re.match(r"^\d{2}-\w{3}-\d{4}", line):
-            parts = line.split()
-            try:
-                date, gpt, opt = parts[0], float(parts[-2]), float(parts[-1])
-                year = int(date[-4:])  # Extract the year
-                temp_list.append([date, year, gpt, opt])
-            except ValueError:
+    def columns():
+        return {
+            "Date": dates,
+            "Year": np.frombuffer(years, dtype=np.int32).astype(int),
+            "GPT": np.frombuffer(gpt_values, dtype=np.float64),
+            "OPT": np.frombuffer(opt_values, dtype=np.float64),
+        }
+
+    with open(file_path, "r", errors="replace") as file:
+        for line in file:
+            line = line.strip()
+            if not line:
                 continue
 
-    # Save the last run's data
-    if current_run and temp_list:
-        data[current_run] = pd.DataFrame(temp_list, columns=["Date", "Year", "GPT", "OPT"])
+            # Detect run name
+            if line.startswith("SUMMARY OF RUN:"):
+                match = RUN_PATTERN.search(line)
+                if match:
+                    if current_run and dates:  # Emit previous run's data
+                        yield current_run, columns()
+                    current_run = match.group(1).replace(" ", "_")  # Format run name for filenames
+                    dates, years, gpt_values, opt_values = [], array("i"), array("d"), array("d")
 
-    return data
+            # Extract date, GPT, and OPT values
+            elif is_date_line(line):
+                parts = line.split()
+                try:
+                    date, gpt, opt = parts[0], float(parts[-2]), float(parts[-1])
+                    year = int(date[-4:])  # Extract the year
+                except ValueError:
+                    continue
+                dates.append(date)
+                years.append(year)
+                gpt_values.append(gpt)
+                opt_values.append(opt)
 
-def calculate_yearly_changes_and_save(data):
-    for run, df in data.items():
-        df["Oil"] = df["OPT"].diff()  # Compute yearly OPT change
-        df["Condensate"] = 0  # Add Condensate column with zero values
-        
-        # Extract the target year from the run name (e.g., 2027, 2029, 2032)
-        target_year = None
-        if "2027" in run:
-            target_year = 2027
-        elif "2029" in run:
-            target_year = 2029
-        elif "2032" in run:
-            target_year = 2032
+    # Emit the last run's data
+    if current_run and dates:
+        yield current_run, columns()
+
+
+def iter_simulation_frames(file_path):
+    for run, cols in iter_simulation_runs(file_path):
+        yield run, pd.DataFrame(cols, columns=["Date", "Year", "GPT", "OPT"])
+
+
+@traced(bytes_in=path_size, rows_out=lambda data: sum(len(df) for df in data.values()))
+def read_simulation_data(file_path):
+    return dict(iter_simulation_frames(file_path))
+
+
+@traced(rows_out=len)
+def calculate_yearly_changes(run, df):
+    df["Oil"] = df["OPT"].diff()  # Compute yearly OPT change
+    df["Condensate"] = 0  # Add Condensate column with zero values
         
-        # Check if run name contains "BDPRODUCERS" and has a target_year
-        if "BDPRODUCERS" in run.upper() and target_year is not None:
-            df["Gas"] = df["GPT"].diff()  # Compute yearly GPT change
-            # Set Gas to zero for years before target_year, keep calculated values for target_year+
-            df["Gas"] = df.apply(
-                lambda row: 0 if row["Year"] - 1 < target_year else row["Gas"],
-                axis=1
-            )
-        else:
-            df["Gas"] = 0  # Entire Gas column is zero if no "BDPRODUCERS" or no target_year
+    # Extract the target year from the run name (e.g., 2027, 2029, 2032)
+    target_year = None
+    if "2027" in run:
+        target_year = 2027
+    elif "2029" in run:
+        target_year = 2029
+    elif "2032" in run:
+        target_year = 2032
         
-        df.dropna(inplace=True)  # Remove NaN for first row
+    # Check if run name contains "BDPRODUCERS" and has a target_year
+    if "BDPRODUCERS" in run.upper() and target_year is not None:
+        df["Gas"] = df["GPT"].diff()  # Compute yearly GPT change
+        # Set Gas to zero for years before target_year, keep calculated values for target_year+
+        df["Gas"] = df.apply(
+            lambda row: 0 if row["Year"] - 1 < target_year else row["Gas"],
+            axis=1
+        )
+    else:
+        df["Gas"] = 0  # Entire Gas column is zero if no "BDPRODUCERS" or no target_year
         
-        # Shift years so each production change is recorded in the earlier year
-        df["Year"] = df["Year"] - 1
+    df.dropna(inplace=True)  # Remove NaN for first row
         
-        # Select relevant columns
-        final_df = df[["Year", "Oil", "Condensate", "Gas"]].reset_index(drop=True)
+    # Shift years so each production change is recorded in the earlier year
+    df["Year"] = df["Year"] - 1
         
-        # Save to Excel file
-        file_name = f"{run}.xlsx"
-        final_df.to_excel(file_name, index=False)
-        print(f"Saved {file_name}")
-
-# Provide the actual file path
-file_path = "Prod_all_cases.txt"
-simulation_data = read_simulation_data(file_path)
-calculate_yearly_changes_and_save(simulation_data)
+    # Select relevant columns
+    final_df = df[["Year", "Oil", "Condensate", "Gas"]].reset_index(drop=True)
+    return final_df
+
+
+@traced()
+def calculate_yearly_changes_and_save(data, output="excel", store_path="production_runs.parquet"):
+    # Accepts a dict of run -> DataFrame or any iterable of (run, DataFrame) pairs.
+    # output: "excel" (one .xlsx per run), "parquet" (every run in one columnar store) or "both"
+    items = data.items() if isinstance(data, dict) else data
+    store_frames = {}
+    for run, df in items:
+        final_df = calculate_yearly_changes(run, df)
+
+        if output in ("parquet", "both"):
+            store_frames[run] = final_df
+
+        if output in ("excel", "both"):
+            # Save to Excel file
+            file_name = f"{run}.xlsx"
+            with span("write_excel", rows=len(final_df)) as record:
+                final_df.to_excel(file_name, index=False)
+                record["bytes"] = os.path.getsize(file_name)
+            print(f"Saved {file_name}")
+
+    if store_frames:
+        with span("save_production_store", rows=len(store_frames)) as record:
+            save_production_store(store_frames, store_path)
+            record["bytes"] = os.path.getsize(store_path)
+        print(f"Saved {len(store_frames)} runs to {store_path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Yearly production changes from a simulator summary file")
+    parser.add_argument("file_path", nargs="?", default="Prod_all_cases.txt")
+    parser.add_argument("--output", choices=["excel", "parquet", "both"], default="excel")
+    parser.add_argument("--store", default="production_runs.parquet", help="Parquet store path")
+    parser.add_argument("--trace", metavar="DIR", help="write a stage timing trace (JSON) to this folder")
+    args = parser.parse_args()
+    if args.trace:
+        enable(args.trace)
+    # The summary file is parsed while runs are processed; each run's parse is its own span
+    frames = traced_iter("read_simulation_data", iter_simulation_frames(args.file_path), rows_out=lambda item: len(item[1]),
+                         total_bytes=os.path.getsize(args.file_path))
+    calculate_yearly_changes_and_save(frames, args.output, args.store)
+    finish("1_Prod_Data_Prep", file_path=args.file_path, output=args.output)
@@ -1,54 +1,178 @@
 import pandas as pd
+import numpy as np
 import re
 import os
-
-def extract_prt_data(file_path):
-    with open(file_path, "r", encoding="utf-8") as file:
-        lines = file.readlines()
-
-    data = []
-    opening_data = []
-
-    for i in range(len(lines) - 1):
-        # Extract Closing Connections (existing logic)
-        if "@--Message at" in lines[i] and "@ Closing connection" in lines[i + 1]:
-            days_match = re.search(r"@--Message at (\d+\.\d+) Days\s+([\d]+ \w+ \d{4})", lines[i])
-            conn_match = re.search(r"@ Closing connection \((\d+),\s*(\d+),\s*(\d+)\) in well (\S+)", lines[i + 1])
-            var_match = re.search(r"@ well (.+?) is above limit", lines[i + 2]) if i + 2 < len(lines) else None
-            limit_match = re.search(r"@ Value is ([\d\.]+), limit is ([\d\.]+)", lines[i + 3]) if i + 3 < len(lines) else None
+import mmap
+import time
+import argparse
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from array import array
+
+from workover_scheduler import cap_with_carry_forward, parameter_grid, sweep_long_frame, sweep_summary, sweep_workover_schedules
+from instrumentation import add_spans, collect, enable, enabled, finish, path_size, span, traced
+
+HEADER_MARKER = b"@--Message at"
+CLOSING_MARKER = b"@ Closing connection"
+EVENT_PATTERN = re.compile(rb"@ (?:Closing|Opening) connection")
+
+DAYS_PATTERN = re.compile(rb"@--Message at (\d+\.\d+) Days\s+([\d]+ \w+ \d{4})")
+CLOSING_PATTERN = re.compile(rb"@ Closing connection \((\d+),\s*(\d+),\s*(\d+)\) in well (\S+)")
+VARIABLE_PATTERN = re.compile(rb"@ well (.+?) is above limit")
+LIMIT_PATTERN = re.compile(rb"@ Value is ([\d\.]+), limit is ([\d\.]+)")
+OPENING_PATTERN = re.compile(rb"@ Opening connection (\d+) in well (\S+)")
+
+
+def line_end(buffer, start):
+    end = buffer.find(b"\n", start)
+    return len(buffer) if end < 0 else end
+
+
+def decode(value):
+    return value.decode("utf-8", errors="replace")
+
+
+def category_mapping(table):
+    # Interned table -> (dtype with sorted labels, code remap), so groupbys order rows as plain
+    # strings would
+    labels = [decode(key) for key in table]
+    order = sorted(range(len(labels)), key=labels.__getitem__)
+    remap = np.empty(len(labels), dtype=np.int32)
+    remap[order] = np.arange(len(labels), dtype=np.int32)
+    return pd.CategoricalDtype([labels[i] for i in order]), remap
+
+
+def categorical(codes, mapping):
+    dtype, remap = mapping
+    return pd.Categorical.from_codes(remap[np.frombuffer(codes, dtype=np.int32)], dtype=dtype)
+
+
+def constant_categorical(value, n):
+    return pd.Categorical.from_codes(np.zeros(n, dtype=np.int8), [value])
+
+
+def new_event_columns():
+    # Typed column buffers of both event types. Dates, wells and variables are interned to
+    # integer codes (table.setdefault(key, len(table)), one table per column shared by both
+    # event types) and become categoricals in event_frames.
+    return {
+        "closing": {"Days": array("d"), "Date": array("i"), "Well": array("i"), "Variable": array("i"),
+                    "Value": array("f"), "Limit": array("f")},
+        "opening": {"Days": array("d"), "Date": array("i"), "Well": array("i"), "Connection_ID": array("i")},
+        "dates": {}, "wells": {}, "variables": {},
+    }
+
+
+def scan_events(buffer, events, pos=0, final=True):
+    # The compiled event pattern scans the buffer from pos in C; each hit walks the small
+    # message-block state machine header -> event -> (closing only) variable -> limit, matching
+    # every line in place (pattern.search with pos/endpos) and appending straight into the
+    # column buffers. With final=False the buffer is the text read so far (whole lines only):
+    # the scan stops at the first closing block whose variable or limit line is not written yet
+    # and returns the offset of its header line, to resume from once more text has arrived.
+    # Returns None when every event was handled.
+    closing, opening = events["closing"], events["opening"]
+    dates, wells, variables = events["dates"], events["wells"], events["variables"]
+    size = len(buffer)
+
+    last_line_start = -1
+    for match in EVENT_PATTERN.finditer(buffer, pos):
+        # Event line, and the "@--Message at" header line right before it
+        line_start = buffer.rfind(b"\n", 0, match.start()) + 1
+        if line_start == last_line_start or line_start == 0:
+            continue  # event line already handled, or no header line before it
+        last_line_start = line_start
+        header_start = buffer.rfind(b"\n", 0, line_start - 1) + 1
+        if buffer.find(HEADER_MARKER, header_start, line_start - 1) < 0:
+            continue
+        days_match = DAYS_PATTERN.search(buffer, header_start, line_start - 1)
+        event_end = line_end(buffer, line_start)
+
+        if buffer.find(CLOSING_MARKER, line_start, event_end) >= 0:
+            conn_match = CLOSING_PATTERN.search(buffer, line_start, event_end)
+            var_match = limit_match = None
+            if event_end + 1 < size:
+                var_end = line_end(buffer, event_end + 1)
+                var_match = VARIABLE_PATTERN.search(buffer, event_end + 1, var_end)
+                if var_end + 1 < size:
+                    limit_match = LIMIT_PATTERN.search(buffer, var_end + 1, line_end(buffer, var_end + 1))
+                elif not final:
+                    return header_start
+            elif not final:
+                return header_start
 
             if days_match and conn_match and var_match and limit_match:
-                days, date = days_match.groups()
-                x, y, z, well = conn_match.groups()
-                variable = var_match.group(1)
-                value, limit = limit_match.groups()
+                closing["Days"].append(float(days_match.group(1)))
+                closing["Date"].append(dates.setdefault(days_match.group(2), len(dates)))
+                closing["Well"].append(wells.setdefault(conn_match.group(4), len(wells)))
+                closing["Variable"].append(variables.setdefault(var_match.group(1), len(variables)))
+                closing["Value"].append(float(limit_match.group(1)))
+                closing["Limit"].append(float(limit_match.group(2)))
+        else:
+            opening_match = OPENING_PATTERN.search(buffer, line_start, event_end)
+
+            if days_match and opening_match:
+                opening["Days"].append(float(days_match.group(1)))
+                opening["Date"].append(dates.setdefault(days_match.group(2), len(dates)))
+                opening["Connection_ID"].append(int(opening_match.group(1)))
+                opening["Well"].append(wells.setdefault(opening_match.group(2), len(wells)))
+    return None
+
+
+def date_year(date):
+    # Year of a date as matched by DAYS_PATTERN ("dd MON yyyy")
+    return int(date[-4:])
+
+
+def event_frames(events):
+    # Column buffers -> (closing, opening) tables; Year is read once per distinct date
+    date_map = category_mapping(events["dates"])
+    well_map, variable_map = category_mapping(events["wells"]), category_mapping(events["variables"])
+    date_years = np.array([date_year(label) for label in date_map[0].categories], dtype=np.int16)
+
+    frames = []
+    for columns, event in ((events["closing"], "Closing"), (events["opening"], "Opening")):
+        date = categorical(columns["Date"], date_map)
+        frame = {"Days": np.frombuffer(columns["Days"], dtype=np.float64), "Date": date,
+                 "Well": categorical(columns["Well"], well_map)}
+        if event == "Closing":
+            frame["Variable"] = categorical(columns["Variable"], variable_map)
+            frame["Value"] = np.frombuffer(columns["Value"], dtype=np.float32)
+            frame["Limit"] = np.frombuffer(columns["Limit"], dtype=np.float32)
+        else:
+            frame["Connection_ID"] = np.frombuffer(columns["Connection_ID"], dtype=np.int32)
+        frame["Event"] = constant_categorical(event, len(date))
+        frame["Year"] = date_years[date.codes]
+        frames.append(pd.DataFrame(frame))
 
-                data.append([float(days), date, well, variable, float(value), float(limit), "Closing"])
+    return frames[0], frames[1]
 
-        # Extract Opening Connections (new logic)
-        elif "@--Message at" in lines[i] and "@ Opening connection" in lines[i + 1]:
-            days_match = re.search(r"@--Message at (\d+\.\d+) Days\s+([\d]+ \w+ \d{4})", lines[i])
-            opening_match = re.search(r"@ Opening connection (\d+) in well (\S+)", lines[i + 1])
 
-            if days_match and opening_match:
-                days, date = days_match.groups()
-                conn_id, well = opening_match.groups()
-                opening_data.append([float(days), date, well, conn_id, "Opening"])
+@traced(bytes_in=path_size, rows_out=lambda events: len(events[0]) + len(events[1]))
+def extract_prt_data(file_path):
+    # Single forward pass over the memory-mapped .PRT
+    events = new_event_columns()
+    with open(file_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            buffer = b""
+        else:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        scan_events(buffer, events)
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
 
-    # Combine closing and opening data
-    closing_df = pd.DataFrame(data, columns=["Days", "Date", "Well", "Variable", "Value", "Limit", "Event"])
-    opening_df = pd.DataFrame(opening_data, columns=["Days", "Date", "Well", "Connection_ID", "Event"])
+    return event_frames(events)
 
-    return closing_df, opening_df
 
+@traced(rows_out=len)
 def compute_connections_per_well(df_closing, df_opening):
+    # Year comes parsed from extract_prt_data; Well is categorical, so only observed pairs count
     # Process Closing Connections
-    df_closing["Year"] = pd.to_datetime(df_closing["Date"], format="%d %b %Y").dt.year
-    closing_counts = df_closing.groupby(["Year", "Well"]).size().reset_index(name="Closed_Connections")
+    closing_counts = df_closing.groupby(["Year", "Well"], observed=True).size().reset_index(name="Closed_Connections")
 
     # Process Opening Connections
-    df_opening["Year"] = pd.to_datetime(df_opening["Date"], format="%d %b %Y").dt.year
-    opening_counts = df_opening.groupby(["Year", "Well"]).size().reset_index(name="Opened_Connections")
+    opening_counts = df_opening.groupby(["Year", "Well"], observed=True).size().reset_index(name="Opened_Connections")
 
     # Merge both DataFrames
     merged_df = pd.merge(closing_counts, opening_counts, on=["Year", "Well"], how="outer").fillna(0)
@@ -57,34 +181,31 @@ def compute_connections_per_well(df_closing, df_opening):
 
     return merged_df
 
-def compute_workovers_per_year(df_connections):
+
+@traced(rows_out=len)
+def compute_workovers_per_year(df_connections, threshold_before=3, threshold_after=2, cutover_year=2027):
     df_connections["Total_Connections"] = df_connections["Closed_Connections"] + df_connections["Opened_Connections"]
     df_filtered = df_connections[
-        ((df_connections["Year"] < 2027) & (df_connections["Total_Connections"] > 3)) |
-        ((df_connections["Year"] >= 2027) & (df_connections["Total_Connections"] > 2))
+        ((df_connections["Year"] < cutover_year) & (df_connections["Total_Connections"] > threshold_before)) |
+        ((df_connections["Year"] >= cutover_year) & (df_connections["Total_Connections"] > threshold_after))
     ]
     return df_filtered.groupby("Year").size().reset_index(name="Workover (Perf or Shut-off)")
 
+
+@traced(rows_out=len)
 def enforce_max_workover(df_workovers, max_workovers=6):
+    # Excess above max_workovers moves to the next listed year (vectorized carry-forward)
     df_workovers.sort_values("Year", inplace=True)
+    raw = df_workovers["Workover (Perf or Shut-off)"].to_numpy()
+    adjusted, _ = cap_with_carry_forward(raw, max_workovers)
 
-    excess = 0
-    adjusted_workovers = []
+    return pd.DataFrame({
+        "Year": df_workovers["Year"].to_numpy(),
+        "Workover (Perf or Shut-off)": np.rint(adjusted).astype(raw.dtype if raw.dtype.kind == "i" else float),
+    })
 
-    for _, row in df_workovers.iterrows():
-        year = row["Year"]
-        workovers = row["Workover (Perf or Shut-off)"] + excess
-
-        if workovers > max_workovers:
-            excess = workovers - max_workovers
-            workovers = max_workovers
-        else:
-            excess = 0
-
-        adjusted_workovers.append([year, workovers])
-
-    return pd.DataFrame(adjusted_workovers, columns=["Year", "Workover (Perf or Shut-off)"])
 
+@traced(rows_out=len)
 def generate_final_dataframe(df_adjusted_workovers, filename):
     years = list(range(2024, 2050))
 
@@ -122,37 +243,459 @@ def generate_final_dataframe(df_adjusted_workovers, filename):
         "Workover (Perf or Shut-off)", "Workover (Pump Replacement)", "Facilities Payment Schedule (%)"
     ])
 
-def process_all_prt_files(root_dir):
-    for subdir, _, files in os.walk(root_dir):
+
+def excel_floats(df):
+    # float32 columns as float64 of their shortest decimal form (0.9, not 0.8999999761581421)
+    columns = df.select_dtypes("float32").columns
+    return df.assign(**{c: df[c].astype(str).astype(float) for c in columns}) if len(columns) else df
+
+
+@traced(rows_out=lambda sheets: len(sheets["Workover Sweep"]))
+def workover_sweep_sheets(df_connections_per_well, sweep):
+    # sweep: lists of settings ({"thresholds_before": [...], ...}, as parameter_grid takes), plus
+    # optional "params" (engine inputs pricing the workover CAPEX) and "start_year". Every
+    # combination is scheduled from the same connection table; one summary row per grid point
+    # (workovers, deferred backlog, workover CAPEX) and the per-year schedules in long format
+    settings = dict(sweep)
+    params, start_year = settings.pop("params", None), settings.pop("start_year", 2023)
+    result = sweep_workover_schedules(df_connections_per_well, parameter_grid(**settings), params=params,
+                                      start_year=start_year)
+    return {"Workover Sweep": sweep_summary(result), "Workover Sweep per Year": sweep_long_frame(result)}
+
+
+@traced(bytes_out=path_size)
+def write_summary_workbook(output_filename, df_final_structure, df_closing, df_opening,
+                           df_connections_per_well, df_workovers_per_year, df_adjusted_workovers,
+                           extra_sheets=None):
+    with pd.ExcelWriter(output_filename) as writer:
+        df_final_structure.to_excel(writer, sheet_name="Final Structured Data", index=False)
+        excel_floats(df_closing).to_excel(writer, sheet_name="Raw Closing Connections", index=False)
+        df_opening.to_excel(writer, sheet_name="Raw Opening Connections", index=False)
+        df_connections_per_well.to_excel(writer, sheet_name="Connections per Well per Year", index=False)
+        df_workovers_per_year.to_excel(writer, sheet_name="Raw Workovers per Year", index=False)
+        df_adjusted_workovers.to_excel(writer, sheet_name="Final Workovers per Year", index=False)
+        for sheet_name, sheet in (extra_sheets or {}).items():
+            sheet.to_excel(writer, sheet_name=sheet_name, index=False)
+
+
+# -------------------------------
+# Incremental rebuild cache
+# -------------------------------
+# <root>/.prt_cache/manifest.json maps each .PRT (relative path) to its size, mtime, content
+# hash, the code version that parsed it and the output written; the extracted events are kept
+# next to it as a pickle so an unchanged file is never parsed twice.
+CACHE_DIR_NAME = ".prt_cache"
+MANIFEST_NAME = "manifest.json"
+
+
+def code_version():
+    # Any edit to this script or the scheduler it uses invalidates the cache
+    digest = hashlib.sha256()
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    for name in (os.path.basename(__file__), "workover_scheduler.py"):
+        with open(os.path.join(script_dir, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def events_cache_path(cache_dir, rel_path):
+    return os.path.join(cache_dir, hashlib.sha1(rel_path.encode("utf-8")).hexdigest() + ".pkl")
+
+
+def load_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass  # unreadable manifest: start again
+    return {}
+
+
+def save_manifest(cache_dir, manifest):
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def is_unchanged(file_path, entry, version, sweep=None):
+    # Cheap check (no hashing) used to skip a file without even sending it to a worker; a
+    # different sweep rewrites the workbook (from the cached events)
+    if not entry or entry.get("code_version") != version or entry.get("sweep") != sweep:
+        return False
+    stat = os.stat(file_path)
+    if stat.st_size != entry.get("size") or stat.st_mtime != entry.get("mtime"):
+        return False
+    return entry.get("output") is None or os.path.exists(entry["output"])
+
+
+@traced(bytes_in=path_size)
+def process_prt_file(file_path, cache_dir=None, rel_path=None, cache_entry=None, version=None, sweep=None):
+    # Parse, aggregate and write the summary workbook for one .PRT.
+    # Returns a status record instead of raising, so one bad file cannot stop a batch.
+    # With a cache_dir, events are reused when the content hash matches cache_entry.
+    # With a sweep (see workover_sweep_sheets), the workbook also gets the sweep sheets.
+    file = os.path.basename(file_path)
+    base_name = os.path.splitext(file)[0]
+    output_filename = os.path.join(os.path.dirname(file_path), f"{base_name}_summary.xlsx")
+    record = {"File": file_path, "Output": None, "Status": "Done", "Closing Events": 0,
+              "Opening Events": 0, "Seconds": 0.0, "Error": None}
+    start = time.perf_counter()
+
+    try:
+        events = None
+        if cache_dir is not None:
+            stat = os.stat(file_path)
+            content_hash = file_hash(file_path)
+            events_path = events_cache_path(cache_dir, rel_path)
+            if (cache_entry and cache_entry.get("hash") == content_hash
+                    and cache_entry.get("code_version") == version and os.path.exists(events_path)):
+                with span("load_cached_events", bytes=os.path.getsize(events_path)):
+                    events = pd.read_pickle(events_path)
+                record["Status"] = "Done (events from cache)"
+
+        if events is None:
+            events = extract_prt_data(file_path)
+            if cache_dir is not None:
+                os.makedirs(cache_dir, exist_ok=True)
+                pd.to_pickle(events, events_path)
+
+        df_closing, df_opening = events
+        record["Closing Events"] = len(df_closing)
+        record["Opening Events"] = len(df_opening)
+        if df_closing.empty and df_opening.empty:
+            record["Status"] = "Skipped (no matching data found)"
+        else:
+            df_connections_per_well = compute_connections_per_well(df_closing, df_opening)
+            df_workovers_per_year = compute_workovers_per_year(df_connections_per_well)
+            df_adjusted_workovers = enforce_max_workover(df_workovers_per_year)
+            df_final_structure = generate_final_dataframe(df_adjusted_workovers, file)
+            extra_sheets = workover_sweep_sheets(df_connections_per_well, sweep) if sweep else None
+
+            write_summary_workbook(output_filename, df_final_structure, df_closing, df_opening,
+                                   df_connections_per_well, df_workovers_per_year, df_adjusted_workovers,
+                                   extra_sheets)
+            record["Output"] = output_filename
+
+        if cache_dir is not None:
+            record["Cache Entry"] = {
+                "size": stat.st_size, "mtime": stat.st_mtime, "hash": content_hash,
+                "code_version": version, "sweep": sweep, "output": record["Output"],
+                "closing_events": record["Closing Events"], "opening_events": record["Opening Events"],
+            }
+    except Exception as e:
+        record["Status"] = "Failed"
+        record["Error"] = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"
+
+    record["Seconds"] = round(time.perf_counter() - start, 3)
+    return record
+
+
+def process_prt_file_traced(*job):
+    # Pool entry point when tracing: the worker's stage spans travel back with the record
+    with collect() as spans:
+        record = process_prt_file(*job)
+    record["Trace"] = spans
+    return record
+
+
+def find_prt_files(root_dir):
+    prt_files = []
+    for subdir, dirs, files in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if d != CACHE_DIR_NAME]
         for file in files:
             if file.endswith(".PRT"):
-                file_path = os.path.join(subdir, file)
-                print(f"Processing file: {file_path}")
-
-                base_name = os.path.splitext(file)[0]
-                output_filename = os.path.join(subdir, f"{base_name}_summary.xlsx")
-
-                df_closing, df_opening = extract_prt_data(file_path)
-                if df_closing.empty and df_opening.empty:
-                    print(f"Skipping {file} (no matching data found)")
-                    continue
-
-                df_connections_per_well = compute_connections_per_well(df_closing, df_opening)
-                df_workovers_per_year = compute_workovers_per_year(df_connections_per_well)
-                df_adjusted_workovers = enforce_max_workover(df_workovers_per_year)
-                df_final_structure = generate_final_dataframe(df_adjusted_workovers, file)
-
-                with pd.ExcelWriter(output_filename) as writer:
-                    df_final_structure.to_excel(writer, sheet_name="Final Structured Data", index=False)
-                    df_closing.to_excel(writer, sheet_name="Raw Closing Connections", index=False)
-                    df_opening.to_excel(writer, sheet_name="Raw Opening Connections", index=False)
-                    df_connections_per_well.to_excel(writer, sheet_name="Connections per Well per Year", index=False)
-                    df_workovers_per_year.to_excel(writer, sheet_name="Raw Workovers per Year", index=False)
-                    df_adjusted_workovers.to_excel(writer, sheet_name="Final Workovers per Year", index=False)
+                prt_files.append(os.path.join(subdir, file))
+    return sorted(prt_files)
+
+
+def process_all_prt_files(root_dir, workers=1, index_filename="prt_outputs_index.xlsx",
+                          use_cache=True, force=False, sweep=None):
+    # workers=1 runs in this process; workers>1 (or None = all cores) uses a process pool.
+    # With use_cache, unchanged files are skipped; force=True reparses everything.
+    # sweep: workover settings to sweep in every summary workbook (see workover_sweep_sheets).
+    prt_files = find_prt_files(root_dir)
+    total = len(prt_files)
+    records = []
+
+    cache_dir = os.path.join(root_dir, CACHE_DIR_NAME) if use_cache else None
+    version = code_version() if use_cache else None
+    manifest = {} if not use_cache or force else load_manifest(cache_dir)
+    cached_files = manifest.get("files", {})
+
+    def report(record):
+        add_spans(record.pop("Trace", None))
+        records.append(record)
+        if record["Status"] == "Failed":
+            message = f"FAILED {record['File']} ({record['Error']})"
+        elif record["Status"].startswith("Unchanged"):
+            message = f"Unchanged: {os.path.basename(record['File'])}"
+        elif record["Output"] is None:
+            message = f"Skipping {os.path.basename(record['File'])} (no matching data found)"
+        else:
+            message = f"Finished: {record['Output']} ({record['Seconds']:.1f} s)"
+        print(f"[{len(records)}/{total}] {message}")
+
+    # Files whose size/mtime/code version match the manifest are not touched at all
+    jobs = []
+    for file_path in prt_files:
+        rel_path = os.path.relpath(file_path, root_dir)
+        entry = cached_files.get(rel_path)
+        if use_cache and is_unchanged(file_path, entry, version, sweep):
+            report({"File": file_path, "Output": entry["output"], "Status": "Unchanged (cached)",
+                    "Closing Events": entry.get("closing_events", 0),
+                    "Opening Events": entry.get("opening_events", 0), "Seconds": 0.0, "Error": None})
+        else:
+            jobs.append((file_path, cache_dir, rel_path, entry, version, sweep))
 
-                print(f"Finished: {output_filename}")
+    if workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            print(f"Processing file: {job[0]}")
+            report(process_prt_file(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            worker = process_prt_file_traced if enabled() else process_prt_file
+            futures = {executor.submit(worker, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    record = future.result()
+                except Exception as e:  # worker process died
+                    record = {"File": futures[future], "Output": None, "Status": "Failed", "Closing Events": 0,
+                              "Opening Events": 0, "Seconds": 0.0, "Error": f"{type(e).__name__}: {e}"}
+                report(record)
+
+    if use_cache:
+        # Keep entries for files that still exist; drop stale ones and their event pickles
+        new_files = {}
+        for record in records:
+            rel_path = os.path.relpath(record["File"], root_dir)
+            if "Cache Entry" in record:
+                new_files[rel_path] = record.pop("Cache Entry")
+            elif record["Status"].startswith("Unchanged"):
+                new_files[rel_path] = cached_files[rel_path]
+        keep = {os.path.basename(events_cache_path(cache_dir, rel_path)) for rel_path in new_files}
+        if os.path.isdir(cache_dir):
+            for name in os.listdir(cache_dir):
+                if name.endswith(".pkl") and name not in keep:
+                    os.remove(os.path.join(cache_dir, name))
+        save_manifest(cache_dir, {"code_version": version, "files": new_files})
+
+    # Consolidated index of what was produced
+    index_df = pd.DataFrame(records, columns=["File", "Output", "Status", "Closing Events",
+                                              "Opening Events", "Seconds", "Error"])
+    index_df = index_df.sort_values("File").reset_index(drop=True)
+    if index_filename and total:
+        with span("write_index_workbook", rows=len(index_df)):
+            index_df.to_excel(os.path.join(root_dir, index_filename), index=False)
+
+    failed = (index_df["Status"] == "Failed").sum()
+    unchanged = index_df["Status"].str.startswith("Unchanged")
+    written = (index_df["Output"].notna() & ~unchanged).sum()
+    print(f"Processed {total} file(s): {written} written, {unchanged.sum()} unchanged, {failed} failed")
+    return index_df
+
+
+# -------------------------------
+# Live follow mode
+# -------------------------------
+# Watches .PRT files a running simulation is still writing. Each poll reads only the bytes
+# appended since the last one; whole lines go through scan_events, and the unparsed tail (a
+# partial last line, the last line as the header of an event still to come, or a closing
+# block whose variable/limit lines are not written yet) is kept for the next poll. The
+# per-well-per-year connection counts are updated from the new events only; the workover
+# schedule and the summary workbook are rebuilt from them every refresh interval.
+FOLLOW_CHUNK_SIZE = 64 << 20
+
+
+def start_follow(file_path):
+    return {"File": file_path, "offset": 0, "pending": b"", "scan_from": 0, "events": new_event_columns(),
+            "date_years": [], "well_labels": [], "counts": {}, "new_events": 0, "written_events": 0,
+            "last_write": 0.0}
+
+
+def update_connection_counts(state, n_closing, n_opening):
+    # Add the events past the first n_closing / n_opening rows to the (Year, well code) counts
+    events = state["events"]
+    if len(events["dates"]) > len(state["date_years"]):
+        state["date_years"].extend(date_year(decode(d)) for d in list(events["dates"])[len(state["date_years"]):])
+    if len(events["wells"]) > len(state["well_labels"]):
+        state["well_labels"].extend(decode(w) for w in list(events["wells"])[len(state["well_labels"]):])
+    date_years = np.array(state["date_years"], dtype=np.int64)
+
+    for column, start in ((0, n_closing), (1, n_opening)):
+        columns = events["opening" if column else "closing"]
+        dates = np.frombuffer(columns["Date"], dtype=np.int32)[start:]
+        wells = np.frombuffer(columns["Well"], dtype=np.int32)[start:]
+        if not len(dates):
+            continue
+        keys, counts = np.unique(date_years[dates] << 32 | wells, return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            state["counts"].setdefault((key >> 32, key & 0xFFFFFFFF), [0, 0])[column] += count
+
+
+@traced(rows_out=lambda added: added)
+def follow_poll(state, final=False):
+    # Parse what was appended since the last poll; final=True also parses the unfinished tail
+    # (as extract_prt_data would at the end of the file). Returns the number of new events.
+    events = state["events"]
+    n_closing, n_opening = len(events["closing"]["Days"]), len(events["opening"]["Days"])
+    if not os.path.exists(state["File"]):
+        return 0
+    if os.path.getsize(state["File"]) < state["offset"]:
+        # Truncated or replaced (simulation restarted): start again
+        print(f"{os.path.basename(state['File'])} was truncated; starting again")
+        state.update(start_follow(state["File"]))
+        n_closing = n_opening = 0
+
+    with open(state["File"], "rb") as file:
+        file.seek(state["offset"])
+        while True:
+            chunk = file.read(FOLLOW_CHUNK_SIZE)
+            state["offset"] += len(chunk)
+            if chunk:
+                # Whole lines only; keep the last one, it may be the header of the next event
+                buffer = state["pending"] + chunk
+                complete = buffer.rfind(b"\n") + 1
+                resume = scan_events(buffer[:complete], events, state["scan_from"], final=False)
+                if resume is None:
+                    resume = buffer.rfind(b"\n", 0, complete - 1) + 1 if complete else 0
+                    state["scan_from"] = complete - resume
+                else:
+                    state["scan_from"] = 0
+                state["pending"] = buffer[resume:]
+            else:
+                if final:
+                    scan_events(state["pending"], events, state["scan_from"])
+                    state["pending"], state["scan_from"] = b"", 0
+                break
+
+    update_connection_counts(state, n_closing, n_opening)
+    added = len(events["closing"]["Days"]) - n_closing + len(events["opening"]["Days"]) - n_opening
+    state["new_events"] += added
+    return added
+
+
+def connections_from_counts(state):
+    # Same table as compute_connections_per_well, from the running counts
+    rows = sorted((year, state["well_labels"][well], closed, opened)
+                  for (year, well), (closed, opened) in state["counts"].items())
+    return pd.DataFrame(rows, columns=["Year", "Well", "Closed_Connections", "Opened_Connections"])
+
+
+def write_follow_summary(state):
+    # Rebuild the schedule from the counts and write the summary workbook next to the .PRT
+    # (through a temporary file, so a reader never sees a half-written workbook)
+    file = os.path.basename(state["File"])
+    base_name = os.path.splitext(file)[0]
+    output_filename = os.path.join(os.path.dirname(state["File"]), f"{base_name}_summary.xlsx")
+    temp_filename = os.path.join(os.path.dirname(state["File"]), f"~{base_name}_summary.xlsx")
+
+    df_closing, df_opening = event_frames(state["events"])
+    df_connections_per_well = connections_from_counts(state)
+    df_workovers_per_year = compute_workovers_per_year(df_connections_per_well)
+    df_adjusted_workovers = enforce_max_workover(df_workovers_per_year)
+    df_final_structure = generate_final_dataframe(df_adjusted_workovers, file)
+    write_summary_workbook(temp_filename, df_final_structure, df_closing, df_opening,
+                           df_connections_per_well, df_workovers_per_year, df_adjusted_workovers)
+    os.replace(temp_filename, output_filename)
+
+    state["written_events"] = state["new_events"]
+    workovers = ", ".join(f"{year}: {n}" for year, n in zip(df_adjusted_workovers["Year"],
+                                                            df_adjusted_workovers["Workover (Perf or Shut-off)"]))
+    print(f"[{time.strftime('%H:%M:%S')}] {output_filename}: {len(df_closing):,} closing / "
+          f"{len(df_opening):,} opening events; workovers {{{workovers}}}")
+    return output_filename
+
+
+def follow_prt_files(paths, interval=5.0, refresh=60.0, idle_exit=None):
+    # paths: .PRT files, or folders whose .PRT files are followed (including ones created later).
+    # Polls every interval seconds and writes a summary at most every refresh seconds when new
+    # events arrived. Stops on Ctrl+C, or after idle_exit seconds without new data; the
+    # unfinished tail is then parsed and every summary written one last time.
+    states = {}
+    last_growth = time.time()
+    try:
+        while True:
+            for path in paths:
+                for file_path in (find_prt_files(path) if os.path.isdir(path) else [path]):
+                    if file_path not in states:
+                        print(f"Following {file_path}")
+                        states[file_path] = start_follow(file_path)
+
+            now = time.time()
+            for state in states.values():
+                if follow_poll(state):
+                    last_growth = now
+                if state["new_events"] > state["written_events"] and now - state["last_write"] >= refresh:
+                    state["last_write"] = now
+                    try:
+                        write_follow_summary(state)
+                    except OSError as e:  # e.g. the workbook is open in Excel; retried next refresh
+                        print(f"Could not write the summary of {state['File']} ({e})")
+
+            if idle_exit is not None and time.time() - last_growth >= idle_exit:
+                print(f"No new data for {idle_exit:g} s; stopping")
+                break
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        print("Stopping")
+
+    for state in states.values():
+        follow_poll(state, final=True)
+        if state["new_events"] > state["written_events"]:
+            write_follow_summary(state)
+    return states
 
 # Run it
 if __name__ == "__main__":
-    folder_path = os.path.join(os.path.dirname(__file__), "prt_files")
-    process_all_prt_files(folder_path)
+    parser = argparse.ArgumentParser(description="Extract workover schedules from .PRT files")
+    parser.add_argument("folder", nargs="?", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "prt_files"))
+    parser.add_argument("--workers", type=int, default=os.cpu_count(),
+                        help="number of worker processes (1 = sequential)")
+    parser.add_argument("--force", action="store_true", help="ignore the cache and reparse every .PRT")
+    parser.add_argument("--no-cache", action="store_true", help="do not read or write the .prt_cache manifest")
+    parser.add_argument("--sweep", action="store_true",
+                        help="add workover sweep sheets (every combination of the settings below) to each summary")
+    parser.add_argument("--thresholds-before", type=int, nargs="+", default=[3],
+                        help="sweep: connection thresholds before the cutover year")
+    parser.add_argument("--thresholds-after", type=int, nargs="+", default=[2],
+                        help="sweep: connection thresholds from the cutover year on")
+    parser.add_argument("--cutover-years", type=int, nargs="+", default=[2027], help="sweep: cutover years")
+    parser.add_argument("--max-workovers", type=int, nargs="+", default=[6], help="sweep: rig capacities (workovers/year)")
+    parser.add_argument("--params", help="sweep: parameter JSON file (as batch_economics.py reads); its base values "
+                                          "and start_year price the workover CAPEX")
+    parser.add_argument("--trace", metavar="DIR", help="write a stage timing trace (JSON) to this folder")
+    parser.add_argument("--follow", nargs="+", metavar="PRT",
+                        help="follow .PRT files (or folders of them) still being written, instead of a batch run")
+    parser.add_argument("--interval", type=float, default=5.0, help="follow: seconds between polls")
+    parser.add_argument("--refresh", type=float, default=60.0, help="follow: seconds between summary writes")
+    parser.add_argument("--idle-exit", type=float, help="follow: stop after this many seconds without new data")
+    args = parser.parse_args()
+    if args.trace:
+        enable(args.trace)
+    if args.follow:
+        follow_prt_files(args.follow, interval=args.interval, refresh=args.refresh, idle_exit=args.idle_exit)
+        finish("2_Multiple_Workover_Extraction", follow=args.follow)
+    else:
+        sweep = {"thresholds_before": args.thresholds_before, "thresholds_after": args.thresholds_after,
+                 "cutover_years": args.cutover_years, "max_workovers": args.max_workovers} if args.sweep else None
+        if sweep and args.params:
+            # batch helpers are only needed for the cost parameters (keeps the workers' imports light)
+            from batch_economics import load_parameter_file
+            config = load_parameter_file(args.params)
+            sweep.update(params=config["base"], start_year=config["start_year"])
+        process_all_prt_files(args.folder, workers=args.workers, use_cache=not args.no_cache, force=args.force,
+                              sweep=sweep)
+        finish("2_Multiple_Workover_Extraction", folder=args.folder, workers=args.workers)
@@ -1,8 +1,99 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import io
+import os
+import sys
+import hashlib
+import charts
+from eco_engine import merge_inputs, cash_flow_table, build_schedule, evaluate
+from production_store import list_runs, load_run
+from break_even import BREAK_EVEN_INPUTS, break_even
+from sensitivity import SENSITIVITY_VARIABLES, one_at_a_time, tornado_table
+from monte_carlo import DISTRIBUTIONS, MC_VARIABLES, check_distributions, run_monte_carlo, summarize
+from scenario_grid import MAX_GRID_INPUTS, MAX_GRID_SCENARIOS, MIN_GRID_INPUTS, cancel_grid_job, grid_axes, grid_frame, start_grid_job
+from result_store import TABLE_SERIES, evaluate_stored, store_path
+from instrumentation import finish, span
+
+# -------------------------------
+# Cached parsing and cash-flow computation
+# -------------------------------
+# Parse/merge is keyed on the SHA-256 of the uploaded bytes and the cash-flow table on the
+# parameter tuple. A new parameter tuple starts from the previous evaluation (kept in
+# session_state), so a widget change only recomputes the series that depend on it. With a result
+# store set (ECONOMICS_RESULT_STORE), a case and parameter set evaluated before, in any session or
+# process, is read back instead.
+# Arguments starting with "_" are not hashed by Streamlit; max_entries bounds each cache.
+def file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+@st.cache_data(max_entries=8, show_spinner=False)
+def load_merged_inputs(inputs_key, _cost_bytes, _prod_source, _gas_bytes):
+    cost_df = pd.read_excel(io.BytesIO(_cost_bytes))
+    if isinstance(_prod_source, bytes):
+        prod_df = pd.read_excel(io.BytesIO(_prod_source))
+    else:
+        prod_df = load_run(*_prod_source)  # (store path, run)
+    gas_df = pd.read_excel(io.BytesIO(_gas_bytes))
+    return merge_inputs(cost_df, prod_df, gas_df)
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def compute_cash_flow(inputs_key, param_items, start_year, fixed_price, _merged_df, _previous=None):
+    if store_path():
+        result = evaluate_stored(build_schedule(_merged_df), dict(param_items), start_year, fixed_price,
+                                 series=TABLE_SERIES)
+    else:
+        result = evaluate(build_schedule(_merged_df), dict(param_items), start_year, fixed_price,
+                          with_cash_flow_metrics=True, previous=_previous)
+    df, indicators = cash_flow_table(_merged_df, result=result)
+    return df, indicators, result
+
+
+# Charts are rendered once per distinct data and kept as PNG bytes (see charts.py)
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_chart(kind, *args):
+    with span(f"chart {kind}"):  # cache misses only
+        return getattr(charts, kind)(*args)
+
+
+def format_irr(value, n_roots):
+    if np.isnan(value):
+        return "n/a"
+    return f"{value * 100:.1f}" + (" (multiple IRRs)" if n_roots > 1 else "")
+
+
+def format_years(value):
+    # Payback is counted from the first year of the schedule
+    return "not reached" if np.isnan(value) else f"{value:.1f}"
+
+
+def state_bytes(value, seen=None):
+    # Approximate memory held by a session_state value; arrays sharing a buffer count once
+    seen = set() if seen is None else seen
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, np.ndarray):
+        while isinstance(value.base, np.ndarray):
+            value = value.base
+        if id(value) in seen:
+            return 0
+        seen.add(id(value))
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(state_bytes(k, seen) + state_bytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(state_bytes(v, seen) for v in value)
+    return sys.getsizeof(value)
+
+
+SENSITIVITY_CASES = ("Low Case", "Med Case", "High Case")
+SENSITIVITY_METRICS = {
+    "NPV (MM$)": "npv", "Total Revenue (MM$)": "total_revenue", "Total Cost (MM$)": "total_cost",
+    "Cumulative NCF (MM$)": "cumulative_ncf", "CPI": "cpi", "PIR": "pir", "IRR (%)": "irr",
+    "Payback (years)": "payback", "Discounted Payback (years)": "discounted_payback",
+}
 
 # -------------------------------
 # Session state for recalculation
@@ -23,14 +114,28 @@ with tab1:
     col1, col2, col3 = st.columns(3)
     
     with col1:
-        prod_data_file = st.file_uploader("Production Data File", type=["xlsx"], key="prod")
-        
+        prod_source = st.radio("Production Data Source", ["Excel File", "Production Store (Parquet)"], horizontal=True)
+        prod_data_file = None
+        prod_store_run = None
+
+        if prod_source == "Excel File":
+            prod_data_file = st.file_uploader("Production Data File", type=["xlsx"], key="prod")
+        else:
+            # Store written by 1_Prod_Data_Prep.py --output parquet
+            prod_store_path = st.text_input("Production Store Path", value="production_runs.parquet")
+            try:
+                prod_store_run = st.selectbox("Run", list_runs(prod_store_path))
+            except Exception as e:
+                st.warning(f"Cannot open production store: {e}")
+
         if prod_data_file is not None:
         # Extract just the file name without extension (optional)
-            import os
             run_name = os.path.splitext(prod_data_file.name)[0]
+        elif prod_store_run is not None:
+            run_name = prod_store_run
         else:
             run_name = "Unknown Run"
+        prod_data_ready = prod_data_file is not None or prod_store_run is not None
     
     with col2:
         cost_schedule_file = st.file_uploader("Drilling, Workover & Facilities Schedule File", type=["xlsx"], key="cost")
@@ -92,79 +197,52 @@ with tab1:
 
         st.markdown('</div>', unsafe_allow_html=True)        
 
+    # Inputs handed to the economics engine (same units as above)
+    model_params = {
+        "oil_price": oil_price,
+        "gas_price": gas_price,
+        "condensate_price": condensate_price,
+        "inflation_oil": inflation_oil,
+        "inflation_cost": inflation_cost,
+        "discount_rate": discount_rate,
+        "cost_per_boe": cost_per_boe,
+        "conversion_factor": conversion_factor,
+        "makeup_gas_daily_mmscf": makeup_gas_daily_mmscf,
+        "makeup_gas_cost": makeup_gas_cost,
+        "vert_cost": vert_cost,
+        "horiz_cost": horiz_cost,
+        "workover_perf_cost": workover_perf_cost,
+        "workover_pump_cost": workover_pump_cost,
+        "facilities_total_cost": facilities_total_cost,
+    }
+
     with col_results:
-        if cost_schedule_file and prod_data_file and makeup_gas_file and st.session_state["recalculate"]:
-            cost_df = pd.read_excel(cost_schedule_file)
-            prod_df = pd.read_excel(prod_data_file)
-            gas_df = pd.read_excel(makeup_gas_file)
-
-            gas_df.columns = [c.strip().lower() for c in gas_df.columns]
-            if "availability" not in gas_df.columns:
-                st.error("Make-up Gas file must contain 'Availability' column.")
+        if cost_schedule_file and prod_data_ready and makeup_gas_file and st.session_state["recalculate"]:
+            cost_bytes = cost_schedule_file.getvalue()
+            gas_bytes = makeup_gas_file.getvalue()
+            if prod_data_file is not None:
+                prod_source = prod_data_file.getvalue()
+                prod_key = file_digest(prod_source)
+            else:
+                prod_source = (prod_store_path, prod_store_run)
+                prod_key = ("store", os.path.abspath(prod_store_path), prod_store_run, os.path.getmtime(prod_store_path))
+            inputs_key = (file_digest(cost_bytes), prod_key, file_digest(gas_bytes))
+
+            try:
+                with span("load_merged_inputs", bytes=len(cost_bytes) + len(gas_bytes)):
+                    merged_df = load_merged_inputs(inputs_key, cost_bytes, prod_source, gas_bytes)
+            except ValueError as e:
+                st.error(str(e))
                 st.stop()
-            gas_df.rename(columns={"availability": "Availability", "year": "Year"}, inplace=True)
-
-            df = pd.merge(cost_df, prod_df, on="Year")
-            df = pd.merge(df, gas_df[["Year", "Availability"]], on="Year", how="left")
-            df["Availability"] = df["Availability"].fillna(0)
-
-            df.rename(columns={
-                "Drilling of Vertical Wells": "Planned Vertical Wells",
-                "Drilling of Horizontal Wells": "Planned Horizontal Wells",
-                "Oil": "Oil Prod STB",
-                "Condensate": "Cond Prod STB",
-                "Gas": "Gas Prod SCF"
-            }, inplace=True)
-
-            df["Facilities Payment Schedule (%)"] = df["Facilities Payment Schedule (%)"] / 100
-            df["Year"] = df["Year"].astype(int)
-
-            df["Total CAPEX MM$"] = (
-                df.get("Planned Vertical Wells", 0).fillna(0).astype(float) * vert_cost +
-                df.get("Planned Horizontal Wells", 0).fillna(0).astype(float) * horiz_cost +
-                df.get("Workover (Perf or Shut-off)", 0).fillna(0).astype(float) * workover_perf_cost +
-                df.get("Workover (Pump Replacement)", 0).fillna(0).astype(float) * workover_pump_cost +
-                df.get("Facilities Payment Schedule (%)", 0).fillna(0).astype(float) * facilities_total_cost
-            ) / 1e6
-            df["Inflation Factor %"] = (1 + inflation_cost) ** (df["Year"] - start_year)
-            df["Escalated CAPEX MM$"]= df["Total CAPEX MM$"] * df["Inflation Factor %"]            
-            df["Cumulative CAPEX"] = df["Escalated CAPEX MM$"].cumsum()
-
-            df["BOE MMSTB"] = ((df.get("Oil Prod STB", 0).fillna(0) +
-                                df.get("Cond Prod STB", 0).fillna(0) +
-                                df.get("Gas Prod SCF", 0).fillna(0) * 1e3 / conversion_factor) / 1e6)
-            df["OPEX1 MM$"] = df["BOE MMSTB"] * cost_per_boe
-            df["OPEX2 MM$"] = makeup_gas_cost * makeup_gas_daily_mmscf * 365 * df["Availability"] / 1e3
-            df["Total OPEX MM$"] = df["OPEX1 MM$"] + df["OPEX2 MM$"]
-            df["Escalated OPEX MM$"] = df["Total OPEX MM$"] * df["Inflation Factor %"]
-            df["Cumulative OPEX"] = df["Escalated OPEX MM$"].cumsum()
-            df["Total Cost MM$"] = df["Total CAPEX MM$"] + df["Total OPEX MM$"]
-
-            df["Escalated Cost MM$"] = df["Escalated CAPEX MM$"] + df["Escalated OPEX MM$"]
-            df["Cumulative Escalated Cost"] = df["Escalated Cost MM$"].cumsum()
-
-            df["Oil Price $/STB"] = oil_price if fixed_price else oil_price * ((1 + inflation_oil) ** (df["Year"] - start_year))
-            df["Cond Price $/STB"] = condensate_price if fixed_price else condensate_price * ((1 + inflation_oil) ** (df["Year"] - start_year))
-            df["Gas Price $/MSCF"] = gas_price if fixed_price else gas_price * ((1 + inflation_oil) ** (df["Year"] - start_year))
-
-            df["Oil Revenue MM$"] = df["Oil Prod STB"] * df["Oil Price $/STB"] / 1e6
-            df["Condensate Revenue MM$"] = df["Cond Prod STB"] * df["Cond Price $/STB"] / 1e6
-            df["Gas Revenue MM$"] = df["Gas Prod SCF"] * 1e3 * df["Gas Price $/MSCF"] / 1e9
-            df["Total Revenue MM$"] = (df["Oil Revenue MM$"].fillna(0) +df["Condensate Revenue MM$"].fillna(0) + df["Gas Revenue MM$"].fillna(0))
-            df["Cumulative Revenue"] = df["Total Revenue MM$"].cumsum()
-
-            df["NCF MM$"] = df["Total Revenue MM$"] - df["Escalated Cost MM$"]
-            df["Cumulative NCF"] = df["NCF MM$"].cumsum()
-
-            df["Discount Factor"] = 1 / ((1 + discount_rate) ** (df["Year"] - start_year))
-            df["Discounted NCF"] = df["NCF MM$"] * df["Discount Factor"]
-            npv = df["Discounted NCF"].sum()
-            
-            df["Discounted CAPEX"] = df["Escalated CAPEX MM$"] * df["Discount Factor"]
-            npv_capex = df["Discounted CAPEX"].sum()
-            cpi = npv / npv_capex if npv_capex != 0 else float("inf")
-            total_escalated_capex = df['Escalated CAPEX MM$'].sum()
-            pir = npv / total_escalated_capex if total_escalated_capex != 0 else 0
+
+            with span("economics block", rows=len(merged_df)):
+                df, indicators, cash_flow_result = compute_cash_flow(
+                    inputs_key, tuple(sorted(model_params.items())), start_year, fixed_price, merged_df,
+                    st.session_state.get("cash_flow_result"))
+                st.session_state["cash_flow_result"] = cash_flow_result
+            npv = indicators["npv"]
+            cpi = indicators["cpi"]
+            pir = indicators["pir"]
             
             st.subheader("Final Indicators")
             st.table({
@@ -174,30 +252,19 @@ with tab1:
                 "Cumulative NCF (MM$)": [f"{df['Cumulative NCF'].iloc[-1]:,.2f}"],
                 "Cumulative Profitability Index CPI": [f"{cpi:.2f}"],
                 "Profit Investment Ratio PIR": [f"{pir:.2f}"],
+                "IRR (%)": [format_irr(indicators["irr"], indicators["irr_roots"])],
+                "Payback (years)": [format_years(indicators["payback"])],
+                "Discounted Payback (years)": [format_years(indicators["discounted_payback"])],
             })
 
             st.subheader(f'Revenue, Costs, and Net Cash Flow Over Time of "{run_name}"')
-            fig, ax = plt.subplots()
-            Year = df["Year"]
-            revenue = df["Total Revenue MM$"]
-            opex = -df["Escalated OPEX MM$"]
-            capex = -df["Escalated CAPEX MM$"]
-
-            ax.bar(Year, revenue, label="Revenue", color="green")
-            ax.bar(Year, opex, label="OPEX", color="blue")
-            ax.bar(Year, capex, bottom=opex, label="CAPEX", color="red")
-            ax.plot(Year, df["NCF MM$"], color="black", marker='o', label="Net Cash Flow")
-            ax.set_xlabel("Year")
-            ax.set_ylabel("Value ($ Million)")
-            ax.set_title(f'{run_name} Economic Analysis', fontsize=11, fontweight='bold')
-            ax.axhline(0, color='gray', linewidth=0.8)
-            ax.legend()
-            ax.grid(True)
-
-            st.pyplot(fig)
+            st.image(render_chart("cash_flow_chart", run_name, df["Year"].to_numpy(),
+                                  df["Total Revenue MM$"].to_numpy(), df["Escalated OPEX MM$"].to_numpy(),
+                                  df["Escalated CAPEX MM$"].to_numpy(), df["NCF MM$"].to_numpy()),
+                     width="stretch")
 
 with tab2:
-    if cost_schedule_file and prod_data_file and makeup_gas_file and st.session_state["recalculate"]:
+    if cost_schedule_file and prod_data_ready and makeup_gas_file and st.session_state["recalculate"]:
         st.header("Calculation Details (Step-by-Step)")
 
         st.subheader("CAPEX Breakdown:")
@@ -255,50 +322,37 @@ with tab3:
 
             st.session_state.input_makeup_gas_cost = makeup_gas_cost  # Store user input from main app scope
             
-            def run_case(oil_p, disc_rate, cost_boe, current_makeup_cost_for_case):
-                df_temp = df.copy()
-                df_temp["Oil Price $/STB"] = oil_p if fixed_price else oil_p * ((1 + inflation_oil) ** (df_temp["Year"] - start_year))
-                df_temp["Oil Revenue MM$"] = df_temp["Oil Prod STB"] * df_temp["Oil Price $/STB"] / 1e6
-                df_temp["Total Revenue MM$"] = (
-                    df_temp["Oil Revenue MM$"].fillna(0)
-                    + df_temp["Condensate Revenue MM$"].fillna(0)
-                    + df_temp["Gas Revenue MM$"].fillna(0)
-                )
-                df_temp["Cumulative Revenue"] = df_temp["Total Revenue MM$"].cumsum()
-
-                # Recalculate OPEX1 and OPEX2 (makeup gas) from scratch
-                df_temp["OPEX1 MM$"] = df_temp["BOE MMSTB"] * cost_boe  # Operating costs
-                df_temp["OPEX2 MM$"] = current_makeup_cost_for_case * makeup_gas_daily_mmscf * 365 * df_temp["Availability"] / 1e3  # Makeup gas cost (scenario-dependent)
-                df_temp["Total OPEX MM$"] = df_temp["OPEX1 MM$"] + df_temp["OPEX2 MM$"]  # Sum OPEX1 and OPEX2
-                df_temp["Escalated OPEX MM$"] = df_temp["Total OPEX MM$"] * df_temp["Inflation Factor %"]
-                df_temp["Escalated Cost MM$"] = df_temp["Escalated CAPEX MM$"] + df_temp["Escalated OPEX MM$"]
-                df_temp["Cumulative Escalated Cost"] = df_temp["Escalated Cost MM$"].cumsum()
-
-                df_temp["NCF MM$"] = df_temp["Total Revenue MM$"] - df_temp["Escalated Cost MM$"]
-                df_temp["Cumulative NCF"] = df_temp["NCF MM$"].cumsum()
-                df_temp["Discount Factor"] = 1 / ((1 + disc_rate) ** (df_temp["Year"] - start_year))
-                df_temp["Discounted NCF"] = df_temp["NCF MM$"] * df_temp["Discount Factor"]
-                npv = df_temp["Discounted NCF"].sum()
-                df_temp["Discounted CAPEX"] = df_temp["Escalated CAPEX MM$"] * df_temp["Discount Factor"]
-                npv_capex = df_temp["Discounted CAPEX"].sum()
-                cpi = npv / npv_capex if npv_capex != 0 else float("inf") # Or handle as 0 or NaN based on preference
-                total_capex = df_temp["Escalated CAPEX MM$"].sum()
-                pir = npv / total_capex if total_capex != 0 else 0 # Or handle as NaN
-                
+            def run_cases(case_inputs, current_makeup_cost_for_case):
+                # Low/Med/High evaluated together; only compact arrays are kept in session_state (the
+                # full cash-flow table of a case is rebuilt on demand below). Read from the result store
+                # (ECONOMICS_RESULT_STORE) when one is set; otherwise starts from the main result, so
+                # CAPEX and the other untouched series are reused: only the varied inputs are vectors,
+                # every other input keeps the main result's scalar
+                case_params = [dict(model_params, oil_price=oil_p, discount_rate=disc_rate, cost_per_boe=cost_boe,
+                                    makeup_gas_cost=current_makeup_cost_for_case)
+                               for oil_p, disc_rate, cost_boe in case_inputs]
+                params = dict(model_params, makeup_gas_cost=current_makeup_cost_for_case)
+                for k in ("oil_price", "discount_rate", "cost_per_boe"):
+                    params[k] = np.array([p[k] for p in case_params], dtype=float)
+                if store_path():
+                    result = evaluate_stored(build_schedule(df), params, start_year, fixed_price)
+                else:
+                    result = evaluate(build_schedule(df), params, start_year, fixed_price, keep_series=False,
+                                      with_cash_flow_metrics=True, previous=cash_flow_result)
+                indicators = {metric: np.array(result[key], dtype=float) for metric, key in SENSITIVITY_METRICS.items()}
+                indicators["IRR (%)"] *= 100
                 return {
-                    "NPV (MM$)": npv,
-                    "Total Revenue (MM$)": df_temp["Total Revenue MM$"].sum(),
-                    "Total Cost (MM$)": df_temp["Escalated Cost MM$"].sum(),
-                    "Cumulative NCF (MM$)": df_temp["Cumulative NCF"].iloc[-1] if not df_temp["Cumulative NCF"].empty else 0,
-                    "CPI": cpi,
-                    "PIR": pir,
-                    "DataFrame": df_temp
+                    "Inputs": (inputs_key, start_year, fixed_price),
+                    "Params": case_params,
+                    "Indicators": indicators,
+                    "Year": df["Year"].to_numpy(dtype=np.int16),
+                    "NCF": np.array(result["ncf"], dtype=float),
                 }
 
             # Initialize for accumulating results
             combined_txt_output = ""
             st.session_state.sensitivity_results = {}
-            run_name = prod_data_file.name.replace(".xlsx", "") if prod_data_file else "Run_Name"
+            run_name = run_name if prod_data_ready else "Run_Name"
 
             # --- Scenario 1: No Makeup Gas Cost ---
             label_no_gas = "No Makeup Gas Cost"
@@ -306,20 +360,17 @@ with tab3:
 
             st.write(f"Running analysis for: {label_no_gas} (Makeup Gas Cost: {makeup_cost_s1})") # Optional: for user feedback
 
-            results_s1 = {
-                "Low Case": run_case(low_oil_price, low_discount_rate, low_cost_per_boe, makeup_cost_s1),
-                "Med Case": run_case(oil_price, discount_rate, cost_per_boe, makeup_cost_s1),
-                "High Case": run_case(high_oil_price, high_discount_rate, high_cost_per_boe, makeup_cost_s1),
-            }
+            case_inputs = [(low_oil_price, low_discount_rate, low_cost_per_boe),
+                           (oil_price, discount_rate, cost_per_boe),
+                           (high_oil_price, high_discount_rate, high_cost_per_boe)]
+            results_s1 = run_cases(case_inputs, makeup_cost_s1)
             st.session_state.sensitivity_results[label_no_gas] = results_s1
 
             header_s1 = ["Run", "Units", "Low", "Mid", "High"]
             row_s1 = [
                 run_name,
                 "MMUSD",
-                f"{results_s1['Low Case']['NPV (MM$)']:.2f}",
-                f"{results_s1['Med Case']['NPV (MM$)']:.2f}",
-                f"{results_s1['High Case']['NPV (MM$)']:.2f}",
+                *(f"{npv:.2f}" for npv in results_s1["Indicators"]["NPV (MM$)"]),
             ]
             txt_output_s1 = "\t".join(header_s1) + "\n" + "\t".join(row_s1)
             combined_txt_output += f"\n--- {label_no_gas.upper()} ---\n" + txt_output_s1 + "\n"
@@ -330,20 +381,14 @@ with tab3:
 
             st.write(f"Running analysis for: {label_with_gas} (Makeup Gas Cost: {makeup_cost_s2})") # Optional: for user feedback
 
-            results_s2 = {
-                "Low Case": run_case(low_oil_price, low_discount_rate, low_cost_per_boe, makeup_cost_s2),
-                "Med Case": run_case(oil_price, discount_rate, cost_per_boe, makeup_cost_s2),
-                "High Case": run_case(high_oil_price, high_discount_rate, high_cost_per_boe, makeup_cost_s2),
-            }
+            results_s2 = run_cases(case_inputs, makeup_cost_s2)
             st.session_state.sensitivity_results[label_with_gas] = results_s2
 
             header_s2 = ["Run", "Units", "Low", "Mid", "High"]
             row_s2 = [
                 run_name,
                 "MMUSD",
-                f"{results_s2['Low Case']['NPV (MM$)']:.2f}",
-                f"{results_s2['Med Case']['NPV (MM$)']:.2f}",
-                f"{results_s2['High Case']['NPV (MM$)']:.2f}",
+                *(f"{npv:.2f}" for npv in results_s2["Indicators"]["NPV (MM$)"]),
             ]
             txt_output_s2 = "\t".join(header_s2) + "\n" + "\t".join(row_s2)
             combined_txt_output += f"\n--- {label_with_gas.upper()} ---\n" + txt_output_s2 + "\n"
@@ -354,7 +399,7 @@ with tab3:
 
     with col_download:
         if st.session_state.txt_outputs: # Checks if the string is non-empty
-            run_name_dl = prod_data_file.name.replace(".xlsx", "") if prod_data_file else "Run_Name" # Can redefine or use run_name from above
+            run_name_dl = run_name if prod_data_ready else "Run_Name" # Can redefine or use run_name from above
             st.download_button(
                 label="Download All Sensitivity Results",
                 data=st.session_state.txt_outputs,
@@ -363,48 +408,264 @@ with tab3:
             )
 
     if st.session_state.show_results:
-        display_run_name = prod_data_file.name.replace(".xlsx", "") if prod_data_file else "Run_Name"
+        display_run_name = run_name if prod_data_ready else "Run_Name"
 
         for label, results in st.session_state.sensitivity_results.items():
             st.subheader(f"Sensitivity Summary: {label}")
 
             col_table, col_plot = st.columns([1, 2]) # Renamed for clarity from col1, col2
             with col_table:
-                summary_data = {
-                    metric: [
-                        f"{results['Low Case'][metric]:,.2f}" if isinstance(results['Low Case'][metric], (int, float)) else results['Low Case'][metric],
-                        f"{results['Med Case'][metric]:,.2f}" if isinstance(results['Med Case'][metric], (int, float)) else results['Med Case'][metric],
-                        f"{results['High Case'][metric]:,.2f}" if isinstance(results['High Case'][metric], (int, float)) else results['High Case'][metric]
-                    ]
-                    for metric in ["NPV (MM$)", "Total Revenue (MM$)", "Total Cost (MM$)", "Cumulative NCF (MM$)", "CPI", "PIR"]
-                }
-                summary_df = pd.DataFrame(summary_data, index=["Low Case", "Med Case", "High Case"])
+                summary_data = {metric: [f"{value:,.2f}" for value in values]
+                                for metric, values in results["Indicators"].items()}
+                summary_df = pd.DataFrame(summary_data, index=SENSITIVITY_CASES)
                 st.table(summary_df)
 
             with col_plot:
-                fig, ax = plt.subplots()
-                for case, style, color, marker in [
-                    ("Low Case", "--", "blue", 'o'),
-                    ("Med Case", "-", "black", 's'),
-                    ("High Case", "--", "green", 'x'),
-                ]:
-                    # Ensure DataFrame exists and is not empty for plotting
-                    if "DataFrame" in results[case] and not results[case]["DataFrame"].empty:
-                        ax.plot(
-                            results[case]["DataFrame"]["Year"],
-                            results[case]["DataFrame"]["NCF MM$"],
-                            label=case,
-                            linestyle=style,
-                            color=color,
-                            marker=marker,
-                        )
-                    else:
-                        st.warning(f"No data to plot for {case} in {label}")
-
-                ax.set_xlabel("Year")
-                ax.set_ylabel("Net Cash Flow (MM$)")
-                ax.set_title(f"{display_run_name} - {label}", fontsize=11, fontweight='bold')
-                ax.axhline(0, color='gray', linewidth=0.8)
-                ax.grid(True)
-                ax.legend()
-                st.pyplot(fig)
+                case_series = [(case, results["Year"], ncf) for case, ncf in zip(SENSITIVITY_CASES, results["NCF"])]
+                st.image(render_chart("case_ncf_chart", f"{display_run_name} - {label}", case_series), width="stretch")
+
+            # Full cash-flow table of one case, built only when asked for (cached like the main table)
+            if st.toggle("Show cash-flow table", key=f"sensitivity_detail_{label}"):
+                case_index = st.radio("Case", range(len(SENSITIVITY_CASES)), format_func=lambda i: SENSITIVITY_CASES[i],
+                                      horizontal=True, key=f"sensitivity_case_{label}")
+                if "df" not in globals() or results["Inputs"] != (inputs_key, start_year, fixed_price):
+                    st.info("Inputs changed since this analysis ran; run it again to see its cash-flow tables.")
+                else:
+                    case_df, _, _ = compute_cash_flow(
+                        inputs_key, tuple(sorted(results["Params"][case_index].items())), start_year, fixed_price,
+                        merged_df, st.session_state.get("cash_flow_result"))
+                    st.dataframe(case_df)
+
+        st.caption(f"Session memory: sensitivity results {state_bytes(st.session_state.sensitivity_results) / 1024:,.1f} KB, "
+                   f"all session state {state_bytes(dict(st.session_state)) / 1024 ** 2:,.2f} MB")
+
+
+    # -------------------------------
+    # Tornado / spider sensitivity
+    # -------------------------------
+    st.header("Tornado & Spider Sensitivity")
+
+    label_to_var = {label: var for var, label in SENSITIVITY_VARIABLES.items()}
+    c_vars, c_span, c_steps = st.columns([3, 1, 1])
+    with c_vars:
+        oat_labels = st.multiselect("Inputs", list(label_to_var), default=list(label_to_var))
+    with c_span:
+        oat_span = st.number_input("Range (+/- %)", value=20.0, min_value=1.0, max_value=100.0) / 100
+    with c_steps:
+        oat_steps = st.number_input("Steps per Side", value=5, min_value=1, max_value=50)
+
+    if "df" in globals() and oat_labels:
+        oat = one_at_a_time(build_schedule(df), model_params, [label_to_var[l] for l in oat_labels],
+                            span=oat_span, steps=int(oat_steps), start_year=start_year, fixed_price=fixed_price)
+        oat_tornado = tornado_table(oat)
+        base_npv = float(oat.loc[oat["Change"].abs().idxmin(), "npv"])
+
+        col_tornado, col_spider = st.columns(2)
+        with col_tornado:
+            st.image(render_chart("tornado_chart", f"{run_name} - Tornado (+/-{oat_span:.0%})", oat_tornado, base_npv),
+                     width="stretch")
+        with col_spider:
+            st.image(render_chart("spider_chart", f"{run_name} - Spider", oat, len(oat_tornado)), width="stretch")
+
+        st.dataframe(oat_tornado.drop(columns="Variable").round(2))
+    else:
+        st.info("Run the main calculation to see the tornado and spider charts.")
+
+    # -------------------------------
+    # Probabilistic (Monte Carlo) NPV
+    # -------------------------------
+    st.header("Probabilistic NPV (Monte Carlo)")
+
+    if "mc_npv" not in st.session_state:
+        st.session_state.mc_npv = None
+
+    mc_defaults = {
+        "oil_price": (oil_price - 20, oil_price, oil_price + 20),
+        "discount_rate": (discount_rate - 0.03, discount_rate, discount_rate + 0.03),
+        "cost_per_boe": (cost_per_boe - 3, cost_per_boe, cost_per_boe + 3),
+        "inflation_cost": (max(inflation_cost - 0.02, 0.0), inflation_cost, inflation_cost + 0.02),
+        "facilities_total_cost": (facilities_total_cost * 0.8, facilities_total_cost, facilities_total_cost * 1.3),
+    }
+
+    mc_distributions = {}
+    for var, label in MC_VARIABLES.items():
+        low_d, mode_d, high_d = mc_defaults[var]
+        c_dist, c_low, c_mode, c_high = st.columns(4)
+        with c_dist:
+            dist = st.selectbox(label, DISTRIBUTIONS, index=2, key=f"mc_dist_{var}")
+        with c_low:
+            low = st.number_input("Low", value=float(low_d), key=f"mc_low_{var}", format="%.4f")
+        with c_mode:
+            mode = st.number_input("Most Likely", value=float(mode_d), key=f"mc_mode_{var}", format="%.4f")
+        with c_high:
+            high = st.number_input("High", value=float(high_d), key=f"mc_high_{var}", format="%.4f")
+        mc_distributions[var] = {"dist": dist, "low": low, "mode": mode, "high": high}
+
+    c_draws, c_chunk, c_seed = st.columns(3)
+    with c_draws:
+        n_draws = st.number_input("Number of Draws", value=100000, min_value=100, step=10000)
+    with c_chunk:
+        chunk_size = st.number_input("Chunk Size", value=10000, min_value=100, step=1000)
+    with c_seed:
+        mc_seed = st.number_input("Random Seed", value=42, step=1)
+
+    if st.button("Run Monte Carlo"):
+        try:
+            check_distributions(mc_distributions)
+            mc_error = None
+        except ValueError as e:
+            mc_error = str(e)
+        if "df" not in globals():
+            st.warning("Run the main calculation first (upload the files and press Calculate).")
+        elif mc_error:
+            st.error(mc_error)
+        else:
+            progress_bar = st.progress(0.0)
+            st.session_state.mc_npv = run_monte_carlo(
+                build_schedule(df), model_params, mc_distributions,
+                n_draws=int(n_draws), chunk_size=int(chunk_size),
+                start_year=start_year, fixed_price=fixed_price, seed=int(mc_seed),
+                progress=progress_bar.progress,
+            )
+
+    if st.session_state.mc_npv is not None:
+        mc_npv = st.session_state.mc_npv
+        mc_summary = summarize(mc_npv)
+
+        col_table, col_plot = st.columns([1, 2])
+        with col_table:
+            formats = {"P(NPV < 0)": "{:.1%}", "Draws": "{:,}"}
+            st.table({k: [formats.get(k, "{:,.2f}").format(v)] for k, v in mc_summary.items()})
+
+        with col_plot:
+            st.image(render_chart("npv_histogram", mc_npv, mc_summary["P90 NPV (MM$)"],
+                                  mc_summary["P50 NPV (MM$)"], mc_summary["P10 NPV (MM$)"]),
+                     width="stretch")
+
+    # -------------------------------
+    # Scenario grid (full factorial)
+    # -------------------------------
+    st.header("Scenario Grid")
+
+    if "grid_job" not in st.session_state:
+        st.session_state.grid_job = None
+
+    grid_labels = st.multiselect(f"Grid Inputs ({MIN_GRID_INPUTS} to {MAX_GRID_INPUTS})", list(label_to_var),
+                                 default=[SENSITIVITY_VARIABLES["oil_price"], SENSITIVITY_VARIABLES["discount_rate"]],
+                                 max_selections=MAX_GRID_INPUTS, key="grid_inputs")
+    default_points = {2: 50, 3: 20, 4: 10}.get(len(grid_labels), 10)
+    grid_ranges = {}
+    for label in grid_labels:
+        var = label_to_var[label]
+        c_low, c_high, c_points = st.columns(3)
+        with c_low:
+            low = st.number_input(f"{label} - Low", value=float(model_params[var]) * 0.8, key=f"grid_low_{var}", format="%.4f")
+        with c_high:
+            high = st.number_input(f"{label} - High", value=float(model_params[var]) * 1.2, key=f"grid_high_{var}", format="%.4f")
+        with c_points:
+            points = st.number_input(f"{label} - Points", value=default_points, min_value=2, max_value=5000, key=f"grid_points_{var}")
+        grid_ranges[var] = (low, high, points)
+    grid_size = int(np.prod([points for _, _, points in grid_ranges.values()])) if grid_ranges else 0
+
+    grid_job = st.session_state.grid_job
+    grid_running = grid_job is not None and grid_job["status"] == "running"
+    c_grid_run, c_grid_cancel = st.columns([3, 1])
+    with c_grid_run:
+        too_large = grid_size > MAX_GRID_SCENARIOS
+        if too_large:
+            st.warning(f"{grid_size:,} scenarios; reduce the points to at most {MAX_GRID_SCENARIOS:,} in total.")
+        if st.button(f"Run Grid ({grid_size:,} scenarios)",
+                     disabled=grid_running or too_large or len(grid_ranges) < MIN_GRID_INPUTS):
+            if "df" not in globals():
+                st.warning("Run the main calculation first (upload the files and press Calculate).")
+            else:
+                # Evaluated in a background thread; the page keeps responding meanwhile
+                grid_job = start_grid_job(build_schedule(df), model_params, grid_axes(grid_ranges),
+                                          start_year=start_year, fixed_price=fixed_price)
+                st.session_state.grid_job = grid_job
+                grid_running = True
+    with c_grid_cancel:
+        if st.button("Cancel Grid", disabled=not grid_running):
+            cancel_grid_job(grid_job)
+
+    @st.fragment(run_every=0.5)
+    def grid_progress():
+        # Polls the worker; a full rerun shows the results once it stops
+        job = st.session_state.grid_job
+        if job["status"] != "running":
+            st.rerun()
+        st.progress(job["progress"], text=f"Evaluating the scenario grid... {job['progress']:.0%}")
+
+    if grid_running:
+        grid_progress()
+    elif grid_job is not None and grid_job["status"] == "failed":
+        st.error(f"Scenario grid failed: {grid_job['error']}")
+    elif grid_job is not None and grid_job["npv"] is not None and np.isnan(grid_job["npv"]).all():
+        st.warning("Scenario grid cancelled before any scenario was evaluated.")
+    elif grid_job is not None and grid_job["npv"] is not None:
+        grid_names = list(grid_job["axes"])
+        grid_npv = grid_job["npv"]
+        if grid_job["status"] == "cancelled":
+            st.warning(f"Cancelled at {grid_job['progress']:.0%}; scenarios not evaluated are left blank.")
+        st.caption(f"{grid_npv.size:,} scenarios in {grid_job['seconds']:.2f} s; "
+                   f"NPV {np.nanmin(grid_npv):,.2f} to {np.nanmax(grid_npv):,.2f} MM$, "
+                   f"{np.mean(grid_npv[~np.isnan(grid_npv)] < 0):.1%} below zero")
+
+        # Heatmap of the first two inputs; the others are fixed at the chosen grid values
+        fixed_index = []
+        for var in grid_names[2:]:
+            values = grid_job["axes"][var]
+            fixed_index.append(st.select_slider(SENSITIVITY_VARIABLES[var], options=list(range(len(values))),
+                                                value=len(values) // 2, format_func=lambda i, v=values: f"{v[i]:,.4g}",
+                                                key=f"grid_slice_{var}"))
+        x_var, y_var = grid_names[0], grid_names[1]
+        grid_slice = grid_npv[(slice(None), slice(None)) + tuple(fixed_index)].T  # (y, x)
+        st.image(render_chart("npv_heatmap", f"{run_name} - NPV Scenario Grid",
+                              SENSITIVITY_VARIABLES[x_var], grid_job["axes"][x_var],
+                              SENSITIVITY_VARIABLES[y_var], grid_job["axes"][y_var], grid_slice),
+                 width="stretch")
+
+        st.download_button(
+            label="Download Scenario Grid (CSV)",
+            data=lambda job=grid_job: grid_frame(job["axes"], job["npv"]).rename(columns=SENSITIVITY_VARIABLES).to_csv(index=False),
+            file_name=f"{run_name}_scenario_grid.csv",
+            mime="text/csv",
+        )
+
+    # -------------------------------
+    # Break-even
+    # -------------------------------
+    st.header("Break-even Analysis")
+
+    be_label_to_var = {label: var for var, label in BREAK_EVEN_INPUTS.items()}
+    c_be_inputs, c_be_low, c_be_high = st.columns([3, 1, 1])
+    with c_be_inputs:
+        be_labels = st.multiselect("Solve For", list(be_label_to_var), default=list(be_label_to_var)[:3])
+    with c_be_low:
+        be_low = st.number_input("Lowest Discount Rate (%)", value=0.0, min_value=0.0, max_value=100.0) / 100
+    with c_be_high:
+        be_high = st.number_input("Highest Discount Rate (%)", value=30.0, min_value=0.0, max_value=100.0) / 100
+
+    if "df" in globals() and be_labels and be_high > be_low:
+        # Value of each input that makes NPV zero, the other inputs at their current values
+        be_inputs = [be_label_to_var[l] for l in be_labels]
+        be_schedule = build_schedule(df)
+        be_table = break_even(be_schedule, model_params, be_inputs, np.linspace(be_low, be_high, 61),
+                              start_year, fixed_price)
+        be_current = break_even(be_schedule, model_params, be_inputs, [discount_rate], start_year, fixed_price)
+
+        st.table({BREAK_EVEN_INPUTS[var]: ["n/a" if np.isnan(value) else f"{value:,.4g}"]
+                  for var, value in be_current.iloc[0, 1:].items()})
+        st.caption(f"At the current discount rate ({discount_rate:.1%}); n/a: NPV does not depend on the input in "
+                   "this case, or has no zero in the search range.")
+        st.image(render_chart("break_even_chart", f"{run_name} - Break-even vs Discount Rate", be_table, discount_rate),
+                 width="stretch")
+        st.dataframe(be_table.rename(columns=BREAK_EVEN_INPUTS), hide_index=True)
+    elif "df" in globals() and be_labels:
+        st.warning("The highest discount rate must be above the lowest.")
+    else:
+        st.info("Run the main calculation to see break-even values.")
+
+
+# Stage trace of this rerun when PIPELINE_TRACE names a folder (see instrumentation.py)
+finish("3_Eco_App", quiet=True)
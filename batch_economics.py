@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from eco_engine import DEFAULT_PARAMS, build_schedule, evaluate, indicators_frame, merge_inputs
+from production_store import list_runs, load_run
+from result_store import DEFAULT_STORE_MB, evaluate_stored, store_path
+from result_store import enable as enable_result_store
+from instrumentation import add_spans, collect, enable, enabled, finish, span, traced
+
+# Headless batch economics: every case of a study evaluated for every parameter scenario.
+# Production comes from the per-run workbooks of 1_Prod_Data_Prep.py (or its Parquet store),
+# schedules from the *_summary.xlsx files of 2_Multiple_Workover_Extraction.py; the two are
+# matched by normalized case name. Cases run in parallel; the result is one ranked table.
+#
+# Parameter file (JSON), values in eco_engine units (costs in $, rates as fractions):
+# {"start_year": 2023, "fixed_price": true,
+#  "base": {"oil_price": 60, ...},
+#  "scenarios": {"Low": {"oil_price": 50}, "Mid": {}, "High": {"oil_price": 70}}}
+
+SUMMARY_SUFFIX = "_summary.xlsx"
+
+
+def normalize_case_name(name):
+    return re.sub(r"[\s\-]+", "_", name.strip()).upper()
+
+
+def load_parameter_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    unknown = set(config.get("base", {})) | {k for s in config.get("scenarios", {}).values() for k in s}
+    unknown -= set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"Unknown parameters in {path}: {', '.join(sorted(unknown))}")
+    config.setdefault("start_year", 2023)
+    config.setdefault("fixed_price", True)
+    config.setdefault("base", {})
+    config.setdefault("scenarios", {"Base": {}})
+    return config
+
+
+def parameter_template():
+    return {"start_year": 2023, "fixed_price": True, "base": dict(DEFAULT_PARAMS),
+            "scenarios": {"Low": {"oil_price": 50.0, "discount_rate": 0.15, "cost_per_boe": 12.0},
+                          "Mid": {},
+                          "High": {"oil_price": 70.0, "discount_rate": 0.05, "cost_per_boe": 7.0}}}
+
+
+def find_production_sources(production):
+    # {normalized case: (display name, source)}; source is a workbook path or (store, run)
+    sources = {}
+    if os.path.isfile(production) and production.endswith(".parquet"):
+        for run in list_runs(production):
+            sources[normalize_case_name(run)] = (run, (production, run))
+    else:
+        for file in sorted(os.listdir(production)):
+            if file.endswith(".xlsx") and not file.startswith("~$"):
+                run = os.path.splitext(file)[0]
+                sources[normalize_case_name(run)] = (run, os.path.join(production, file))
+    return sources
+
+
+def find_schedules(schedules_dir):
+    schedules = {}
+    for subdir, _, files in os.walk(schedules_dir):
+        for file in files:
+            if file.endswith(SUMMARY_SUFFIX):
+                schedules[normalize_case_name(file[:-len(SUMMARY_SUFFIX)])] = os.path.join(subdir, file)
+    return schedules
+
+
+def scenario_params(config):
+    # One vector per parameter, one element per scenario
+    names = list(config["scenarios"])
+    params = {}
+    for key in DEFAULT_PARAMS:
+        base = config["base"].get(key, DEFAULT_PARAMS[key])
+        params[key] = np.array([config["scenarios"][s].get(key, base) for s in names], dtype=float)
+    return names, params
+
+
+def yearly_frame(case, names, years, result):
+    # Long table of the yearly vectors portfolio.py selects on, one block per scenario
+    n_scenarios, n_years = result["discounted_ncf"].shape
+    return pd.DataFrame({
+        "Case": case,
+        "Scenario": np.repeat(names, n_years),
+        "Year": np.tile(years, n_scenarios),
+        "Escalated CAPEX MM$": result["escalated_capex"].ravel(),
+        "Discounted NCF": result["discounted_ncf"].ravel(),
+    })
+
+
+def evaluate_schedule(case, schedule, config, yearly=False):
+    # All scenarios of one case in a single vectorized evaluation -> (indicators, yearly vectors or None)
+    # (through the result store when one is set: stored scenarios are lookups)
+    names, params = scenario_params(config)
+    if store_path():
+        result = evaluate_stored(schedule, params, config["start_year"], config["fixed_price"])
+    else:
+        result = evaluate(schedule, params, config["start_year"], config["fixed_price"],
+                          keep_series=yearly, with_cash_flow_metrics=True)
+    table = indicators_frame(result)
+    table.insert(0, "Scenario", names)
+    table.insert(0, "Case", case)
+    series = yearly_frame(case, names, schedule["year"], result) if yearly else None
+    return table, series
+
+
+def load_case_schedule(production_source, schedule_path, gas_df):
+    # Production (workbook path or (store, run)) + "Final Structured Data" schedule -> engine arrays
+    if isinstance(production_source, tuple):
+        prod_df = load_run(*production_source)
+    else:
+        prod_df = pd.read_excel(production_source)
+    cost_df = pd.read_excel(schedule_path, sheet_name="Final Structured Data")
+    return build_schedule(merge_inputs(cost_df, prod_df, gas_df))
+
+
+def evaluate_case(case, production_source, schedule_path, gas_df, config, yearly=False):
+    # Errors are reported, not raised. Returns (indicators, yearly vectors or None, error, seconds).
+    start = time.perf_counter()
+    try:
+        with span("read_case_inputs", bytes=os.path.getsize(schedule_path)):
+            schedule = load_case_schedule(production_source, schedule_path, gas_df)
+
+        table, series = evaluate_schedule(case, schedule, config, yearly)
+        return table, series, None, time.perf_counter() - start
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def evaluate_case_traced(*job):
+    # Pool entry point when tracing: the worker's stage spans travel back with the outcome
+    with collect() as spans:
+        outcome = evaluate_case(*job)
+    return outcome + (spans,)
+
+
+def rank_results(table):
+    table = table.copy()
+    table["NPV Rank"] = table.groupby("Scenario")["NPV (MM$)"].rank(ascending=False, method="min").astype(int)
+    return table.sort_values(["Scenario", "NPV Rank", "Case"]).reset_index(drop=True)
+
+
+def run_case_jobs(jobs, worker, traced_worker, workers=None):
+    # jobs: argument tuples starting with the case name; worker(*job) returns
+    # (indicators, yearly vectors or None, error, seconds) and traced_worker the same plus spans.
+    # Returns (ranked indicators, errors, yearly vectors)
+    tables, series, errors = [], [], []
+    total = len(jobs)
+
+    def report(case, outcome):
+        table, case_series, error, seconds = outcome[:4]
+        add_spans(outcome[4] if len(outcome) > 4 else None)
+        if error:
+            errors.append({"Case": case, "Error": error})
+            print(f"[{len(tables) + len(errors)}/{total}] FAILED {case} ({error})")
+        else:
+            tables.append(table)
+            if case_series is not None:
+                series.append(case_series)
+            print(f"[{len(tables) + len(errors)}/{total}] {case} ({seconds:.2f} s)")
+
+    if workers == 1 or total <= 1:
+        for job in jobs:
+            report(job[0], worker(*job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pool_worker = traced_worker if enabled() else worker
+            futures = {executor.submit(pool_worker, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    outcome = future.result()
+                except Exception as e:  # worker process died
+                    outcome = (None, None, f"{type(e).__name__}: {e}", 0.0)
+                report(futures[future], outcome)
+
+    # Workers finish in any order: the yearly vectors and errors are put in case order (a stable
+    # sort keeps each case's scenario and year order), so the outputs are the same on every run
+    ranked = rank_results(pd.concat(tables, ignore_index=True)) if tables else pd.DataFrame()
+    yearly_table = pd.concat(series, ignore_index=True) if series else pd.DataFrame()
+    if not yearly_table.empty:
+        yearly_table = yearly_table.sort_values("Case", kind="stable").reset_index(drop=True)
+    errors = pd.DataFrame(errors, columns=["Case", "Error"]).sort_values("Case", kind="stable").reset_index(drop=True)
+    return ranked, errors, yearly_table
+
+
+def run_batch(production, schedules_dir, makeup_gas_file, config, workers=None, yearly=False):
+    # Returns (ranked indicators, errors, yearly vectors); the last is empty unless yearly=True
+    productions = find_production_sources(production)
+    schedules = find_schedules(schedules_dir)
+    gas_df = pd.read_excel(makeup_gas_file)
+
+    matched = sorted(set(productions) & set(schedules))
+    for key in sorted(set(productions) - set(schedules)):
+        print(f"No schedule for production run {productions[key][0]}")
+    for key in sorted(set(schedules) - set(productions)):
+        print(f"No production run for schedule {schedules[key]}")
+
+    jobs = [(productions[k][0], productions[k][1], schedules[k], gas_df, config, yearly) for k in matched]
+    return run_case_jobs(jobs, evaluate_case, evaluate_case_traced, workers)
+
+
+@traced(bytes_out=lambda ranked, errors, output: os.path.getsize(output))
+def save_results(ranked, errors, output):
+    if output.endswith(".csv"):
+        ranked.to_csv(output, index=False)
+        if not errors.empty:
+            errors.to_csv(os.path.splitext(output)[0] + "_errors.csv", index=False)
+    else:
+        with pd.ExcelWriter(output) as writer:
+            ranked.to_excel(writer, sheet_name="Ranked Results", index=False)
+            if not ranked.empty:
+                for scenario, group in ranked.groupby("Scenario", sort=False):
+                    group.to_excel(writer, sheet_name=f"Rank - {scenario}"[:31], index=False)
+            errors.to_excel(writer, sheet_name="Errors", index=False)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the economics of every case in a study")
+    parser.add_argument("--production", help="folder of per-run production workbooks or a Parquet store")
+    parser.add_argument("--schedules", help="folder searched for *_summary.xlsx schedule workbooks")
+    parser.add_argument("--makeup-gas", help="make-up gas schedule workbook")
+    parser.add_argument("--params", help="parameter JSON file (see --write-params-template)")
+    parser.add_argument("--output", default="ranked_economics.xlsx", help=".xlsx or .csv")
+    parser.add_argument("--yearly-output", metavar="PATH",
+                        help="also write yearly escalated CAPEX and discounted NCF per case (.xlsx/.csv) for portfolio.py")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (1 = sequential)")
+    parser.add_argument("--trace", metavar="DIR", help="write a stage timing trace (JSON) to this folder")
+    parser.add_argument("--result-store", metavar="PATH",
+                        help="persistent result store (SQLite): scenarios evaluated before are read from it")
+    parser.add_argument("--result-store-mb", type=float, default=DEFAULT_STORE_MB,
+                        help="size limit of the result store; least recently used results are evicted")
+    parser.add_argument("--write-params-template", metavar="PATH", help="write an example parameter file and exit")
+    args = parser.parse_args()
+
+    if args.write_params_template:
+        with open(args.write_params_template, "w", encoding="utf-8") as f:
+            json.dump(parameter_template(), f, indent=2)
+        print(f"Wrote {args.write_params_template}")
+    else:
+        if not (args.production and args.schedules and args.makeup_gas):
+            parser.error("--production, --schedules and --makeup-gas are required")
+        if args.trace:
+            enable(args.trace)
+        if args.result_store:
+            enable_result_store(args.result_store, args.result_store_mb)
+        config = load_parameter_file(args.params) if args.params else parameter_template()
+        start = time.perf_counter()
+        ranked, errors, yearly = run_batch(args.production, args.schedules, args.makeup_gas, config, args.workers,
+                                           yearly=bool(args.yearly_output))
+        save_results(ranked, errors, args.output)
+        if args.yearly_output:
+            if args.yearly_output.endswith(".csv"):
+                yearly.to_csv(args.yearly_output, index=False)
+            else:
+                yearly.to_excel(args.yearly_output, index=False)
+        print(f"Evaluated {ranked['Case'].nunique() if not ranked.empty else 0} cases x "
+              f"{len(config['scenarios'])} scenarios in {time.perf_counter() - start:.1f} s -> {args.output}")
+        finish("batch_economics", production=args.production, schedules=args.schedules)
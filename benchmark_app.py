@@ -0,0 +1,105 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Start-up and rerun latency of 3_Eco_App.py against a latency budget.
+# The app is driven headless with streamlit's AppTest; the file uploaders are fed from a folder
+# holding the three input workbooks (default: "Economics Test files"). Exits with status 1 when
+# a step exceeds its budget.
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Seconds; cold start is a fresh process importing the app's modules and running the page once
+BUDGETS = {
+    "import (fresh process)": 2.0,
+    "cold start (first page run)": 1.5,
+    "calculate": 4.0,
+    "rerun (no change)": 0.75,
+    "rerun (oil price changed)": 2.5,  # recomputes and redraws the cash-flow, tornado and spider charts
+    "rerun (oil price changed back)": 0.75,  # every chart comes from the cache
+}
+
+UPLOADS = {"prod": "Production_Data.xlsx", "cost": "Drilling_Workover_&_Facilities_Schedule.xlsx",
+           "gas": "Makeup_Gas_Schedule.xlsx"}
+
+# Page wrapper: replaces st.file_uploader with the workbooks of the inputs folder, then runs the app
+WRAPPER = '''
+import io, os, sys
+import streamlit as st
+sys.path.insert(0, {app_dir!r})
+class Upload(io.BytesIO):
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            super().__init__(f.read())
+        self.name = os.path.basename(path)
+st.file_uploader = lambda label, type=None, key=None, **kwargs: Upload(os.path.join({inputs!r}, {uploads!r}[key]))
+with open({app!r}, encoding="utf-8") as f:
+    exec(compile(f.read(), "3_Eco_App.py", "exec"))
+'''
+
+# Modules the app imports, timed in a fresh interpreter (what a new server process pays)
+IMPORT_CHECK = ("import time; t = time.perf_counter(); import streamlit, pandas, numpy, eco_engine, charts, "
+                "sensitivity, monte_carlo, scenario_grid, break_even, result_store, production_store; "
+                "print(time.perf_counter() - t); "
+                "print('matplotlib' in __import__('sys').modules)")
+
+
+def timed_run(at, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    seconds = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return seconds
+
+
+def measure(inputs_dir, timeout=60):
+    from streamlit.testing.v1 import AppTest
+
+    timings = {}
+    out = subprocess.run([sys.executable, "-c", IMPORT_CHECK], cwd=APP_DIR, capture_output=True, text=True, check=True)
+    seconds, matplotlib_loaded = out.stdout.split()
+    timings["import (fresh process)"] = float(seconds)
+
+    script = WRAPPER.format(app_dir=APP_DIR, inputs=os.path.abspath(inputs_dir), uploads=UPLOADS,
+                            app=os.path.join(APP_DIR, "3_Eco_App.py"))
+    at = AppTest.from_string(script, default_timeout=timeout)
+    timings["cold start (first page run)"] = timed_run(at, timeout)
+
+    next(b for b in at.button if b.label == "Calculate").click()
+    timings["calculate"] = timed_run(at, timeout)
+    timings["rerun (no change)"] = timed_run(at, timeout)
+
+    oil = next(w for w in at.number_input if w.label == "Oil Price ($/bbl)")
+    base_value = oil.value
+    oil.set_value(base_value + 5)
+    timings["rerun (oil price changed)"] = timed_run(at, timeout)
+    next(w for w in at.number_input if w.label == "Oil Price ($/bbl)").set_value(base_value)
+    timings["rerun (oil price changed back)"] = timed_run(at, timeout)
+    return timings, matplotlib_loaded == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure 3_Eco_App.py start-up and rerun latency")
+    parser.add_argument("--inputs", default=os.path.join(APP_DIR, "Economics Test files"),
+                        help="folder with the production, schedule and make-up gas workbooks")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slower machines)")
+    args = parser.parse_args()
+
+    timings, matplotlib_at_import = measure(args.inputs)
+    over = []
+    for step, seconds in timings.items():
+        budget = BUDGETS[step] * args.scale
+        status = "ok" if seconds <= budget else "OVER"
+        if seconds > budget:
+            over.append(step)
+        print(f"  {step:<32s} {seconds:7.3f} s  (budget {budget:.2f} s)  {status}")
+    print(f"  matplotlib imported at start-up: {'yes' if matplotlib_at_import else 'no'}")
+    if over:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import argparse
+import os
+import re
+import tempfile
+import time
+
+import pandas as pd
+
+from script_loader import WORKOVER_EXTRACTION, load_script
+from synthetic_data import write_synthetic_prt
+
+# Throughput benchmark (MB/s) of extract_prt_data against the original readlines/regex
+# implementation, on a synthetic .PRT file.
+
+
+def readlines_extract_prt_data(file_path):
+    # Original implementation, kept here as the reference for speed and output
+    with open(file_path, "r", encoding="utf-8") as file:
+        lines = file.readlines()
+
+    data = []
+    opening_data = []
+
+    for i in range(len(lines) - 1):
+        if "@--Message at" in lines[i] and "@ Closing connection" in lines[i + 1]:
+            days_match = re.search(r"@--Message at (\d+\.\d+) Days\s+([\d]+ \w+ \d{4})", lines[i])
+            conn_match = re.search(r"@ Closing connection \((\d+),\s*(\d+),\s*(\d+)\) in well (\S+)", lines[i + 1])
+            var_match = re.search(r"@ well (.+?) is above limit", lines[i + 2]) if i + 2 < len(lines) else None
+            limit_match = re.search(r"@ Value is ([\d\.]+), limit is ([\d\.]+)", lines[i + 3]) if i + 3 < len(lines) else None
+
+            if days_match and conn_match and var_match and limit_match:
+                days, date = days_match.groups()
+                x, y, z, well = conn_match.groups()
+                variable = var_match.group(1)
+                value, limit = limit_match.groups()
+
+                data.append([float(days), date, well, variable, float(value), float(limit), "Closing"])
+
+        elif "@--Message at" in lines[i] and "@ Opening connection" in lines[i + 1]:
+            days_match = re.search(r"@--Message at (\d+\.\d+) Days\s+([\d]+ \w+ \d{4})", lines[i])
+            opening_match = re.search(r"@ Opening connection (\d+) in well (\S+)", lines[i + 1])
+
+            if days_match and opening_match:
+                days, date = days_match.groups()
+                conn_id, well = opening_match.groups()
+                opening_data.append([float(days), date, well, conn_id, "Opening"])
+
+    closing_df = pd.DataFrame(data, columns=["Days", "Date", "Well", "Variable", "Value", "Limit", "Event"])
+    opening_df = pd.DataFrame(opening_data, columns=["Days", "Date", "Well", "Connection_ID", "Event"])
+
+    return closing_df, opening_df
+
+
+def as_plain(df, workover):
+    # Typed event table -> the original layout (string columns, float64 values, no Year)
+    df = workover.excel_floats(df.drop(columns="Year"))
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype) or column == "Connection_ID":
+            df[column] = df[column].astype(str)
+    return df
+
+
+def time_extractor(extractor, file_path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extractor(file_path)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark .PRT event extraction throughput")
+    parser.add_argument("--file", help="existing .PRT file (default: generate a synthetic one)")
+    parser.add_argument("--size-mb", type=int, default=100, help="size of the synthetic file")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    workover = load_script(WORKOVER_EXTRACTION)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = args.file
+        if file_path is None:
+            file_path = os.path.join(tmp, "SYNTHETIC.PRT")
+            write_synthetic_prt(file_path, args.size_mb)
+        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+
+        old_time, old_result = time_extractor(readlines_extract_prt_data, file_path, args.repeat)
+        new_time, new_result = time_extractor(workover.extract_prt_data, file_path, args.repeat)
+
+        for old, new in zip(old_result, new_result):
+            pd.testing.assert_frame_equal(old, as_plain(new, workover), check_dtype=False)
+
+    print(f"File size:          {size_mb:,.1f} MB")
+    print(f"Closing / opening:  {len(new_result[0]):,} / {len(new_result[1]):,} events")
+    print(f"readlines + regex:  {old_time:.2f} s  ({size_mb / old_time:,.1f} MB/s)")
+    print(f"mmap state machine: {new_time:.2f} s  ({size_mb / new_time:,.1f} MB/s)")
+    print(f"Speed-up:           {old_time / new_time:.1f}x")
+    old_bytes = sum(df.memory_usage(deep=True).sum() for df in old_result)
+    new_bytes = sum(df.memory_usage(deep=True).sum() for df in new_result)
+    n_events = len(new_result[0]) + len(new_result[1])
+    print(f"Memory per event:   {old_bytes / n_events:,.1f} -> {new_bytes / n_events:,.1f} bytes")
+
+
+if __name__ == "__main__":
+    main()
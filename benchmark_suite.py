@@ -0,0 +1,179 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import eco_engine
+from script_loader import PROD_DATA_PREP, WORKOVER_EXTRACTION, load_script
+from synthetic_data import write_summary_file, write_synthetic_prt
+
+# Benchmarks of every pipeline stage on synthetic data, per size tier.
+# Each stage is timed (best of --repeat) and then run once more under tracemalloc for its
+# peak Python/NumPy allocation. Results go to a JSON file; --compare checks them against a
+# saved baseline and exits with status 1 when a stage got slower than the tolerance.
+
+TIERS = {
+    "small": {"runs": 20, "prt_mb": 5, "scenarios": 1_000},
+    "medium": {"runs": 200, "prt_mb": 50, "scenarios": 10_000},
+    "large": {"runs": 2_000, "prt_mb": 500, "scenarios": 100_000},
+}
+
+
+def measure(func, repeat):
+    # The scripts print per-file progress; keep it out of the benchmark output
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = func()
+            best = min(best, time.perf_counter() - start)
+
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return best, peak, result
+
+
+def record(results, stage, seconds, peak, mb=None, rows=None):
+    entry = {"seconds": round(seconds, 4), "peak_mb": round(peak / 1024 ** 2, 2)}
+    if mb is not None:
+        entry["input_mb"] = round(mb, 2)
+        entry["mb_per_s"] = round(mb / seconds, 2)
+    if rows is not None:
+        entry["rows"] = int(rows)
+        entry["rows_per_s"] = round(rows / seconds, 1)
+    results[stage] = entry
+    print(f"  {stage:<42s} {seconds:8.3f} s  {entry['peak_mb']:9.1f} MB peak"
+          + (f"  {entry['mb_per_s']:8.1f} MB/s" if mb is not None else "")
+          + (f"  {entry['rows_per_s']:12,.0f} rows/s" if rows is not None else ""))
+
+
+def run_tier(tier, settings, repeat, work_dir):
+    prod = load_script(PROD_DATA_PREP)
+    workover = load_script(WORKOVER_EXTRACTION)
+    results = {}
+    print(f"[{tier}]")
+
+    # Stage 1: summary parsing and yearly changes
+    summary_path = os.path.join(work_dir, f"{tier}_Prod_all_cases.txt")
+    write_summary_file(summary_path, runs=settings["runs"])
+    summary_mb = os.path.getsize(summary_path) / 1024 ** 2
+
+    seconds, peak, data = measure(lambda: prod.read_simulation_data(summary_path), repeat)
+    record(results, "read_simulation_data", seconds, peak, mb=summary_mb,
+           rows=sum(len(df) for df in data.values()))
+
+    excel_dir = os.path.join(work_dir, f"{tier}_excel")
+    os.makedirs(excel_dir, exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(excel_dir)
+    try:
+        fresh = lambda: {run: df.copy() for run, df in data.items()}  # noqa: E731
+        seconds, peak, _ = measure(lambda: prod.calculate_yearly_changes_and_save(fresh()), 1)
+        record(results, "calculate_yearly_changes_and_save (excel)", seconds, peak, rows=len(data))
+        try:
+            import pyarrow  # noqa: F401
+            seconds, peak, _ = measure(lambda: prod.calculate_yearly_changes_and_save(fresh(), output="parquet"), repeat)
+            record(results, "calculate_yearly_changes_and_save (parquet)", seconds, peak, rows=len(data))
+        except ImportError:
+            pass
+    finally:
+        os.chdir(cwd)
+
+    # Stage 2: .PRT extraction and the workover aggregation chain
+    prt_path = os.path.join(work_dir, f"{tier}_CASE_BDPRODUCERS_2029.PRT")
+    write_synthetic_prt(prt_path, settings["prt_mb"])
+    prt_mb = os.path.getsize(prt_path) / 1024 ** 2
+
+    seconds, peak, (df_closing, df_opening) = measure(lambda: workover.extract_prt_data(prt_path), repeat)
+    record(results, "extract_prt_data", seconds, peak, mb=prt_mb, rows=len(df_closing) + len(df_opening))
+
+    def workover_chain():
+        connections = workover.compute_connections_per_well(df_closing.copy(), df_opening.copy())
+        workovers = workover.compute_workovers_per_year(connections)
+        adjusted = workover.enforce_max_workover(workovers)
+        return workover.generate_final_dataframe(adjusted, os.path.basename(prt_path))
+
+    seconds, peak, _ = measure(workover_chain, repeat)
+    record(results, "workover aggregation chain", seconds, peak, rows=len(df_closing) + len(df_opening))
+
+    # Stage 3: economics for a batch of scenarios on one run's schedule
+    run_df = prod.calculate_yearly_changes(next(iter(data)), next(iter(data.values())).copy())
+    schedule_df = workover_chain().merge(run_df, on="Year")
+    schedule_df["Availability"] = 1.0
+    schedule_df = schedule_df.rename(columns={"Drilling of Vertical Wells": "Planned Vertical Wells",
+                                              "Drilling of Horizontal Wells": "Planned Horizontal Wells",
+                                              "Oil": "Oil Prod STB", "Condensate": "Cond Prod STB",
+                                              "Gas": "Gas Prod SCF"})
+    schedule_df["Facilities Payment Schedule (%)"] = schedule_df["Facilities Payment Schedule (%)"] / 100
+    schedule = eco_engine.build_schedule(schedule_df)
+
+    seconds, peak, _ = measure(lambda: eco_engine.cash_flow_table(schedule_df), repeat)
+    record(results, "economics cash_flow_table (1 scenario)", seconds, peak, rows=1)
+
+    n = settings["scenarios"]
+    rng = np.random.default_rng(0)
+    params = {"oil_price": rng.uniform(40, 90, n), "discount_rate": rng.uniform(0.05, 0.15, n)}
+    seconds, peak, _ = measure(lambda: eco_engine.evaluate(schedule, params, keep_series=False), repeat)
+    record(results, f"economics evaluate ({n:,} scenarios)", seconds, peak, rows=n)
+
+    return results
+
+
+def compare(results, baseline, tolerance, min_delta=0.05):
+    # A stage regresses when it is slower by more than tolerance and by at least min_delta s
+    regressions = []
+    for tier, stages in results.items():
+        for stage, entry in stages.items():
+            old = baseline.get("tiers", {}).get(tier, {}).get(stage)
+            if old and entry["seconds"] > old["seconds"] * (1 + tolerance) and entry["seconds"] - old["seconds"] > min_delta:
+                regressions.append(f"{tier} / {stage}: {old['seconds']:.3f} s -> {entry['seconds']:.3f} s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark all pipeline stages on synthetic data")
+    parser.add_argument("--tiers", nargs="+", choices=list(TIERS), default=["small", "medium"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", metavar="BASELINE", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slow-down before failing")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for tier in args.tiers:
+            results[tier] = run_tier(tier, TIERS[tier], args.repeat, work_dir)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "tiers": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("Regressions:")
+            for line in regressions:
+                print("  " + line)
+            raise SystemExit(1)
+        print("No regressions against " + args.compare)
+
+
+if __name__ == "__main__":
+    main()
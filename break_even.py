@@ -0,0 +1,227 @@
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from eco_engine import SCHEDULE_COLUMNS, broadcast_params, evaluate
+
+# Break-even values: the value of one model input that makes NPV zero, for a sweep of discount
+# rates and for many runs.
+# NPV is affine in every input of LINEAR_INPUTS: each scales a yearly revenue or cost term, and
+# escalation, price inflation and discounting multiply those terms by factors that do not depend
+# on the input. So two evaluated NCF vectors per input (input at 0 and at one step) give
+#   NPV(x, r) = DF(r) . ncf0 + x * DF(r) . slope
+# for every discount rate r at once, and the break-even is -a / b (NaN when NPV does not depend
+# on the input). Inputs that enter nonlinearly (inflation rates, gas conversion factor) are solved
+# by a batched Illinois false-position search inside a bracket, all discount rates together.
+# Several runs are solved in the same evaluations: their schedules are stacked on a common year
+# axis (a run's missing years are zero and add nothing to its cash flow), one row per run.
+
+# Inputs offered as break-even targets, with the app's labels. Price inputs give the lowest
+# viable value, cost inputs the highest tolerable one.
+BREAK_EVEN_INPUTS = {
+    "oil_price": "Break-even Oil Price ($/bbl)",
+    "cost_per_boe": "Maximum Cost per BOE ($/BOE)",
+    "facilities_total_cost": "Maximum Facilities Cost ($)",
+    "gas_price": "Break-even Gas Price ($/MMSCF)",
+    "condensate_price": "Break-even Condensate Price ($/bbl)",
+    "makeup_gas_cost": "Maximum Makeup Gas Cost ($/MMSCF)",
+    "inflation_cost": "Maximum Cost Inflation Rate",
+}
+
+LINEAR_INPUTS = ("oil_price", "gas_price", "condensate_price", "cost_per_boe", "makeup_gas_cost",
+                 "makeup_gas_daily_mmscf", "vert_cost", "horiz_cost", "workover_perf_cost",
+                 "workover_pump_cost", "facilities_total_cost")
+
+# Search brackets of the nonlinear inputs
+ROOT_BRACKETS = {
+    "inflation_oil": (-0.5, 1.0),
+    "inflation_cost": (-0.5, 1.0),
+    "conversion_factor": (100.0, 100_000.0),
+}
+
+DEFAULT_DISCOUNT_RATES = np.linspace(0.0, 0.30, 31)
+
+
+def discount_factors(years, start_year, rates):
+    # (rates, years), as the engine's "discount_factor" series
+    t = (np.asarray(years) - start_year).astype(float)
+    return 1 / ((1 + np.asarray(rates, dtype=float)[:, None]) ** t[None, :])
+
+
+def stack_schedules(schedules):
+    # Engine schedules -> one schedule on the union of their years, arrays shaped (runs, years)
+    years = np.unique(np.concatenate([s["year"] for s in schedules]))
+    stacked = {"year": years}
+    for key in SCHEDULE_COLUMNS:
+        values = np.zeros((len(schedules), len(years)))
+        for row, schedule in enumerate(schedules):
+            values[row, np.searchsorted(years, schedule["year"])] = schedule[key]
+        stacked[key] = values
+    return stacked
+
+
+def repeat_runs(stacked, times):
+    # Each run's row repeated for its `times` consecutive scenarios
+    return dict({key: np.repeat(stacked[key], times, axis=0) for key in SCHEDULE_COLUMNS}, year=stacked["year"])
+
+
+def linear_break_even(stacked, base_params, inputs, discount_rates, start_year=2023, fixed_price=True):
+    # {input: break-even (runs, discount rates)} for inputs in LINEAR_INPUTS, from one evaluation
+    # of two scenarios per input and run
+    runs = len(stacked["oil"])
+    base = {k: v[0] for k, v in broadcast_params(base_params).items()}
+    steps = np.array([max(abs(base[name]), 1.0) for name in inputs])
+    params = {k: np.full(2 * len(inputs), v) for k, v in base.items()}
+    for i, name in enumerate(inputs):
+        params[name][2 * i:2 * i + 2] = (0.0, steps[i])
+    params = {k: np.tile(v, runs) for k, v in params.items()}
+
+    ncf = evaluate(repeat_runs(stacked, 2 * len(inputs)), params, start_year, fixed_price, keep_series=False)["ncf"]
+    ncf = ncf.reshape(runs, len(inputs), 2, -1)
+    discount = discount_factors(stacked["year"], start_year, discount_rates)
+    intercept = ncf[:, :, 0] @ discount.T
+    slope = (ncf[:, :, 1] - ncf[:, :, 0]) @ discount.T / steps[None, :, None]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        values = np.where(slope != 0, -intercept / slope, np.nan)
+    return {name: values[:, i] for i, name in enumerate(inputs)}
+
+
+def root_break_even(stacked, base_params, name, discount_rates, bracket=None, start_year=2023, fixed_price=True,
+                    tol=1e-10, max_iter=100):
+    # Break-even of one input (runs, discount rates) by Illinois false position inside bracket;
+    # NaN where NPV has the same sign at both ends. Each step is one evaluation of every run and
+    # rate, reusing the series that do not depend on the input.
+    runs = len(stacked["oil"])
+    rates = np.asarray(discount_rates, dtype=float)
+    params = {k: np.full(runs * len(rates), v[0]) for k, v in broadcast_params(base_params).items()}
+    params["discount_rate"] = np.tile(rates, runs)
+    schedule = repeat_runs(stacked, len(rates))
+    lo_value, hi_value = bracket or ROOT_BRACKETS[name]
+
+    def npv_at(x, previous=None):
+        result = evaluate(schedule, dict(params, **{name: x}), start_year, fixed_price, keep_series=False,
+                          previous=previous)
+        return np.array(result["npv"], dtype=float), result
+
+    a = np.full(runs * len(rates), float(lo_value))
+    b = np.full(runs * len(rates), float(hi_value))
+    f_a, model = npv_at(a)
+    f_b, _ = npv_at(b, model)
+    found = np.sign(f_a) * np.sign(f_b) <= 0
+    active = found & (f_a != 0) & (f_b != 0)
+    x = np.where(f_a == 0, a, b)
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = np.where(f_b != f_a, (a * f_b - b * f_a) / (f_b - f_a), (a + b) / 2)
+        f_c, _ = npv_at(np.where(active, c, x), model)
+        # keep the root bracketed; halve the stale end's value (Illinois) when it is kept
+        crossed = np.sign(f_c) * np.sign(f_b) < 0
+        a = np.where(active & crossed, b, a)
+        f_a = np.where(active & crossed, f_b, np.where(active, f_a / 2, f_a))
+        b = np.where(active, c, b)
+        f_b = np.where(active, f_c, f_b)
+        x = np.where(active, c, x)
+        active &= ~((f_c == 0) | (np.abs(b - a) <= tol * np.maximum(1.0, np.abs(c))))
+
+    return np.where(found, x, np.nan).reshape(runs, len(rates))
+
+
+def solve_break_even(stacked, base_params, inputs, rates, start_year=2023, fixed_price=True, brackets=None):
+    # {input: break-even (runs, discount rates)}: the linear inputs in one evaluation, each
+    # nonlinear input in one batched root search
+    unknown = [name for name in inputs if name not in LINEAR_INPUTS and name not in ROOT_BRACKETS]
+    if unknown:
+        raise ValueError(f"No break-even for: {', '.join(unknown)}")
+
+    linear = [name for name in inputs if name in LINEAR_INPUTS]
+    values = linear_break_even(stacked, base_params, linear, rates, start_year, fixed_price) if linear else {}
+    for name in inputs:
+        if name not in LINEAR_INPUTS:
+            bracket = (brackets or {}).get(name)
+            values[name] = root_break_even(stacked, base_params, name, rates, bracket, start_year, fixed_price)
+    return values
+
+
+def break_even(schedule, base_params, inputs=None, discount_rates=None, start_year=2023, fixed_price=True,
+               brackets=None):
+    # One row per discount rate, one column per input
+    inputs = list(inputs or BREAK_EVEN_INPUTS)
+    rates = DEFAULT_DISCOUNT_RATES if discount_rates is None else np.asarray(discount_rates, dtype=float)
+    values = solve_break_even(stack_schedules([schedule]), base_params, inputs, rates, start_year, fixed_price,
+                              brackets)
+
+    table = pd.DataFrame({"Discount Rate": rates})
+    for name in inputs:
+        table[name] = values[name][0]
+    return table
+
+
+def break_even_runs(schedules, base_params, inputs=None, discount_rates=None, start_year=2023, fixed_price=True):
+    # schedules: {run: schedule}. Long table: Run, Discount Rate and one column per input; every
+    # run is solved in the same evaluations
+    if not schedules:
+        return pd.DataFrame()
+    inputs = list(inputs or BREAK_EVEN_INPUTS)
+    rates = DEFAULT_DISCOUNT_RATES if discount_rates is None else np.asarray(discount_rates, dtype=float)
+    values = solve_break_even(stack_schedules(list(schedules.values())), base_params, inputs, rates, start_year,
+                              fixed_price)
+
+    table = pd.DataFrame({"Run": [run for run in schedules for _ in rates],
+                          "Discount Rate": np.tile(rates, len(schedules))})
+    for name in inputs:
+        table[name] = values[name].ravel()
+    return table
+
+
+def plot_break_even(axes, table, current_rate=None):
+    # One panel per input: break-even against discount rate
+    for ax, name in zip(axes, [c for c in table.columns if c not in ("Run", "Discount Rate")]):
+        ax.plot(table["Discount Rate"] * 100, table[name], color="tab:blue", linewidth=2)
+        if current_rate is not None:
+            ax.axvline(current_rate * 100, color="grey", linestyle="--", linewidth=1)
+        ax.set_title(BREAK_EVEN_INPUTS.get(name, name), fontsize=10)
+        ax.set_xlabel("Discount Rate (%)")
+        ax.grid(alpha=0.3)
+
+
+if __name__ == "__main__":
+    # batch helpers are only needed on the command line (keeps the app's imports light)
+    from batch_economics import find_production_sources, find_schedules, load_case_schedule, load_parameter_file
+
+    parser = argparse.ArgumentParser(description="Break-even oil price, cost per BOE and facilities cost "
+                                                 "across discount rates for every case of a study")
+    parser.add_argument("--production", required=True, help="folder of per-run production workbooks or a Parquet store")
+    parser.add_argument("--schedules", required=True, help="folder searched for *_summary.xlsx schedule workbooks")
+    parser.add_argument("--makeup-gas", required=True, help="make-up gas schedule workbook")
+    parser.add_argument("--params", help="parameter JSON file; its base values, start_year and fixed_price are used")
+    parser.add_argument("--inputs", nargs="+", default=["oil_price", "cost_per_boe", "facilities_total_cost"],
+                        help=f"inputs to solve for (any of {', '.join(sorted(set(LINEAR_INPUTS) | set(ROOT_BRACKETS)))})")
+    parser.add_argument("--rates", nargs=3, type=float, metavar=("LOW", "HIGH", "POINTS"), default=(0.0, 0.30, 31),
+                        help="discount rate sweep (fractions)")
+    parser.add_argument("--output", default="break_even.xlsx", help=".xlsx or .csv")
+    args = parser.parse_args()
+
+    config = load_parameter_file(args.params) if args.params else {"start_year": 2023, "fixed_price": True, "base": {}}
+    productions = find_production_sources(args.production)
+    schedules = find_schedules(args.schedules)
+    gas_df = pd.read_excel(args.makeup_gas)
+    runs = {}
+    for key in sorted(set(productions) & set(schedules)):
+        runs[productions[key][0]] = load_case_schedule(productions[key][1], schedules[key], gas_df)
+
+    start = time.perf_counter()
+    rates = np.linspace(args.rates[0], args.rates[1], int(args.rates[2]))
+    table = break_even_runs(runs, config["base"], args.inputs, rates, config["start_year"], config["fixed_price"])
+    seconds = time.perf_counter() - start
+    if args.output.endswith(".csv"):
+        table.to_csv(args.output, index=False)
+    else:
+        table.to_excel(args.output, index=False)
+    print(f"Solved {len(args.inputs)} break-even inputs x {len(rates)} discount rates for {len(runs)} runs "
+          f"in {seconds * 1000:.0f} ms -> {os.path.abspath(args.output)}")
@@ -0,0 +1,88 @@
+import numpy as np
+
+# IRR, payback and discounted payback for many cash-flow vectors at once.
+# Cash flows are (scenarios, years) arrays of yearly NCF (e.g. the "NCF MM$" column);
+# year 0 is the first column. Discounted payback is payback_period of the discounted NCF.
+
+# Rates scanned to bracket IRR roots before refining them: fine steps around usual project
+# rates, coarser up to 1000%
+IRR_SCAN_RATES = np.unique(np.concatenate([
+    np.linspace(-0.95, 1.0, 196),
+    np.geomspace(1.0, 10.0, 25),
+]))
+
+
+def npv_at_rates(cash_flows, rates):
+    # (scenarios, years) x (rates,) -> (scenarios, rates)
+    t = np.arange(cash_flows.shape[-1])
+    discount = (1.0 + np.asarray(rates, dtype=float))[:, None] ** -t[None, :]
+    return cash_flows @ discount.T
+
+
+def irr(cash_flows, tol=1e-10, max_iter=100):
+    # Returns (irr, n_roots). irr is the lowest rate on IRR_SCAN_RATES where NPV falls through
+    # zero as the rate rises (the investment-type root; NaN when there is none, e.g. cash flows
+    # with no up-front investment); n_roots > 1 flags cash flows with several IRRs.
+    # Each bracket is refined by Newton steps that fall back to bisection when they leave it.
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    n = cash_flows.shape[0]
+    t = np.arange(cash_flows.shape[1])
+
+    scan = npv_at_rates(cash_flows, IRR_SCAN_RATES)
+    sign = np.sign(scan)
+    n_roots = ((sign[:, :-1] * sign[:, 1:] < 0) | ((sign[:, :-1] != 0) & (sign[:, 1:] == 0))).sum(axis=1)
+    crossing = (sign[:, :-1] > 0) & (sign[:, 1:] <= 0)
+    found = crossing.any(axis=1)
+    first = np.argmax(crossing, axis=1)
+
+    lo = IRR_SCAN_RATES[first].copy()
+    hi = IRR_SCAN_RATES[first + 1].copy()
+    f_lo = scan[np.arange(n), first]
+    x = (lo + hi) / 2
+    active = found.copy()
+
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        growth = (1.0 + x[:, None]) ** -t[None, :]
+        f = (cash_flows * growth).sum(axis=1)
+        df = (-t * cash_flows * growth).sum(axis=1) / (1.0 + x)
+
+        # shrink the bracket around the root
+        same_side = np.sign(f) == np.sign(f_lo)
+        lo = np.where(active & same_side, x, lo)
+        f_lo = np.where(active & same_side, f, f_lo)
+        hi = np.where(active & ~same_side, x, hi)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            newton = x - f / df
+        inside = np.isfinite(newton) & (newton > lo) & (newton < hi)
+        x_new = np.where(inside, newton, (lo + hi) / 2)
+
+        done = (np.abs(f) <= tol * np.maximum(1.0, np.abs(cash_flows).max(axis=1))) | (hi - lo <= tol)
+        active &= ~done
+        x = np.where(active, x_new, x)
+
+    return np.where(found, x, np.nan), n_roots
+
+
+def payback_period(cash_flows):
+    # Years until cumulative cash flow turns non-negative for good, interpolated within the
+    # crossing year. 0 when it is never negative, NaN when it is still negative at the end.
+    cash_flows = np.atleast_2d(np.asarray(cash_flows, dtype=float))
+    cumulative = np.cumsum(cash_flows, axis=1)
+    n_years = cumulative.shape[1]
+
+    negative = cumulative < 0
+    never_negative = ~negative.any(axis=1)
+    # last year with a negative cumulative
+    last_negative = n_years - 1 - np.argmax(negative[:, ::-1], axis=1)
+    pays_back = ~never_negative & (last_negative < n_years - 1)
+
+    rows = np.arange(len(cash_flows))
+    k = np.minimum(last_negative, n_years - 2)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = -cumulative[rows, k] / cash_flows[rows, k + 1]
+    period = k + 1 + np.clip(fraction, 0.0, 1.0)
+
+    return np.where(never_negative, 0.0, np.where(pays_back, period, np.nan))
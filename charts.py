@@ -0,0 +1,113 @@
+import io
+
+import numpy as np
+
+from break_even import plot_break_even
+from sensitivity import plot_spider, plot_tornado
+
+# Charts of the economics app rendered to PNG bytes.
+# Figures are plain matplotlib.figure.Figure objects, not pyplot figures, so nothing keeps them
+# alive after rendering; the app caches the returned bytes keyed on the plotted data and shows
+# them with st.image. matplotlib itself is imported on first use to keep it out of app start-up.
+
+DPI = 200  # same as st.pyplot
+
+
+def new_axes(figsize=None):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots()
+
+
+def to_png(fig):
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+    fig.clear()
+    return buffer.getvalue()
+
+
+def cash_flow_chart(run_name, year, revenue, opex, capex, ncf):
+    fig, ax = new_axes()
+    ax.bar(year, revenue, label="Revenue", color="green")
+    ax.bar(year, -opex, label="OPEX", color="blue")
+    ax.bar(year, -capex, bottom=-opex, label="CAPEX", color="red")
+    ax.plot(year, ncf, color="black", marker='o', label="Net Cash Flow")
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Value ($ Million)")
+    ax.set_title(f'{run_name} Economic Analysis', fontsize=11, fontweight='bold')
+    ax.axhline(0, color='gray', linewidth=0.8)
+    ax.legend()
+    ax.grid(True)
+    return to_png(fig)
+
+
+def case_ncf_chart(title, cases):
+    # cases: [(label, year, ncf)] for the Low/Med/High cases
+    fig, ax = new_axes()
+    styles = {"Low Case": ("--", "blue", 'o'), "Med Case": ("-", "black", 's'), "High Case": ("--", "green", 'x')}
+    for label, year, ncf in cases:
+        style, color, marker = styles[label]
+        ax.plot(year, ncf, label=label, linestyle=style, color=color, marker=marker)
+    ax.set_xlabel("Year")
+    ax.set_ylabel("Net Cash Flow (MM$)")
+    ax.set_title(title, fontsize=11, fontweight='bold')
+    ax.axhline(0, color='gray', linewidth=0.8)
+    ax.grid(True)
+    ax.legend()
+    return to_png(fig)
+
+
+def tornado_chart(title, table, base_value):
+    fig, ax = new_axes(figsize=(6, 0.35 * len(table) + 1.5))
+    plot_tornado(ax, table, base_value)
+    ax.set_title(title, fontsize=11, fontweight='bold')
+    return to_png(fig)
+
+
+def spider_chart(title, sensitivity, n_inputs):
+    fig, ax = new_axes(figsize=(6, 0.35 * n_inputs + 1.5))
+    plot_spider(ax, sensitivity)
+    ax.set_title(title, fontsize=11, fontweight='bold')
+    return to_png(fig)
+
+
+def npv_histogram(npv, p90, p50, p10):
+    fig, ax = new_axes()
+    ax.hist(npv, bins=60, color="steelblue", alpha=0.8)
+    for value, label, color in [(p90, "P90", "red"), (p50, "P50", "black"), (p10, "P10", "green")]:
+        ax.axvline(value, color=color, linestyle="--", label=label)
+    ax.axvline(0, color="gray", linewidth=0.8)
+    ax.set_xlabel("NPV (MM$)")
+    ax.set_ylabel("Frequency")
+    ax.set_title("NPV Distribution", fontsize=11, fontweight='bold')
+    ax.legend()
+    ax.grid(True)
+    return to_png(fig)
+
+
+def break_even_chart(title, table, current_rate):
+    # One panel per break-even input (units differ), against discount rate
+    from matplotlib.figure import Figure
+    n_inputs = len(table.columns) - 1
+    fig = Figure(figsize=(4 * n_inputs, 3.2))
+    plot_break_even(np.atleast_1d(fig.subplots(1, n_inputs)), table, current_rate)
+    fig.suptitle(title, fontsize=11, fontweight='bold')
+    return to_png(fig)
+
+
+def npv_heatmap(title, x_label, x, y_label, y, npv):
+    # npv: (len(y), len(x)) grid slice; filled contours with the NPV = 0 line (NaN = not evaluated)
+    from matplotlib.colors import TwoSlopeNorm
+    fig, ax = new_axes()
+    npv = np.ma.masked_invalid(npv)
+    spans_zero = npv.count() and npv.min() < 0 < npv.max()
+    norm = TwoSlopeNorm(0.0, npv.min(), npv.max()) if spans_zero else None  # red below, green above zero
+    filled = ax.contourf(x, y, npv, levels=20, cmap="RdYlGn", norm=norm)
+    fig.colorbar(filled, ax=ax, label="NPV (MM$)")
+    if spans_zero:
+        zero = ax.contour(x, y, npv, levels=[0.0], colors="black", linewidths=1.2)
+        ax.clabel(zero, fmt={0.0: "NPV = 0"}, fontsize=8)
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title, fontsize=11, fontweight='bold')
+    return to_png(fig)
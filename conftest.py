@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+
+def synthetic_schedule(seed=0, start_year=2024, years=20):
+    # Engine schedule (as eco_engine.build_schedule returns) with wells, workovers and a
+    # facilities payment up front, then declining production
+    rng = np.random.default_rng(seed)
+    decline = np.exp(-0.12 * np.arange(years))
+    schedule = {"year": np.arange(start_year, start_year + years)}
+    schedule["vertical"] = np.r_[rng.integers(2, 6, 3), np.zeros(years - 3)].astype(float)
+    schedule["horizontal"] = np.r_[rng.integers(0, 3, 2), np.zeros(years - 2)].astype(float)
+    schedule["workover_perf"] = rng.integers(0, 7, years).astype(float)
+    schedule["workover_pump"] = np.zeros(years)
+    schedule["facilities"] = np.r_[0.5, 0.5, np.zeros(years - 2)]
+    schedule["oil"] = rng.uniform(3e6, 6e6) * decline
+    schedule["cond"] = rng.uniform(0, 2e5) * decline
+    schedule["gas"] = rng.uniform(1e6, 4e6) * decline
+    schedule["availability"] = rng.uniform(0.2, 1.0, years)
+    return schedule
+
+
+@pytest.fixture
+def make_schedule():
+    return synthetic_schedule
@@ -0,0 +1,310 @@
+import numpy as np
+import pandas as pd
+
+from cash_flow_metrics import irr, payback_period
+from instrumentation import traced
+
+# Headless economics engine used by 3_Eco_App.py.
+# The merged yearly schedule is converted to plain arrays once, then any number of
+# scenarios are evaluated together: every result array is shaped (scenarios, years).
+# The model itself is a dependency graph of derived series (MODEL_NODES), so a re-evaluation
+# with a few changed inputs only recomputes what depends on them.
+
+# Model inputs with the same defaults and units as the app (well/facility costs in $)
+DEFAULT_PARAMS = {
+    "oil_price": 60.0,
+    "gas_price": 2.8,
+    "condensate_price": 65.0,
+    "inflation_oil": 0.02,
+    "inflation_cost": 0.05,
+    "discount_rate": 0.10,
+    "cost_per_boe": 9.0,
+    "conversion_factor": 6000.0,
+    "makeup_gas_daily_mmscf": 56.0,
+    "makeup_gas_cost": 2.8,
+    "vert_cost": 5.48e6,
+    "horiz_cost": 8.0e6,
+    "workover_perf_cost": 1.0e6,
+    "workover_pump_cost": 0.5e6,
+    "facilities_total_cost": 150e6,
+}
+
+SCHEDULE_COLUMNS = {
+    "vertical": "Planned Vertical Wells",
+    "horizontal": "Planned Horizontal Wells",
+    "workover_perf": "Workover (Perf or Shut-off)",
+    "workover_pump": "Workover (Pump Replacement)",
+    "facilities": "Facilities Payment Schedule (%)",
+    "oil": "Oil Prod STB",
+    "cond": "Cond Prod STB",
+    "gas": "Gas Prod SCF",
+    "availability": "Availability",
+}
+
+
+def merge_inputs(cost_df, prod_df, gas_df):
+    # Same merge/rename rules the app applies to the three uploaded workbooks
+    gas_df = gas_df.copy()
+    gas_df.columns = [str(c).strip().lower() for c in gas_df.columns]
+    if "availability" not in gas_df.columns:
+        raise ValueError("Make-up Gas file must contain 'Availability' column.")
+    gas_df.rename(columns={"availability": "Availability", "year": "Year"}, inplace=True)
+
+    df = pd.merge(cost_df, prod_df, on="Year")
+    df = pd.merge(df, gas_df[["Year", "Availability"]], on="Year", how="left")
+    df["Availability"] = df["Availability"].fillna(0)
+
+    df.rename(columns={
+        "Drilling of Vertical Wells": "Planned Vertical Wells",
+        "Drilling of Horizontal Wells": "Planned Horizontal Wells",
+        "Oil": "Oil Prod STB",
+        "Condensate": "Cond Prod STB",
+        "Gas": "Gas Prod SCF"
+    }, inplace=True)
+
+    df["Facilities Payment Schedule (%)"] = df["Facilities Payment Schedule (%)"] / 100
+    df["Year"] = df["Year"].astype(int)
+    return df
+
+
+def build_schedule(df):
+    # Convert the merged DataFrame into float arrays (missing columns/values -> 0)
+    schedule = {"year": df["Year"].to_numpy(dtype=int)}
+    for key, column in SCHEDULE_COLUMNS.items():
+        if column in df.columns:
+            values = pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float)
+            schedule[key] = np.nan_to_num(values, nan=0.0)
+        else:
+            schedule[key] = np.zeros(len(df))
+    return schedule
+
+
+def broadcast_params(params):
+    # Fill in defaults and broadcast every input to a common (scenarios,) vector
+    merged = dict(DEFAULT_PARAMS)
+    merged.update(params or {})
+    arrays = {k: np.atleast_1d(np.asarray(v, dtype=float)) for k, v in merged.items() if k in DEFAULT_PARAMS}
+    n = np.broadcast_shapes(*(a.shape for a in arrays.values()))
+    return {k: np.broadcast_to(a, n) for k, a in arrays.items()}
+
+
+# -------------------------------
+# Cash-flow model as a dependency graph
+# -------------------------------
+# Every derived series is a node: name -> (dependencies, function of their values).
+# Dependencies are other nodes or model inputs: the schedule arrays (years,), the parameters
+# as (scenarios, 1) columns, start_year and fixed_price. Nodes are listed in dependency order.
+# update_model recomputes only the nodes downstream of inputs that differ from a previous
+# evaluation, so e.g. a new oil price reuses every CAPEX and OPEX series.
+MODEL_NODES = {
+    "t": (("year", "start_year"), lambda year, start_year: (year - start_year)[None, :].astype(float)),
+
+    # CAPEX and escalation
+    "total_capex": (("vertical", "horizontal", "workover_perf", "workover_pump", "facilities", "vert_cost",
+                     "horiz_cost", "workover_perf_cost", "workover_pump_cost", "facilities_total_cost"),
+                    lambda vertical, horizontal, workover_perf, workover_pump, facilities, vert_cost, horiz_cost,
+                    workover_perf_cost, workover_pump_cost, facilities_total_cost: (
+                        vertical * vert_cost + horizontal * horiz_cost + workover_perf * workover_perf_cost
+                        + workover_pump * workover_pump_cost + facilities * facilities_total_cost) / 1e6),
+    "inflation_factor": (("inflation_cost", "t"), lambda inflation_cost, t: (1 + inflation_cost) ** t),
+    "escalated_capex": (("total_capex", "inflation_factor"), np.multiply),
+
+    # OPEX1 (BOE based) and OPEX2 (make-up gas)
+    "boe": (("oil", "cond", "gas", "conversion_factor"),
+            lambda oil, cond, gas, conversion_factor: (oil + cond + gas * 1e3 / conversion_factor) / 1e6),
+    "opex1": (("boe", "cost_per_boe"), np.multiply),
+    "opex2": (("makeup_gas_cost", "makeup_gas_daily_mmscf", "availability"),
+              lambda cost, daily, availability: cost * daily * 365 * availability / 1e3),
+    "total_opex": (("opex1", "opex2"), np.add),
+    "escalated_opex": (("total_opex", "inflation_factor"), np.multiply),
+    "escalated_cost": (("escalated_capex", "escalated_opex"), np.add),
+
+    # Prices and revenue
+    "price_factor": (("fixed_price", "inflation_oil", "t"),
+                     lambda fixed_price, inflation_oil, t: 1.0 if fixed_price else (1 + inflation_oil) ** t),
+    "oil_price_series": (("oil_price", "price_factor"), np.multiply),
+    "cond_price_series": (("condensate_price", "price_factor"), np.multiply),
+    "gas_price_series": (("gas_price", "price_factor"), np.multiply),
+    "oil_revenue": (("oil", "oil_price_series"), lambda oil, price: oil * price / 1e6),
+    "cond_revenue": (("cond", "cond_price_series"), lambda cond, price: cond * price / 1e6),
+    "gas_revenue": (("gas", "gas_price_series"), lambda gas, price: gas * 1e3 * price / 1e9),
+    "revenue": (("oil_revenue", "cond_revenue", "gas_revenue"), lambda oil, cond, gas: oil + cond + gas),
+
+    # Cash flow and discounting
+    "ncf": (("revenue", "escalated_cost"), np.subtract),
+    "discount_factor": (("discount_rate", "t"), lambda discount_rate, t: 1 / ((1 + discount_rate) ** t)),
+    "discounted_ncf": (("ncf", "discount_factor"), np.multiply),
+    "discounted_capex": (("escalated_capex", "discount_factor"), np.multiply),
+
+    # Indicators (scenarios,)
+    "npv": (("discounted_ncf",), lambda x: x.sum(axis=1)),
+    "npv_capex": (("discounted_capex",), lambda x: x.sum(axis=1)),
+    "total_escalated_capex": (("escalated_capex",), lambda x: x.sum(axis=1)),
+    "total_revenue": (("revenue",), lambda x: x.sum(axis=1)),
+    "total_cost": (("escalated_cost",), lambda x: x.sum(axis=1)),
+    "cumulative_ncf": (("ncf",), lambda x: x.sum(axis=1)),
+    "cpi": (("npv", "npv_capex"), lambda npv, npv_capex: ratio(npv, npv_capex, np.inf)),
+    "pir": (("npv", "total_escalated_capex"), lambda npv, capex: ratio(npv, capex, 0.0)),
+
+    # IRR and payback periods (years from the first schedule year)
+    "irr_and_roots": (("ncf",), irr),
+    "payback": (("ncf",), payback_period),
+    "discounted_payback": (("discounted_ncf",), payback_period),
+}
+
+INDICATOR_NODES = ("npv", "total_revenue", "total_cost", "cumulative_ncf", "cpi", "pir")
+METRIC_NODES = ("irr_and_roots", "payback", "discounted_payback")
+
+# Result key -> node of the full (scenarios, years) series
+SERIES_NODES = {
+    "total_capex": "total_capex", "inflation_factor": "inflation_factor", "escalated_capex": "escalated_capex",
+    "boe": "boe", "opex1": "opex1", "opex2": "opex2", "total_opex": "total_opex",
+    "escalated_opex": "escalated_opex", "escalated_cost": "escalated_cost",
+    "oil_price": "oil_price_series", "cond_price": "cond_price_series", "gas_price": "gas_price_series",
+    "oil_revenue": "oil_revenue", "cond_revenue": "cond_revenue", "gas_revenue": "gas_revenue",
+    "revenue": "revenue", "discount_factor": "discount_factor", "discounted_capex": "discounted_capex",
+}
+
+
+def ratio(numerator, denominator, when_zero):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denominator != 0, numerator / denominator, when_zero)
+
+
+def model_inputs(schedule, params=None, start_year=2023, fixed_price=True):
+    # Graph inputs; parameters keep their own length (1 or scenarios) so unchanged ones stay cheap
+    merged = dict(DEFAULT_PARAMS)
+    merged.update(params or {})
+    inputs = {k: np.atleast_1d(np.asarray(v, dtype=float))[:, None] for k, v in merged.items() if k in DEFAULT_PARAMS}
+    inputs.update(schedule)
+    inputs["start_year"] = start_year
+    inputs["fixed_price"] = bool(fixed_price)
+    return inputs
+
+
+def required_nodes(targets):
+    # The targets and every node they depend on
+    required = set()
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name in MODEL_NODES and name not in required:
+            required.add(name)
+            pending.extend(MODEL_NODES[name][0])
+    return required
+
+
+def same_value(a, b):
+    return a is b or (np.shape(a) == np.shape(b) and np.array_equal(a, b))
+
+
+def update_model(previous, inputs, targets):
+    # previous: values of an earlier update_model (or {}). Nodes whose dependencies are all
+    # unchanged are carried over; the others are recomputed when a target needs them and
+    # dropped otherwise. Returns (values, names of the recomputed nodes).
+    values = dict(inputs)
+    changed = {k for k, v in inputs.items() if k not in previous or not same_value(previous[k], v)}
+    required = required_nodes(targets)
+    recomputed = []
+    for name, (dependencies, func) in MODEL_NODES.items():
+        if name in previous and not changed.intersection(dependencies):
+            values[name] = previous[name]
+            continue
+        changed.add(name)
+        if name in required:
+            values[name] = func(*(values[d] for d in dependencies))
+            recomputed.append(name)
+    return values, recomputed
+
+
+@traced("economics evaluate", rows_out=lambda result: len(result["npv"]))
+def evaluate(schedule, params=None, start_year=2023, fixed_price=True, keep_series=True,
+             with_cash_flow_metrics=False, previous=None):
+    # previous: an earlier evaluate result; only what the changed inputs affect is recomputed
+    # (the main case and its sensitivity cases share one model this way). A result read from the
+    # result store has no model and starts from scratch.
+    targets = INDICATOR_NODES + ("ncf", "discounted_ncf")
+    if with_cash_flow_metrics:
+        targets += METRIC_NODES
+    if keep_series:
+        targets += tuple(SERIES_NODES.values())
+    values, recomputed = update_model((previous or {}).get("model", {}),
+                                      model_inputs(schedule, params, start_year, fixed_price), targets)
+
+    n = np.broadcast_shapes(*(values[k].shape[:1] for k in DEFAULT_PARAMS))
+    shape = n + values["ncf"].shape[1:]
+    full = lambda a: np.broadcast_to(a, shape)  # noqa: E731
+    result = {k: np.broadcast_to(values[k], n) for k in INDICATOR_NODES}
+    result.update({"ncf": full(values["ncf"]), "discounted_ncf": full(values["discounted_ncf"]),
+                   "model": values, "recomputed": recomputed})
+    if with_cash_flow_metrics:
+        irr_values, irr_roots = values["irr_and_roots"]
+        result["irr"], result["irr_roots"] = np.broadcast_to(irr_values, n), np.broadcast_to(irr_roots, n)
+        result["payback"] = np.broadcast_to(values["payback"], n)
+        result["discounted_payback"] = np.broadcast_to(values["discounted_payback"], n)
+    if keep_series:
+        result.update({key: full(values[node]) for key, node in SERIES_NODES.items()})
+    return result
+
+
+def indicators_frame(result):
+    # One row per scenario with the app's Final Indicators
+    frame = pd.DataFrame({
+        "NPV (MM$)": result["npv"],
+        "Total Revenue (MM$)": result["total_revenue"],
+        "Total Cost (MM$)": result["total_cost"],
+        "Cumulative NCF (MM$)": result["cumulative_ncf"],
+        "CPI": result["cpi"],
+        "PIR": result["pir"],
+    })
+    if "irr" in result:
+        frame["IRR (%)"] = result["irr"] * 100
+        frame["Payback (years)"] = result["payback"]
+        frame["Discounted Payback (years)"] = result["discounted_payback"]
+    return frame
+
+
+@traced("economics cash_flow_table", rows_out=lambda table: len(table[0]))
+def cash_flow_table(df, params=None, start_year=2023, fixed_price=True, scenario=0, result=None):
+    # Rebuild the app's full cash-flow DataFrame for one scenario of an evaluation; result: an
+    # evaluate(..., with_cash_flow_metrics=True) result to lay out instead of evaluating params
+    if result is None:
+        result = evaluate(build_schedule(df), params, start_year, fixed_price, with_cash_flow_metrics=True)
+    s = scenario
+    df = df.copy()
+    df["Total CAPEX MM$"] = result["total_capex"][s]
+    df["Inflation Factor %"] = result["inflation_factor"][s]
+    df["Escalated CAPEX MM$"] = result["escalated_capex"][s]
+    df["Cumulative CAPEX"] = df["Escalated CAPEX MM$"].cumsum()
+
+    df["BOE MMSTB"] = result["boe"][s]
+    df["OPEX1 MM$"] = result["opex1"][s]
+    df["OPEX2 MM$"] = result["opex2"][s]
+    df["Total OPEX MM$"] = result["total_opex"][s]
+    df["Escalated OPEX MM$"] = result["escalated_opex"][s]
+    df["Cumulative OPEX"] = df["Escalated OPEX MM$"].cumsum()
+    df["Total Cost MM$"] = df["Total CAPEX MM$"] + df["Total OPEX MM$"]
+
+    df["Escalated Cost MM$"] = result["escalated_cost"][s]
+    df["Cumulative Escalated Cost"] = df["Escalated Cost MM$"].cumsum()
+
+    df["Oil Price $/STB"] = result["oil_price"][s]
+    df["Cond Price $/STB"] = result["cond_price"][s]
+    df["Gas Price $/MSCF"] = result["gas_price"][s]
+
+    df["Oil Revenue MM$"] = result["oil_revenue"][s]
+    df["Condensate Revenue MM$"] = result["cond_revenue"][s]
+    df["Gas Revenue MM$"] = result["gas_revenue"][s]
+    df["Total Revenue MM$"] = result["revenue"][s]
+    df["Cumulative Revenue"] = df["Total Revenue MM$"].cumsum()
+
+    df["NCF MM$"] = result["ncf"][s]
+    df["Cumulative NCF"] = df["NCF MM$"].cumsum()
+
+    df["Discount Factor"] = result["discount_factor"][s]
+    df["Discounted NCF"] = result["discounted_ncf"][s]
+    df["Discounted CAPEX"] = result["discounted_capex"][s]
+
+    indicators = {k: float(result[k][s]) for k in ("npv", "total_revenue", "total_cost", "cumulative_ncf", "cpi", "pir",
+                                                   "irr", "irr_roots", "payback", "discounted_payback")}
+    return df, indicators
@@ -0,0 +1,348 @@
+import argparse
+import http.client
+import json
+import math
+import os
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+from batch_economics import (find_production_sources, find_schedules, load_case_schedule, load_parameter_file,
+                             normalize_case_name, parameter_template)
+from eco_engine import DEFAULT_PARAMS, evaluate
+from instrumentation import collect
+from result_store import DEFAULT_STORE_MB, STORED_INDICATORS, evaluate_stored, store_path
+from result_store import enable as enable_result_store
+
+# Local HTTP/JSON service for the economics engine, for tools that evaluate cases in a loop
+# (scheduling scripts, optimizers). Standard library only; binds to localhost by default.
+# Cases are found like batch_economics.py does (production workbooks or Parquet store +
+# *_summary.xlsx schedules, matched by normalized case name). A case's schedule is loaded on
+# its first request and kept until one of its files changes.
+# Requests waiting at the same time are coalesced: a single batching thread collects them for
+# up to --batch-window-ms, groups them by case and evaluates each group as one vectorized
+# scenario batch (one queue entry per HTTP request). Every result reports its queue, evaluation and total latency.
+#
+#   POST /evaluate  {"case": "CASE0001", "params": {"oil_price": 70}, "series": false}
+#                   or {"requests": [{...}, {...}]}; start_year/fixed_price may be given per request
+#                   (fixed_price and series must be JSON true/false)
+#   GET  /cases     available and loaded cases
+#   GET  /stats     request count, batch sizes and latency percentiles
+
+DEFAULT_PORT = 8765
+BATCH_WINDOW_MS = 2.0
+MAX_BATCH = 4096
+LATENCY_WINDOW = 10_000  # requests kept for the latency percentiles
+RELOAD_CHECK_SECONDS = 1.0  # how often a loaded case's files are checked for changes
+
+
+def json_number(value):
+    value = float(value)
+    return None if np.isnan(value) or np.isinf(value) else value
+
+
+def json_list(values):
+    # NaN/inf are not valid JSON: sent as null
+    return [v if math.isfinite(v) else None for v in np.asarray(values, dtype=float).tolist()]
+
+
+def start_service(production, schedules_dir, makeup_gas_file, config=None, batch_window_ms=BATCH_WINDOW_MS):
+    # Service state dict; starts the batching thread
+    config = config or parameter_template()
+    service = {
+        "productions": find_production_sources(production),
+        "schedules": find_schedules(schedules_dir),
+        "gas_df": pd.read_excel(makeup_gas_file),
+        "config": config,
+        "batch_window": batch_window_ms / 1000,
+        "cases": {},  # case -> (file mtimes, schedule, time of the last mtime check)
+        "case_locks": {},
+        "lock": threading.Lock(),
+        "queue": queue.Queue(),
+        "stats": {"requests": 0, "batches": 0, "errors": 0, "latency_ms": deque(maxlen=LATENCY_WINDOW),
+                  "batch_sizes": deque(maxlen=LATENCY_WINDOW)},
+    }
+    service["batcher"] = threading.Thread(target=batch_worker, args=(service,), name="economics-batcher", daemon=True)
+    service["batcher"].start()
+    return service
+
+
+def case_files(service, case):
+    source = service["productions"][case][1]
+    files = [source[0] if isinstance(source, tuple) else source, service["schedules"][case]]
+    return files, tuple(os.path.getmtime(f) for f in files)
+
+
+def case_schedule(service, case):
+    # Loaded once per case (one loader at a time per case); reloaded when a file's mtime changes
+    if case not in service["productions"] or case not in service["schedules"]:
+        raise ValueError(f"unknown case {case!r}")
+    cached = service["cases"].get(case)
+    now = time.monotonic()
+    if cached is not None and now - cached[2] < RELOAD_CHECK_SECONDS:
+        return cached[1]
+    with service["lock"]:
+        case_lock = service["case_locks"].setdefault(case, threading.Lock())
+    with case_lock:
+        files, mtimes = case_files(service, case)
+        cached = service["cases"].get(case)
+        if cached is not None and cached[0] == mtimes:
+            service["cases"][case] = (mtimes, cached[1], now)
+            return cached[1]
+        schedule = load_case_schedule(service["productions"][case][1], files[1], service["gas_df"])
+        service["cases"][case] = (mtimes, schedule, now)
+        return schedule
+
+
+def request_params(service, params):
+    unknown = set(params or {}) - set(DEFAULT_PARAMS)
+    if unknown:
+        raise ValueError(f"unknown parameters: {', '.join(sorted(unknown))}")
+    merged = dict(DEFAULT_PARAMS)
+    merged.update(service["config"]["base"])
+    values = {k: float(v) for k, v in (params or {}).items()}
+    not_finite = [k for k, v in values.items() if not math.isfinite(v)]
+    if not_finite:
+        raise ValueError(f"parameters must be finite numbers: {', '.join(sorted(not_finite))}")
+    merged.update(values)
+    return merged
+
+
+def request_flag(body, name, default):
+    # JSON true/false only: "false" or 0 would otherwise be read as a different setting
+    value = body.get(name, default)
+    if not isinstance(value, bool):
+        raise ValueError(f"'{name}' must be true or false")
+    return value
+
+
+def prepare(service, body, received):
+    # Validated request item; "response" is already set when the request is invalid
+    item = {"received": received, "response": None}
+    try:
+        if "case" not in body:
+            raise ValueError("missing field 'case'")
+        case = normalize_case_name(str(body["case"]))
+        item.update(case=case, schedule=case_schedule(service, case),
+                    params=request_params(service, body.get("params")),
+                    start_year=int(body.get("start_year", service["config"]["start_year"])),
+                    fixed_price=request_flag(body, "fixed_price", bool(service["config"]["fixed_price"])),
+                    series=request_flag(body, "series", False))
+    except (ValueError, TypeError) as e:
+        item["response"] = {"error": str(e)}
+    except Exception as e:  # case files that cannot be read
+        item["response"] = {"error": f"{type(e).__name__}: {e}"}
+    return item
+
+
+def batch_worker(service):
+    # Queue entries are (items of one HTTP request, event set once they all have a response)
+    while True:
+        entries = [service["queue"].get()]
+        count = len(entries[0][0])
+        deadline = time.perf_counter() + service["batch_window"]
+        while count < MAX_BATCH:
+            timeout = deadline - time.perf_counter()
+            try:
+                entries.append(service["queue"].get(timeout=timeout) if timeout > 0 else service["queue"].get_nowait())
+            except queue.Empty:
+                break
+            count += len(entries[-1][0])
+        groups = {}
+        for items, _ in entries:
+            for item in items:
+                key = (item["case"], id(item["schedule"]), item["start_year"], item["fixed_price"])  # a reloaded case is a new group
+                groups.setdefault(key, []).append(item)
+        try:
+            # The thread lives as long as the service: with PIPELINE_TRACE set, its spans are
+            # dropped after each batch instead of piling up in a trace nobody writes
+            with collect():
+                for (case, _, start_year, fixed_price), group in groups.items():
+                    for start in range(0, len(group), MAX_BATCH):
+                        evaluate_group(service, group[start:start + MAX_BATCH], start_year, fixed_price)
+        finally:
+            for items, done in entries:
+                for item in items:
+                    if item["response"] is None:
+                        item["response"] = {"case": item["case"], "error": "evaluation did not complete"}
+                done.set()
+
+
+def evaluate_group(service, group, start_year, fixed_price):
+    # One vectorized evaluation for every request of a case; each gets its own response
+    started = time.perf_counter()
+    try:
+        params = {k: np.array([item["params"][k] for item in group]) for k in DEFAULT_PARAMS}
+        if store_path():
+            result = evaluate_stored(group[0]["schedule"], params, start_year, fixed_price)
+        else:
+            result = evaluate(group[0]["schedule"], params, start_year, fixed_price, keep_series=False,
+                              with_cash_flow_metrics=True)
+        columns = {k: json_list(result[k]) for k in STORED_INDICATORS}
+        error = None
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    finished = time.perf_counter()
+
+    for i, item in enumerate(group):
+        if error:
+            response = {"case": item["case"], "error": error}
+        else:
+            response = {"case": item["case"]}
+            response.update({k: values[i] for k, values in columns.items()})
+            if item["series"]:
+                response["year"] = group[0]["schedule"]["year"].tolist()
+                response["ncf"] = json_list(result["ncf"][i])
+                response["discounted_ncf"] = json_list(result["discounted_ncf"][i])
+        response["batch_size"] = len(group)
+        response["latency_ms"] = {"queue": round((started - item["received"]) * 1000, 3),
+                                  "evaluate": round((finished - started) * 1000, 3),
+                                  "total": round((time.perf_counter() - item["received"]) * 1000, 3)}
+        item["response"] = response
+
+    with service["lock"]:
+        service["stats"]["batches"] += 1
+        service["stats"]["batch_sizes"].append(len(group))
+
+
+def handle_evaluate(service, body):
+    # Single request -> one response; {"requests": [...]} -> {"results": [...]}. A body that is
+    # neither raises ValueError (answered with 400)
+    received = time.perf_counter()
+    if not isinstance(body, dict):
+        raise ValueError("request body must be a JSON object")
+    requests = body["requests"] if "requests" in body else [body]
+    if not isinstance(requests, list) or not all(isinstance(request, dict) for request in requests):
+        raise ValueError("'requests' must be a list of JSON objects")
+    items = [prepare(service, request, received) for request in requests]
+    pending = [item for item in items if item["response"] is None]
+    if pending:
+        done = threading.Event()
+        service["queue"].put((pending, done))
+        done.wait()
+    responses = [item["response"] for item in items]
+
+    with service["lock"]:
+        stats = service["stats"]
+        stats["requests"] += len(responses)
+        stats["errors"] += sum("error" in r for r in responses)
+        stats["latency_ms"].extend(r["latency_ms"]["total"] for r in responses if "latency_ms" in r)
+    if "requests" in body:
+        return {"results": responses, "latency_ms": round((time.perf_counter() - received) * 1000, 3)}
+    return responses[0]
+
+
+def service_stats(service):
+    with service["lock"]:
+        stats = service["stats"]
+        latency = np.array(stats["latency_ms"], dtype=float)
+        sizes = np.array(stats["batch_sizes"], dtype=float)
+        summary = {"requests": stats["requests"], "errors": stats["errors"], "batches": stats["batches"],
+                   "cases_loaded": sorted(service["cases"])}
+    summary["mean_batch_size"] = json_number(sizes.mean()) if len(sizes) else None
+    for p in (50, 95, 99):
+        summary[f"p{p}_latency_ms"] = json_number(np.percentile(latency, p)) if len(latency) else None
+    return summary
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, so a client loop reuses its connection
+    disable_nagle_algorithm = True  # small responses go out at once instead of waiting for an ACK
+    service = None
+    quiet = True
+
+    def send_json(self, status, payload):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/cases":
+            self.send_json(200, {"cases": sorted(set(self.service["productions"]) & set(self.service["schedules"])),
+                                 "loaded": sorted(self.service["cases"])})
+        elif self.path == "/stats":
+            self.send_json(200, service_stats(self.service))
+        else:
+            self.send_json(404, {"error": f"no such endpoint {self.path}"})
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path != "/evaluate":
+            self.send_json(404, {"error": f"no such endpoint {self.path}"})
+            return
+        try:
+            body = json.loads(body or b"{}")
+        except ValueError as e:
+            self.send_json(400, {"error": f"invalid JSON: {e}"})
+            return
+        try:
+            response = handle_evaluate(self.service, body)
+        except ValueError as e:
+            self.send_json(400, {"error": str(e)})
+            return
+        single_error = "error" in response and "results" not in response
+        self.send_json(400 if single_error else 200, response)
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+def serve(service, host="127.0.0.1", port=DEFAULT_PORT, quiet=True):
+    handler = type("Handler", (ServiceHandler,), {"service": service, "quiet": quiet})
+    server_class = type("Server", (ThreadingHTTPServer,), {"daemon_threads": True, "request_queue_size": 256})
+    return server_class((host, port), handler)
+
+
+def evaluate_remote(requests, host="127.0.0.1", port=DEFAULT_PORT, connection=None):
+    # Client helper: list of request dicts -> list of responses. Pass an http.client.HTTPConnection
+    # to reuse it across calls (an optimizer loop should)
+    own = connection is None
+    connection = connection or http.client.HTTPConnection(host, port)
+    try:
+        connection.request("POST", "/evaluate", json.dumps({"requests": requests}),
+                           {"Content-Type": "application/json"})
+        return json.loads(connection.getresponse().read())["results"]
+    finally:
+        if own:
+            connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON service evaluating the economics of a study's cases")
+    parser.add_argument("--production", required=True, help="folder of per-run production workbooks or a Parquet store")
+    parser.add_argument("--schedules", required=True, help="folder searched for *_summary.xlsx schedule workbooks")
+    parser.add_argument("--makeup-gas", required=True, help="make-up gas schedule workbook")
+    parser.add_argument("--params", help="parameter JSON file; its base values, start_year and fixed_price are the defaults")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS,
+                        help="how long the first waiting request collects others into its batch")
+    parser.add_argument("--result-store", metavar="PATH",
+                        help="persistent result store (SQLite): scenarios evaluated before are read from it")
+    parser.add_argument("--result-store-mb", type=float, default=DEFAULT_STORE_MB,
+                        help="size limit of the result store; least recently used results are evicted")
+    parser.add_argument("--verbose", action="store_true", help="log every HTTP request")
+    args = parser.parse_args()
+
+    if args.result_store:
+        enable_result_store(args.result_store, args.result_store_mb)
+    config = load_parameter_file(args.params) if args.params else parameter_template()
+    service = start_service(args.production, args.schedules, args.makeup_gas, config, args.batch_window_ms)
+    server = serve(service, args.host, args.port, quiet=not args.verbose)
+    n_cases = len(set(service["productions"]) & set(service["schedules"]))
+    print(f"Serving {n_cases} cases on http://{args.host}:{args.port} (POST /evaluate, GET /cases, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
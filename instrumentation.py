@@ -0,0 +1,186 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Opt-in stage timing for the pipeline scripts.
+# Tracing is on when the PIPELINE_TRACE environment variable names a folder (the scripts' --trace
+# option sets it, so worker processes inherit it). Each instrumented call records a span: seconds,
+# bytes processed, rows produced and the process peak RSS at its end. finish() writes one JSON
+# trace per script run to that folder and prints a per-stage summary table.
+# When tracing is off, the decorators call straight through.
+# Spans, collectors and the stack of open spans are kept per thread: concurrent threads (a
+# background scenario grid, the service's request threads, other Streamlit sessions) never
+# become each other's parents, and finish() writes only the calling thread's spans.
+
+TRACE_ENV = "PIPELINE_TRACE"
+
+_local = threading.local()
+
+
+def _state():
+    if not hasattr(_local, "spans"):
+        _local.spans, _local.collectors, _local.stack, _local.started = [], [], [], time.time()
+    return _local
+
+
+def enabled():
+    return bool(os.environ.get(TRACE_ENV))
+
+
+def enable(trace_dir):
+    os.makedirs(trace_dir, exist_ok=True)
+    os.environ[TRACE_ENV] = os.path.abspath(trace_dir)
+
+
+def peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 ** 2 if sys.platform == "darwin" else 1024), 1)  # bytes on macOS, KB on Linux
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / 1024 ** 2, 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+@contextmanager
+def span(name, **attrs):
+    # Yields a dict; set "bytes"/"rows" (or any other key) on it inside the block
+    if not enabled():
+        yield {}
+        return
+    state = _state()
+    record = {"name": name, "parent": state.stack[-1] if state.stack else None, "pid": os.getpid(),
+              "start": round(time.time(), 4)}  # epoch seconds, comparable across processes
+    record.update(attrs)
+    state.stack.append(name)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["seconds"] = round(time.perf_counter() - start, 6)
+        record["peak_rss_mb"] = peak_rss_mb()
+        state.stack.pop()
+        (state.collectors[-1] if state.collectors else state.spans).append(record)
+
+
+def traced(name=None, bytes_in=None, rows_out=None, bytes_out=None):
+    # bytes_in(*args, **kwargs) -> bytes read before the call, bytes_out(*args, **kwargs) -> bytes
+    # written after it, rows_out(result) -> rows produced
+    def decorate(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled():
+                return func(*args, **kwargs)
+            with span(stage) as record:
+                if bytes_in is not None:
+                    record["bytes"] = bytes_in(*args, **kwargs)
+                result = func(*args, **kwargs)
+                if rows_out is not None:
+                    record["rows"] = rows_out(result)
+                if bytes_out is not None:
+                    record["bytes"] = bytes_out(*args, **kwargs)
+                return result
+        return wrapper
+    return decorate
+
+
+def path_size(file_path, *args, **kwargs):
+    return os.path.getsize(file_path)
+
+
+def traced_iter(name, iterable, rows_out=None, total_bytes=None):
+    # One span per item pulled from a generator (e.g. streaming parsers); total_bytes is put on
+    # the span that finds the end, so the stage total is right
+    iterator = iter(iterable)
+    while True:
+        with span(name) as record:
+            item = next(iterator, StopIteration)
+            if item is StopIteration:
+                if total_bytes is not None:
+                    record["bytes"] = total_bytes
+            elif rows_out is not None:
+                record["rows"] = rows_out(item)
+        if item is StopIteration:
+            return
+        yield item
+
+
+@contextmanager
+def collect():
+    # Spans recorded inside the block go to the yielded list instead of this process's trace,
+    # e.g. to send a worker's spans back with its result; the caller passes them to add_spans
+    collected = []
+    collectors = _state().collectors
+    collectors.append(collected)
+    try:
+        yield collected
+    finally:
+        collectors.remove(collected)
+
+
+def add_spans(spans):
+    if spans and enabled():
+        _state().spans.extend(spans)
+
+
+def summary_table(spans=None):
+    import pandas as pd
+
+    frame = pd.DataFrame(_state().spans if spans is None else spans)
+    if frame.empty:
+        return frame
+    for column in ("bytes", "rows", "peak_rss_mb"):
+        if column not in frame:
+            frame[column] = float("nan")
+    summary = frame.groupby("name", sort=False).agg(
+        calls=("seconds", "size"), total_s=("seconds", "sum"), mean_s=("seconds", "mean"),
+        max_s=("seconds", "max"), mb=("bytes", lambda b: b.sum(min_count=1) / 1024 ** 2),
+        rows=("rows", lambda r: r.sum(min_count=1)), peak_rss_mb=("peak_rss_mb", "max"))
+    summary["mb_per_s"] = summary["mb"] / summary["total_s"]
+    summary["rows_per_s"] = summary["rows"] / summary["total_s"]
+    return summary.sort_values("total_s", ascending=False).round(3)
+
+
+def finish(script, quiet=False, **info):
+    # Write this thread's trace and print the summary; nested stages are included in their
+    # parent's time. Starts a new trace, for processes that run a script repeatedly (the
+    # Streamlit app).
+    state = _state()
+    if not enabled() or not state.spans:
+        return None
+    trace_dir = os.environ[TRACE_ENV]
+    os.makedirs(trace_dir, exist_ok=True)
+    now = time.time()
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now)) + f"-{int(now * 1000) % 1000:03d}"
+    thread = "" if threading.current_thread() is threading.main_thread() else f"-{threading.get_ident()}"
+    path = os.path.join(trace_dir, f"{script}-{stamp}-{os.getpid()}{thread}.json")
+    summary = summary_table()
+    trace = {
+        "script": script,
+        "started": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(state.started)),
+        "wall_seconds": round(time.time() - state.started, 3),
+        "argv": sys.argv,
+        "info": info,
+        "spans": state.spans,
+        "summary": json.loads(summary.reset_index().to_json(orient="records")),
+    }
+    with open(path, "w") as f:
+        json.dump(trace, f, indent=1, default=str)
+    if not quiet:
+        print(f"\nStage summary ({script}, trace: {path})")
+        print(summary.to_string())
+    state.spans = []
+    state.started = time.time()
+    return path
@@ -0,0 +1,108 @@
+import numpy as np
+
+from eco_engine import evaluate
+
+# Probabilistic NPV on top of eco_engine.evaluate.
+# Draws are generated and evaluated in fixed-size chunks, so the (chunk, years) working
+# arrays stay the same size whatever the number of draws; only one NPV per draw is kept.
+
+DISTRIBUTIONS = ["Fixed", "Uniform", "Triangular", "Normal", "Lognormal"]
+
+# Inputs offered in the app's probabilistic mode
+MC_VARIABLES = {
+    "oil_price": "Oil Price ($/bbl)",
+    "discount_rate": "Discount Rate (fraction)",
+    "cost_per_boe": "Cost per BOE ($/BOE)",
+    "inflation_cost": "Inflation Rate for Costs",
+    "facilities_total_cost": "Total New Facilities Cost ($)",
+}
+
+
+INPUT_LABELS = {"low": "Low", "mode": "Most Likely", "high": "High"}  # the app's column labels
+
+
+def check_distribution(name, spec):
+    # Raises ValueError with a message for the app when spec cannot be sampled
+    dist = spec.get("dist", "Fixed")
+    label = MC_VARIABLES.get(name, name)
+    if dist not in DISTRIBUTIONS:
+        raise ValueError(f"{label}: unknown distribution {dist!r}")
+    needed = ("mode",) if dist == "Fixed" else ("low", "high") if dist in ("Uniform", "Lognormal") \
+        else ("low", "mode", "high")
+    for key in needed:
+        if spec.get(key) is None or not np.isfinite(spec[key]):
+            raise ValueError(f"{label}: {dist} needs a finite {INPUT_LABELS[key]} value")
+
+    low, mode, high = spec.get("low"), spec.get("mode"), spec.get("high")
+    if dist in ("Uniform", "Normal") and low > high:
+        raise ValueError(f"{label}: Low must not be above High")
+    if dist == "Triangular" and not (low < high and low <= mode <= high):
+        raise ValueError(f"{label}: Triangular needs Low < High and Most Likely between them")
+    if dist == "Lognormal" and not 0 < low <= high:
+        raise ValueError(f"{label}: Lognormal needs 0 < Low <= High (its P5 and P95)")
+
+
+def check_distributions(distributions):
+    for name, spec in distributions.items():
+        check_distribution(name, spec)
+
+
+def sample(spec, size, rng):
+    # spec: {"dist": ..., "low": ..., "mode": ..., "high": ...}, checked by check_distribution.
+    # Normal uses "mode" as the mean and "high" - "low" as the 3.29-sigma (P5-P95) spread;
+    # Lognormal reads "low"/"high" as its P5/P95 and does not use "mode"
+    dist = spec.get("dist", "Fixed")
+    low, mode, high = spec.get("low"), spec.get("mode"), spec.get("high")
+
+    if dist == "Fixed":
+        return np.full(size, float(mode))
+    if dist == "Uniform":
+        return rng.uniform(low, high, size)
+    if dist == "Triangular":
+        return rng.triangular(low, mode, high, size)
+    if dist == "Normal":
+        sigma = (high - low) / 3.29
+        return rng.normal(mode, sigma, size)
+    if dist == "Lognormal":
+        # low/high are read as P5/P95 of the lognormal
+        mu = (np.log(low) + np.log(high)) / 2
+        sigma = (np.log(high) - np.log(low)) / 3.29
+        return rng.lognormal(mu, sigma, size)
+    raise ValueError(f"Unknown distribution: {dist}")
+
+
+def run_monte_carlo(schedule, base_params, distributions, n_draws=100_000, chunk_size=10_000,
+                    start_year=2023, fixed_price=True, seed=None, progress=None):
+    check_distributions(distributions)
+    rng = np.random.default_rng(seed)
+    npv = np.empty(n_draws)
+
+    for start in range(0, n_draws, chunk_size):
+        size = min(chunk_size, n_draws - start)
+        params = dict(base_params)
+        for name, spec in distributions.items():
+            params[name] = sample(spec, size, rng)
+        # broadcast fixed inputs to the chunk size
+        params = {k: np.broadcast_to(v, (size,)) for k, v in params.items()}
+
+        result = evaluate(schedule, params, start_year, fixed_price, keep_series=False)
+        npv[start:start + size] = result["npv"]
+
+        if progress is not None:
+            progress((start + size) / n_draws)
+
+    return npv
+
+
+def summarize(npv):
+    # Industry convention: P90 is the value exceeded with 90% probability (10th percentile)
+    p90, p50, p10 = np.percentile(npv, [10, 50, 90])
+    return {
+        "P90 NPV (MM$)": float(p90),
+        "P50 NPV (MM$)": float(p50),
+        "P10 NPV (MM$)": float(p10),
+        "Mean NPV (MM$)": float(npv.mean()),
+        "Std Dev (MM$)": float(npv.std()),
+        "P(NPV < 0)": float((npv < 0).mean()),
+        "Draws": len(npv),
+    }
@@ -0,0 +1,136 @@
+import argparse
+import os
+import time
+
+import pandas as pd
+
+from batch_economics import (evaluate_schedule, load_parameter_file, normalize_case_name, parameter_template,
+                             run_case_jobs, save_results)
+from eco_engine import build_schedule, merge_inputs
+from result_store import DEFAULT_STORE_MB
+from result_store import enable as enable_result_store
+from script_loader import PROD_DATA_PREP, WORKOVER_EXTRACTION, load_script
+from instrumentation import collect, enable, finish, span, traced, traced_iter
+
+# End-to-end study in memory: simulator summary file + .PRT files -> ranked economics.
+# Stage 1's yearly production (1_Prod_Data_Prep.py) and stage 2's schedule
+# (2_Multiple_Workover_Extraction.py) for the same case go straight into the economics engine,
+# without the per-run and per-PRT workbooks in between. Runs and .PRT files are matched by
+# normalized case name, as in batch_economics.py. With export_dir, the usual workbooks are
+# also written there as a side output.
+
+prep = load_script(PROD_DATA_PREP)
+workover = load_script(WORKOVER_EXTRACTION)
+
+
+def production_runs(summary_file):
+    # {run: yearly production (Year, Oil, Condensate, Gas)}; the summary file is streamed
+    frames = traced_iter("read_simulation_data", prep.iter_simulation_frames(summary_file),
+                         rows_out=lambda item: len(item[1]), total_bytes=os.path.getsize(summary_file))
+    return {run: prep.calculate_yearly_changes(run, df) for run, df in frames}
+
+
+def prt_schedule(prt_path):
+    # Stage 2 for one .PRT without the workbook: the "Final Structured Data" schedule plus the
+    # intermediate tables (for export), or None when the file has no connection events
+    df_closing, df_opening = workover.extract_prt_data(prt_path)
+    if df_closing.empty and df_opening.empty:
+        return None
+    tables = {"closing": df_closing, "opening": df_opening}
+    tables["connections"] = workover.compute_connections_per_well(df_closing, df_opening)
+    tables["workovers"] = workover.compute_workovers_per_year(tables["connections"])
+    tables["adjusted"] = workover.enforce_max_workover(tables["workovers"])
+    tables["schedule"] = workover.generate_final_dataframe(tables["adjusted"], os.path.basename(prt_path))
+    return tables
+
+
+@traced()
+def export_workbooks(run, prod_df, prt_path, tables, export_dir):
+    # Same files stages 1 and 2 write: <run>.xlsx and <prt name>_summary.xlsx
+    os.makedirs(export_dir, exist_ok=True)
+    prod_df.to_excel(os.path.join(export_dir, f"{run}.xlsx"), index=False)
+    base_name = os.path.splitext(os.path.basename(prt_path))[0]
+    workover.write_summary_workbook(os.path.join(export_dir, f"{base_name}_summary.xlsx"), tables["schedule"],
+                                    tables["closing"], tables["opening"], tables["connections"],
+                                    tables["workovers"], tables["adjusted"])
+
+
+def evaluate_pipeline_case(run, prod_df, prt_path, gas_df, config, yearly=False, export_dir=None):
+    # Errors are reported, not raised. Returns (indicators, yearly vectors or None, error, seconds).
+    start = time.perf_counter()
+    try:
+        tables = prt_schedule(prt_path)
+        if tables is None:
+            raise ValueError(f"no connection events found in {os.path.basename(prt_path)}")
+        if export_dir:
+            export_workbooks(run, prod_df, prt_path, tables, export_dir)
+        with span("merge_case_inputs", rows=len(prod_df)):
+            schedule = build_schedule(merge_inputs(tables["schedule"], prod_df, gas_df))
+
+        table, series = evaluate_schedule(run, schedule, config, yearly)
+        return table, series, None, time.perf_counter() - start
+    except Exception as e:
+        return None, None, f"{type(e).__name__}: {e}", time.perf_counter() - start
+
+
+def evaluate_pipeline_case_traced(*job):
+    # Pool entry point when tracing: the worker's stage spans travel back with the outcome
+    with collect() as spans:
+        outcome = evaluate_pipeline_case(*job)
+    return outcome + (spans,)
+
+
+def run_pipeline(summary_file, prt_root, makeup_gas, config, workers=None, yearly=False, export_dir=None):
+    # makeup_gas: workbook path or DataFrame. Returns (ranked indicators, errors, yearly vectors)
+    # like batch_economics.run_batch; each case's .PRT is parsed in its worker.
+    productions = {normalize_case_name(run): (run, df) for run, df in production_runs(summary_file).items()}
+    prt_files = {normalize_case_name(os.path.splitext(os.path.basename(path))[0]): path
+                 for path in workover.find_prt_files(prt_root)}
+    gas_df = makeup_gas if isinstance(makeup_gas, pd.DataFrame) else pd.read_excel(makeup_gas)
+
+    matched = sorted(set(productions) & set(prt_files))
+    for key in sorted(set(productions) - set(prt_files)):
+        print(f"No .PRT file for production run {productions[key][0]}")
+    for key in sorted(set(prt_files) - set(productions)):
+        print(f"No production run for {prt_files[key]}")
+
+    jobs = [(productions[k][0], productions[k][1], prt_files[k], gas_df, config, yearly, export_dir) for k in matched]
+    return run_case_jobs(jobs, evaluate_pipeline_case, evaluate_pipeline_case_traced, workers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulator outputs to ranked economics in one pass, without intermediate workbooks")
+    parser.add_argument("summary_file", help="simulator summary file with every run (input of 1_Prod_Data_Prep.py)")
+    parser.add_argument("prt_root", help="folder searched for .PRT files (input of 2_Multiple_Workover_Extraction.py)")
+    parser.add_argument("--makeup-gas", required=True, help="make-up gas schedule workbook")
+    parser.add_argument("--params", help="parameter JSON file (see batch_economics.py --write-params-template)")
+    parser.add_argument("--output", default="ranked_economics.xlsx", help=".xlsx or .csv")
+    parser.add_argument("--yearly-output", metavar="PATH",
+                        help="also write yearly escalated CAPEX and discounted NCF per case (.xlsx/.csv) for portfolio.py")
+    parser.add_argument("--export-dir", metavar="DIR",
+                        help="also write the per-run production and per-PRT summary workbooks to this folder")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (1 = sequential)")
+    parser.add_argument("--trace", metavar="DIR", help="write a stage timing trace (JSON) to this folder")
+    parser.add_argument("--result-store", metavar="PATH",
+                        help="persistent result store (SQLite): scenarios evaluated before are read from it")
+    parser.add_argument("--result-store-mb", type=float, default=DEFAULT_STORE_MB,
+                        help="size limit of the result store; least recently used results are evicted")
+    args = parser.parse_args()
+
+    if args.trace:
+        enable(args.trace)
+    if args.result_store:
+        enable_result_store(args.result_store, args.result_store_mb)
+    config = load_parameter_file(args.params) if args.params else parameter_template()
+    start = time.perf_counter()
+    ranked, errors, yearly = run_pipeline(args.summary_file, args.prt_root, args.makeup_gas, config, args.workers,
+                                          yearly=bool(args.yearly_output), export_dir=args.export_dir)
+    save_results(ranked, errors, args.output)
+    if args.yearly_output:
+        if args.yearly_output.endswith(".csv"):
+            yearly.to_csv(args.yearly_output, index=False)
+        else:
+            yearly.to_excel(args.yearly_output, index=False)
+    print(f"Evaluated {ranked['Case'].nunique() if not ranked.empty else 0} cases x "
+          f"{len(config['scenarios'])} scenarios in {time.perf_counter() - start:.1f} s -> {args.output}")
+    finish("pipeline", summary_file=args.summary_file, prt_root=args.prt_root)
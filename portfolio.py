@@ -0,0 +1,294 @@
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# Capital-constrained portfolio selection across evaluated runs.
+# Each candidate run has a yearly escalated CAPEX vector and an NPV (sum of its discounted NCF).
+# Runs in the same group are alternative development options for the same asset, so at most
+# one per group is funded; the selected set must keep CAPEX within the budget of every year.
+# This is a multiple-choice, multi-dimensional knapsack solved by depth-first branch and bound
+# with a Lagrangian bound: for yearly multipliers lam >= 0,
+#   lam . remaining budget + sum over remaining groups of max(0, max(NPV - lam . CAPEX))
+# bounds every completion of a node. The multipliers are tuned by subgradient steps at the root
+# and refined by a few warm-started steps per node. At the root they also drop runs that cannot
+# be in a better portfolio (reduced-cost fixing) and order groups and options by NPV net of
+# priced CAPEX, so good portfolios are found early. The incumbent is seeded with the best greedy
+# portfolio (plain and priced-CAPEX ratios) improved by drop-and-refill local search. Tight
+# budgets can leave a gap the search cannot close within the node limit; the best portfolio
+# found is then returned with optimal=False, its proven upper bound and the gap between them.
+
+
+def greedy_selection(npv, capex, budget, groups, score=None):
+    # Highest score first (default: NPV per unit of budget-normalized CAPEX), skipping runs that
+    # no longer fit or whose group is already funded
+    if score is None:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            usage = np.nan_to_num(capex / budget, nan=0.0, posinf=0.0).sum(axis=1)
+        score = npv / np.maximum(usage, 1e-12)
+    remaining = budget.copy()
+    used_groups = set()
+    chosen = []
+    for i in np.argsort(-score, kind="stable"):
+        if npv[i] <= 0 or groups[i] in used_groups or np.any(capex[i] > remaining + 1e-9):
+            continue
+        chosen.append(i)
+        used_groups.add(groups[i])
+        remaining -= capex[i]
+    return chosen
+
+
+def improve_selection(npv, capex, budget, groups, chosen, score):
+    # Drop-and-refill local search: remove one funded run, refill greedily by score, keep the
+    # change when the total NPV grows; repeats until no single drop helps
+    best_value = npv[chosen].sum()
+    improved = True
+    while improved:
+        improved = False
+        for i in list(chosen):
+            rest = [j for j in chosen if j != i]
+            open_runs = np.ones(len(npv), dtype=bool)
+            open_runs[i] = False
+            open_runs[np.isin(groups, groups[rest])] = False
+            refill = np.flatnonzero(open_runs)
+            remaining = budget - capex[rest].sum(axis=0)
+            added = greedy_selection(npv[refill], capex[refill], remaining, groups[refill], score[refill])
+            candidate = rest + list(refill[added])
+            if npv[candidate].sum() > best_value + 1e-9:
+                chosen, best_value, improved = candidate, npv[candidate].sum(), True
+                break
+    return chosen
+
+
+def lagrangian_bound(npv, weights, budget, group_starts, lam):
+    # Bound for multipliers lam and its subgradient with respect to lam
+    reduced = npv - weights @ lam
+    group_best = np.maximum.reduceat(reduced, group_starts)
+    value = lam @ budget + np.maximum(group_best, 0.0).sum()
+    best_of_group = np.repeat(group_best, np.diff(np.append(group_starts, len(npv))))
+    taken = (reduced >= best_of_group) & (best_of_group > 0)
+    return value, budget - taken @ weights
+
+
+def improve_multipliers(npv, weights, budget, group_starts, lam, target, steps, patience=1):
+    # Polyak subgradient steps towards the incumbent value; returns the best bound and multipliers
+    # The step scale halves after `patience` steps without a better bound
+    best_value, best_lam = np.inf, lam
+    scale, stale = 2.0, 0
+    for _ in range(steps):
+        value, gradient = lagrangian_bound(npv, weights, budget, group_starts, lam)
+        if value < best_value - 1e-9:
+            best_value, best_lam, stale = value, lam, 0
+        else:
+            stale += 1
+            if stale >= patience:
+                scale, stale = scale / 2, 0
+        norm = gradient @ gradient
+        if norm == 0 or value <= target:
+            break
+        lam = np.maximum(0.0, lam - scale * (value - target) / norm * gradient)
+    return best_value, best_lam
+
+
+def select_portfolio(npv, capex, budget, groups=None, node_limit=200_000, root_steps=300, node_steps=5):
+    # npv: (runs,), capex: (runs, years), budget: (years,) with np.inf for unconstrained years,
+    # groups: (runs,) labels of mutually exclusive options (default: every run on its own).
+    # Returns dict(selected indices, npv, capex used, upper bound, gap, nodes, optimal); when the
+    # node limit is hit the best portfolio found is returned with optimal=False and gap > 0.
+    npv = np.asarray(npv, dtype=float)
+    capex = np.asarray(capex, dtype=float)
+    budget = np.asarray(budget, dtype=float)
+    groups = np.arange(len(npv)) if groups is None else np.asarray(groups)
+
+    # Only positive-NPV runs that fit on their own can be part of the optimum
+    keep = np.flatnonzero((npv > 0) & np.all(capex <= budget + 1e-9, axis=1))
+    _, group_index = np.unique(groups[keep], return_inverse=True)
+    years = np.flatnonzero(np.isfinite(budget))
+    lam = np.zeros(len(years))
+    upper = 0.0
+
+    def lay_out(score):
+        # Candidates group by group: best group first, best option first within a group
+        group_best = np.full(group_index.max() + 1 if len(keep) else 0, -np.inf)
+        np.maximum.at(group_best, group_index, score)
+        rank = np.argsort(np.argsort(-group_best, kind="stable"), kind="stable")
+        layout = np.lexsort((-score, rank[group_index]))
+        depth_of = rank[group_index[layout]]
+        starts = np.flatnonzero(np.r_[True, np.diff(depth_of) != 0]) if len(layout) else np.array([], dtype=int)
+        return layout, depth_of, starts
+
+    def incumbent_for(value_k, capex_k, depth_of, lam):
+        # Best of the plain greedy and the greedy on NPV per unit of priced CAPEX, then improved
+        # by local search
+        priced = capex_k[:, years] @ lam
+        score = value_k / np.maximum(priced, 1e-12) if np.any(lam > 0) else None
+        runs = [greedy_selection(value_k, capex_k, budget, depth_of),
+                greedy_selection(value_k, capex_k, budget, depth_of, score)]
+        chosen = max(runs, key=lambda c: value_k[c].sum())
+        if score is None:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                usage = np.nan_to_num(capex_k / budget, nan=0.0, posinf=0.0).sum(axis=1)
+            score = value_k / np.maximum(usage, 1e-12)
+        return improve_selection(value_k, capex_k, budget, depth_of, chosen, score)
+
+    if len(keep):
+        # Root multipliers on the NPV layout, then reduced-cost fixing: a run whose bound when
+        # forced into the portfolio cannot beat the incumbent is dropped
+        layout, depth_of, group_starts = lay_out(npv[keep])
+        keep, group_index = keep[layout], group_index[layout]
+        value_k, capex_k = npv[keep], capex[keep]
+        weights = capex_k[:, years]
+        incumbent = incumbent_for(value_k, capex_k, depth_of, lam)
+        best_value = value_k[incumbent].sum()
+        upper, lam = improve_multipliers(value_k, weights, budget[years], group_starts, lam,
+                                         best_value, root_steps, patience=20)
+        incumbent = incumbent_for(value_k, capex_k, depth_of, lam)
+        if value_k[incumbent].sum() > best_value:
+            best_value = value_k[incumbent].sum()
+        best_runs = keep[incumbent]
+
+        reduced = value_k - weights @ lam
+        group_best = np.maximum.reduceat(reduced, group_starts)
+        sizes = np.diff(np.append(group_starts, len(keep)))
+        forced_bound = upper - np.repeat(np.maximum(group_best, 0.0), sizes) + reduced
+        viable = forced_bound > best_value + 1e-9
+        keep, group_index, reduced = keep[viable], group_index[viable], reduced[viable]
+        _, group_index = np.unique(group_index, return_inverse=True)
+
+        # Search order: groups and options by NPV net of priced CAPEX at the root multipliers
+        layout, depth_of, group_starts = lay_out(reduced)
+        keep = keep[layout]
+    else:
+        group_starts, best_value, best_runs = np.array([], dtype=int), 0.0, keep
+    group_ends = np.append(group_starts[1:], len(keep))
+    n_groups = len(group_starts)
+
+    value_k = npv[keep]
+    capex_k = capex[keep]
+    weights = capex_k[:, years]
+    best = {"value": float(best_value), "runs": best_runs}
+    nodes = [0]
+
+    def bound(depth, remaining, lam, target):
+        # Candidates of the remaining groups that still fit; the rest are priced out
+        a = group_starts[depth]
+        fits = np.all(capex_k[a:] <= remaining + 1e-9, axis=1)
+        values = np.where(fits, value_k[a:], -np.inf)
+        return improve_multipliers(values, weights[a:], remaining[years], group_starts[depth:] - a,
+                                   lam, target, node_steps)
+
+    def search(depth, remaining, value, chosen, lam):
+        nodes[0] += 1
+        if nodes[0] > node_limit:
+            raise StopIteration
+        if value > best["value"] + 1e-9:
+            best["value"], best["runs"] = value, keep[chosen]
+        if depth == n_groups:
+            return
+        node_bound, lam = bound(depth, remaining, lam, best["value"] - value)
+        if value + node_bound <= best["value"] + 1e-9:
+            return
+        # Options that fit, most attractive at the multipliers first; funding nothing from this
+        # group goes first when no option is worth its priced CAPEX
+        options = np.arange(group_starts[depth], group_ends[depth])
+        options = options[np.all(capex_k[options] <= remaining + 1e-9, axis=1)]
+        reduced = value_k[options] - weights[options] @ lam
+        branches = list(options[np.argsort(-reduced)])
+        branches.insert(int((reduced > 0).sum()), None)
+        for i in branches:
+            if i is None:
+                search(depth + 1, remaining, value, chosen, lam)
+            else:
+                chosen.append(i)
+                search(depth + 1, remaining - capex_k[i], value + value_k[i], chosen, lam)
+                chosen.pop()
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), n_groups + 100))
+    try:
+        if n_groups:
+            search(0, budget.copy(), 0.0, [], lam)
+        optimal = True
+    except StopIteration:
+        optimal = False
+
+    selected = sorted(best["runs"].tolist())
+    value = float(npv[selected].sum())
+    upper = max(float(upper), value) if not optimal else value
+    return {
+        "selected": selected,
+        "npv": value,
+        "capex_used": capex[selected].sum(axis=0),
+        "upper_bound": upper,
+        "gap": upper - value,
+        "nodes": min(nodes[0], node_limit),
+        "optimal": optimal,
+    }
+
+
+def candidates_from_yearly(yearly, years=None):
+    # yearly: long table Case, Year, Escalated CAPEX MM$, Discounted NCF
+    # (the columns 3_Eco_App.py computes; written by batch_economics.py --yearly-output)
+    capex = yearly.pivot_table(index="Case", columns="Year", values="Escalated CAPEX MM$", aggfunc="sum", fill_value=0.0)
+    npv = yearly.groupby("Case")["Discounted NCF"].sum()
+    if years is not None:
+        capex = capex.reindex(columns=years, fill_value=0.0)
+    return capex.index.to_numpy(), npv.reindex(capex.index).to_numpy(), capex.to_numpy(), capex.columns.to_numpy()
+
+
+def portfolio_table(cases, npv, capex, years, budget, result):
+    selected = np.zeros(len(cases), dtype=bool)
+    selected[result["selected"]] = True
+    chosen = pd.DataFrame({"Case": cases, "NPV (MM$)": npv, "Total CAPEX (MM$)": capex.sum(axis=1), "Selected": selected})
+    usage = pd.DataFrame({"Year": years, "Budget (MM$)": budget, "CAPEX Used (MM$)": result["capex_used"]})
+    return chosen.sort_values(["Selected", "NPV (MM$)"], ascending=False).reset_index(drop=True), usage
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="NPV-maximizing portfolio under yearly CAPEX budgets")
+    parser.add_argument("yearly", help="yearly table (.xlsx/.csv) from batch_economics.py --yearly-output")
+    parser.add_argument("--scenario", help="scenario to use when the table holds several")
+    budget_group = parser.add_mutually_exclusive_group(required=True)
+    budget_group.add_argument("--annual-budget", type=float, help="same CAPEX ceiling (MM$) every year")
+    budget_group.add_argument("--budget-file", help="table with Year and Budget MM$ columns")
+    parser.add_argument("--group-pattern", help="regex whose first group is the asset key; runs with the same key are alternatives")
+    parser.add_argument("--node-limit", type=int, default=2_000_000)
+    parser.add_argument("--output", default="portfolio_selection.xlsx")
+    args = parser.parse_args()
+
+    read = pd.read_csv if args.yearly.endswith(".csv") else pd.read_excel
+    yearly = read(args.yearly)
+    if "Scenario" in yearly.columns:
+        scenario = args.scenario or yearly["Scenario"].iloc[0]
+        yearly = yearly[yearly["Scenario"] == scenario]
+
+    cases, npv, capex, years = candidates_from_yearly(yearly)
+    if args.budget_file:
+        read = pd.read_csv if args.budget_file.endswith(".csv") else pd.read_excel
+        budget_df = read(args.budget_file).set_index("Year")["Budget MM$"]
+        budget = budget_df.reindex(years).fillna(np.inf).to_numpy(dtype=float)
+    else:
+        budget = np.full(len(years), args.annual_budget)
+
+    if args.group_pattern:
+        pattern = re.compile(args.group_pattern)
+        groups = np.array([pattern.search(c).group(1) if pattern.search(c) else c for c in cases])
+    else:
+        groups = None
+
+    start = time.perf_counter()
+    result = select_portfolio(npv, capex, budget, groups, args.node_limit)
+    chosen, usage = portfolio_table(cases, npv, capex, years, budget, result)
+    with pd.ExcelWriter(args.output) as writer:
+        chosen.to_excel(writer, sheet_name="Selection", index=False)
+        usage.to_excel(writer, sheet_name="CAPEX by Year", index=False)
+
+    print(f"Selected {len(result['selected'])} of {len(cases)} runs, NPV {result['npv']:,.2f} MM$ "
+          f"({result['nodes']:,} nodes, {'optimal' if result['optimal'] else 'not proven optimal'}, "
+          f"{time.perf_counter() - start:.2f} s) -> {args.output}")
+    if not result["optimal"]:
+        relative = result["gap"] / result["upper_bound"] if result["upper_bound"] > 0 else 0.0
+        print(f"Warning: node limit reached; upper bound {result['upper_bound']:,.2f} MM$, "
+              f"gap {result['gap']:,.2f} MM$ ({relative:.1%}). Raise --node-limit to search further.")
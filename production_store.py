@@ -0,0 +1,78 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+# Columnar store for the yearly production tables written by 1_Prod_Data_Prep.py.
+# Every run goes into one Parquet file (Run, Year, Oil, Condensate, Gas), written in one pass
+# and sorted by run, one row group per run. The file's metadata lists the runs in row group
+# order, so load_run reads just that run's row group instead of opening one workbook per run
+# or scanning the file. Stores written without the list are read with a Run filter.
+# Requires pyarrow.
+
+STORE_COLUMNS = ["Run", "Year", "Oil", "Condensate", "Gas"]
+RUN_INDEX_KEY = b"production_store.runs"  # JSON list: run of each row group
+
+
+def save_production_store(frames, store_path):
+    # frames: dict or iterable of (run, DataFrame with Year/Oil/Condensate/Gas)
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    items = frames.items() if isinstance(frames, dict) else frames
+    parts = [df.assign(Run=run) for run, df in items]
+    if not parts:
+        raise ValueError("No production runs to save.")
+
+    store = pd.concat(parts, ignore_index=True)[STORE_COLUMNS]
+    store["Run"] = store["Run"].astype("category")
+    store = store.sort_values(["Run", "Year"], kind="stable").reset_index(drop=True)
+
+    # Row group boundaries: where the run changes
+    codes = store["Run"].cat.codes.to_numpy()
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(codes)) + 1, [len(store)]])
+    runs = [str(store["Run"].iat[start]) for start in bounds[:-1]]
+    table = pa.Table.from_pandas(store, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), RUN_INDEX_KEY: json.dumps(runs)})
+    with pq.ParquetWriter(store_path, table.schema) as writer:
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            writer.write_table(table.slice(start, stop - start), row_group_size=stop - start)
+    return store_path
+
+
+def run_index(parquet_file):
+    # Run of each row group, or None for a store written without the list
+    runs = (parquet_file.schema_arrow.metadata or {}).get(RUN_INDEX_KEY)
+    return json.loads(runs) if runs is not None else None
+
+
+def list_runs(store_path):
+    import pyarrow.parquet as pq
+
+    runs = run_index(pq.ParquetFile(store_path))
+    if runs is None:
+        runs = pd.read_parquet(store_path, columns=["Run"])["Run"].astype(str).unique()
+    return sorted(runs)
+
+
+def load_run(store_path, run):
+    # Same columns as the per-run workbook: Year, Oil, Condensate, Gas
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(store_path)
+    runs = run_index(parquet_file)
+    if runs is None:
+        df = pd.read_parquet(store_path, filters=[("Run", "==", run)])[STORE_COLUMNS[1:]]
+    elif run in runs:
+        df = parquet_file.read_row_group(runs.index(run), columns=STORE_COLUMNS[1:]).to_pandas()
+    else:
+        df = pd.DataFrame()
+    if df.empty:
+        raise KeyError(f"Run '{run}' not found in {store_path}")
+    return df.reset_index(drop=True)
+
+
+def load_all_runs(store_path):
+    store = pd.read_parquet(store_path)
+    return {str(run): df[STORE_COLUMNS[1:]].reset_index(drop=True)
+            for run, df in store.groupby("Run", observed=True, sort=True)}
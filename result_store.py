@@ -0,0 +1,219 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import time
+from contextlib import closing
+
+import numpy as np
+
+from eco_engine import DEFAULT_PARAMS, SCHEDULE_COLUMNS, SERIES_NODES, broadcast_params, evaluate
+from instrumentation import span
+
+# Persistent result store: evaluated scenarios kept in a local SQLite file, so the same
+# case/parameter combination is a lookup in later sessions, app processes and batch reruns.
+# Each scenario is keyed on a SHA-256 of the schedule arrays, the full parameter set (defaults
+# filled in), start_year, fixed_price, MODEL_VERSION and the stored series; a row holds the
+# indicators and the yearly NCF, discounted NCF and escalated CAPEX vectors (STORED_SERIES), or
+# every series of the app's cash-flow table (TABLE_SERIES).
+# The store is on when the ECONOMICS_RESULT_STORE environment variable names the file (the
+# scripts' --result-store option sets it, so worker processes inherit it). The least recently
+# used rows are evicted once the file's rows exceed ECONOMICS_RESULT_STORE_MB (default 256).
+# WAL mode lets readers run alongside one writer; writers wait for each other (busy timeout).
+# A store that cannot be read or written is reported and the scenarios are evaluated as usual.
+
+STORE_ENV = "ECONOMICS_RESULT_STORE"
+STORE_SIZE_ENV = "ECONOMICS_RESULT_STORE_MB"
+DEFAULT_STORE_MB = 256
+MODEL_VERSION = 1  # bump when eco_engine's formulas change, so older rows are not reused
+BUSY_TIMEOUT = 30.0  # seconds a writer waits for another process
+EVICT_TO = 0.9  # eviction trims to this fraction of the size limit
+
+STORED_INDICATORS = ("npv", "total_revenue", "total_cost", "cumulative_ncf", "cpi", "pir",
+                     "irr", "irr_roots", "payback", "discounted_payback")
+STORED_SERIES = ("ncf", "discounted_ncf", "escalated_capex")
+TABLE_SERIES = ("ncf", "discounted_ncf") + tuple(SERIES_NODES)  # what cash_flow_table lays out
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key BLOB PRIMARY KEY,
+    years INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    bytes INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def enable(path, max_mb=None):
+    os.environ[STORE_ENV] = os.path.abspath(path)
+    if max_mb is not None:
+        os.environ[STORE_SIZE_ENV] = str(max_mb)
+
+
+def store_path():
+    return os.environ.get(STORE_ENV) or None
+
+
+def max_store_bytes():
+    return int(float(os.environ.get(STORE_SIZE_ENV) or DEFAULT_STORE_MB) * 1024 ** 2)
+
+
+def connect(path):
+    # Autocommit connection; transactions are opened explicitly
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    connection = sqlite3.connect(path, timeout=BUSY_TIMEOUT, isolation_level=None)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def scenario_keys(schedule, params=None, start_year=2023, fixed_price=True, series=STORED_SERIES):
+    # One key per scenario: the schedule is hashed once, then each row of the parameter matrix
+    schedule_hash = hashlib.sha256()
+    for name in ("year",) + tuple(SCHEDULE_COLUMNS):
+        schedule_hash.update(name.encode())
+        schedule_hash.update(np.ascontiguousarray(schedule[name], dtype=float).tobytes())
+    names = sorted(DEFAULT_PARAMS)
+    prefix = "|".join([str(MODEL_VERSION), schedule_hash.hexdigest(), str(int(start_year)),
+                       str(bool(fixed_price))] + list(series) + names).encode()
+    arrays = broadcast_params(params)
+    matrix = np.ascontiguousarray(np.stack([arrays[name] for name in names], axis=1), dtype=float)
+    return [hashlib.sha256(prefix + row.tobytes()).digest() for row in matrix]
+
+
+def pack(result, i, series=STORED_SERIES):
+    values = [np.asarray([result[k][i] for k in STORED_INDICATORS], dtype=float)]
+    values += [np.asarray(result[k][i], dtype=float) for k in series]
+    return np.concatenate(values).tobytes()
+
+
+def lookup(path, keys):
+    # {key: packed row} for the keys found; marks them as used
+    found = {}
+    with closing(connect(path)) as connection:
+        for start in range(0, len(keys), 500):  # stay under SQLite's parameter limit
+            chunk = keys[start:start + 500]
+            found.update(connection.execute(f"SELECT key, data FROM results WHERE key IN ({','.join('?' * len(chunk))})",
+                                            chunk).fetchall())
+        if found:
+            now = time.time()
+            connection.execute("BEGIN IMMEDIATE")
+            connection.executemany("UPDATE results SET last_used = ? WHERE key = ?", [(now, k) for k in found])
+            connection.execute("COMMIT")
+    return found
+
+
+def save(path, rows, max_bytes=None):
+    # rows: [(key, years, data)]; evicts the least recently used rows past the size limit
+    max_bytes = max_store_bytes() if max_bytes is None else max_bytes
+    now = time.time()
+    with closing(connect(path)) as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                                   [(key, years, data, len(key) + len(data), now) for key, years, data in rows])
+            evict(connection, max_bytes)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+
+def evict(connection, max_bytes):
+    total = connection.execute("SELECT COALESCE(SUM(bytes), 0) FROM results").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    excess = total - int(max_bytes * EVICT_TO)
+    oldest = []
+    for key, size in connection.execute("SELECT key, bytes FROM results ORDER BY last_used"):
+        oldest.append((key,))
+        excess -= size
+        if excess <= 0:
+            break
+    connection.executemany("DELETE FROM results WHERE key = ?", oldest)
+    return len(oldest)
+
+
+def evaluate_stored(schedule, params=None, start_year=2023, fixed_price=True, path=None, series=STORED_SERIES):
+    # evaluate(..., with_cash_flow_metrics=True) through the store (path, else the environment
+    # variable): the indicators and the series of every scenario, plus "hits", the number of
+    # scenarios read from the store. Only the scenarios not found are evaluated.
+    path = path or store_path()
+    arrays = broadcast_params(params)
+    n = len(next(iter(arrays.values())))
+    years = len(schedule["year"])
+    keys = scenario_keys(schedule, arrays, start_year, fixed_price, series) if path else [None] * n
+
+    found = {}
+    if path:
+        with span("result_store lookup", rows=n) as record:
+            try:
+                found = lookup(path, keys)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Result store {path} not readable ({e}); evaluating every scenario")
+                path = None
+            record["hits"] = len(found)
+
+    result = {k: np.empty(n) for k in STORED_INDICATORS}
+    result.update({k: np.empty((n, years)) for k in series})
+    hit = [i for i, key in enumerate(keys) if key in found]
+    missing = [i for i, key in enumerate(keys) if key not in found]
+    if hit:
+        # Rows are indicators then series, all float64: one reshape unpacks every hit
+        packed = np.frombuffer(b"".join(found[keys[i]] for i in hit), dtype=float).reshape(len(hit), -1)
+        for j, k in enumerate(STORED_INDICATORS):
+            result[k][hit] = packed[:, j]
+        stored = packed[:, len(STORED_INDICATORS):].reshape(len(hit), len(series), years)
+        for j, k in enumerate(series):
+            result[k][hit] = stored[:, j]
+
+    if missing:
+        evaluated = evaluate(schedule, {k: v[missing] for k, v in arrays.items()}, start_year, fixed_price,
+                             keep_series=bool(set(series) & set(SERIES_NODES)), with_cash_flow_metrics=True)
+        for k in STORED_INDICATORS + tuple(series):
+            result[k][missing] = evaluated[k]
+        if path:
+            rows = [(keys[i], years, pack(evaluated, j, series)) for j, i in enumerate(missing)]
+            try:
+                with span("result_store save", rows=len(rows)):
+                    save(path, rows)
+            except (sqlite3.Error, OSError) as e:
+                print(f"Result store {path} not writable ({e}); results not stored")
+
+    result["irr_roots"] = result["irr_roots"].astype(int)
+    result["hits"] = n - len(missing)
+    return result
+
+
+def store_stats(path):
+    with closing(connect(path)) as connection:
+        entries, size, oldest, newest = connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(bytes), 0), MIN(last_used), MAX(last_used) FROM results").fetchone()
+    return {"entries": entries, "mb": size / 1024 ** 2, "oldest": oldest, "newest": newest}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect, trim or clear a persistent economics result store")
+    parser.add_argument("path", help="result store file (SQLite)")
+    parser.add_argument("--max-mb", type=float, help="evict least recently used rows down to this size")
+    parser.add_argument("--clear", action="store_true", help="delete every stored result")
+    args = parser.parse_args()
+
+    with closing(connect(args.path)) as connection:
+        connection.execute("BEGIN IMMEDIATE")
+        if args.clear:
+            connection.execute("DELETE FROM results")
+        elif args.max_mb is not None:
+            print(f"Evicted {evict(connection, int(args.max_mb * 1024 ** 2))} results")
+        connection.execute("COMMIT")
+        if args.clear:
+            connection.execute("VACUUM")
+    stats = store_stats(args.path)
+    print(f"{args.path}: {stats['entries']:,} results, {stats['mb']:.1f} MB")
+    if stats["entries"]:
+        print(f"Least recently used: {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['oldest']))}, "
+              f"most recently used: {time.strftime('%Y-%m-%d %H:%M', time.localtime(stats['newest']))}")
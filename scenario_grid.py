@@ -0,0 +1,95 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from eco_engine import evaluate
+from instrumentation import finish
+
+# Full-factorial scenario grid on top of eco_engine.evaluate.
+# Two to four inputs each get a range of values; every combination is evaluated, in fixed-size
+# chunks like the Monte Carlo draws. Inputs outside the grid stay scalars, so the series that
+# do not depend on the grid inputs (e.g. CAPEX for a price x discount-rate grid) are taken from
+# the base evaluation instead of being recomputed for every chunk.
+# start_grid_job runs the grid in a background thread that reports progress and can be
+# cancelled, so the Streamlit session keeps responding while large grids (10^5+ points) run.
+
+MIN_GRID_INPUTS = 2
+MAX_GRID_INPUTS = 4
+MAX_GRID_SCENARIOS = 5_000_000  # one NPV (8 bytes) is kept per scenario
+
+
+def grid_axes(ranges):
+    # ranges: {input: (low, high, points)} -> {input: values}, in the order given
+    return {name: np.linspace(low, high, int(points)) for name, (low, high, points) in ranges.items()}
+
+
+def run_grid(schedule, base_params, axes, chunk_size=10_000, start_year=2023, fixed_price=True,
+             progress=None, cancel=None):
+    # NPV of every combination of the axes values, shaped (len(axis) for axis in axes).
+    # progress(fraction) is called after each chunk; when the cancel event is set, the
+    # remaining points are left as NaN.
+    if not MIN_GRID_INPUTS <= len(axes) <= MAX_GRID_INPUTS:
+        raise ValueError(f"A scenario grid needs {MIN_GRID_INPUTS} to {MAX_GRID_INPUTS} inputs.")
+    names = list(axes)
+    shape = tuple(len(axes[name]) for name in names)
+    total = int(np.prod(shape))
+    if total > MAX_GRID_SCENARIOS:
+        raise ValueError(f"{total:,} scenarios is more than the {MAX_GRID_SCENARIOS:,} a grid can hold.")
+    npv = np.full(total, np.nan)
+
+    base = evaluate(schedule, base_params, start_year, fixed_price, keep_series=False)
+    for start in range(0, total, chunk_size):
+        if cancel is not None and cancel.is_set():
+            break
+        stop = min(start + chunk_size, total)
+        index = np.unravel_index(np.arange(start, stop), shape)
+        params = dict(base_params)
+        params.update({name: axes[name][i] for name, i in zip(names, index)})
+        result = evaluate(schedule, params, start_year, fixed_price, keep_series=False, previous=base)
+        npv[start:stop] = result["npv"]
+
+        if progress is not None:
+            progress(stop / total)
+
+    return npv.reshape(shape)
+
+
+def grid_frame(axes, npv):
+    # Long table: one column per grid input and the NPV
+    mesh = np.meshgrid(*axes.values(), indexing="ij")
+    frame = pd.DataFrame({name: values.ravel() for name, values in zip(axes, mesh)})
+    frame["NPV (MM$)"] = npv.ravel()
+    return frame
+
+
+def start_grid_job(schedule, base_params, axes, chunk_size=10_000, start_year=2023, fixed_price=True):
+    # Runs run_grid in a daemon thread. The returned job dict is updated in place:
+    # status "running" -> "done" | "cancelled" | "failed", progress 0..1, npv, error, seconds.
+    job = {"axes": axes, "status": "running", "progress": 0.0, "npv": None, "error": None,
+           "seconds": 0.0, "cancel": threading.Event()}
+
+    def work():
+        # status is set last, so a poller that sees it finished also sees npv and seconds
+        start = time.perf_counter()
+        try:
+            npv = run_grid(schedule, base_params, axes, chunk_size, start_year, fixed_price,
+                           progress=lambda fraction: job.update(progress=fraction), cancel=job["cancel"])
+            # a cancel that arrives after the last chunk leaves a complete grid
+            status = "cancelled" if job["cancel"].is_set() and np.isnan(npv).any() else "done"
+            job["npv"] = npv
+        except Exception as e:
+            job["error"] = f"{type(e).__name__}: {e}"
+            status = "failed"
+        job["seconds"] = time.perf_counter() - start
+        job["status"] = status
+        finish("scenario_grid", quiet=True)  # this thread's spans, when tracing
+
+    job["thread"] = threading.Thread(target=work, name="scenario-grid", daemon=True)
+    job["thread"].start()
+    return job
+
+
+def cancel_grid_job(job):
+    job["cancel"].set()
@@ -0,0 +1,22 @@
+import importlib.util
+import os
+import sys
+
+# The pipeline scripts start with a digit (1_Prod_Data_Prep.py, ...), so they cannot be
+# imported with a normal import statement; load them by file name instead.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+PROD_DATA_PREP = "1_Prod_Data_Prep.py"
+WORKOVER_EXTRACTION = "2_Multiple_Workover_Extraction.py"
+
+
+def load_script(file_name):
+    module_name = "script_" + os.path.splitext(file_name)[0].lower()
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(SCRIPT_DIR, file_name))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
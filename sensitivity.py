@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+from eco_engine import broadcast_params, evaluate
+
+# One-at-a-time sensitivity over the model inputs (tornado and spider charts).
+# Every input is moved by the same relative steps while the others stay at their base values;
+# all cases go through eco_engine.evaluate as one batch.
+
+# Model inputs used by the cash-flow model, with the app's labels. Operating efficiency and the
+# injection/source well costs are inputs on the page but do not enter the cash flow, so they
+# would always show zero swing and are not listed.
+SENSITIVITY_VARIABLES = {
+    "oil_price": "Oil Price ($/bbl)",
+    "gas_price": "Gas Price ($/MMSCF)",
+    "condensate_price": "Condensate Price ($/bbl)",
+    "inflation_oil": "Inflation Rate for Oil Price",
+    "inflation_cost": "Inflation Rate for Costs",
+    "discount_rate": "Discount Rate",
+    "cost_per_boe": "Cost per BOE ($/BOE)",
+    "conversion_factor": "Gas to BOE Conversion Factor",
+    "makeup_gas_daily_mmscf": "Daily Make-up Gas Requirement (MMSCF)",
+    "makeup_gas_cost": "Makeup Gas Cost ($/MMSCF)",
+    "vert_cost": "Cost of New Vertical Well",
+    "horiz_cost": "Cost of New Horizontal Well",
+    "workover_perf_cost": "Workover (Perf or Shut-off) Cost",
+    "workover_pump_cost": "Workover (Pump Replacement) Cost",
+    "facilities_total_cost": "Total New Facilities Cost",
+}
+
+
+def one_at_a_time(schedule, base_params, variables=None, span=0.2, steps=5,
+                  start_year=2023, fixed_price=True, metric="npv"):
+    # Relative changes -span..+span in 2*steps+1 points for every variable, evaluated together.
+    # Returns a long DataFrame: Variable, Label, Change, Value, <metric>
+    variables = list(variables or SENSITIVITY_VARIABLES)
+    changes = np.linspace(-span, span, 2 * steps + 1)
+    base = {k: v[0] for k, v in broadcast_params(base_params).items()}
+
+    n_cases = len(variables) * len(changes)
+    params = {k: np.full(n_cases, v) for k, v in base.items()}
+    for i, var in enumerate(variables):
+        params[var][i * len(changes):(i + 1) * len(changes)] = base[var] * (1 + changes)
+
+    result = evaluate(schedule, params, start_year, fixed_price, keep_series=False)
+    return pd.DataFrame({
+        "Variable": np.repeat(variables, len(changes)),
+        "Label": np.repeat([SENSITIVITY_VARIABLES.get(v, v) for v in variables], len(changes)),
+        "Change": np.tile(changes, len(variables)),
+        "Value": np.concatenate([params[v][i * len(changes):(i + 1) * len(changes)] for i, v in enumerate(variables)]),
+        metric: result[metric],
+    })
+
+
+def tornado_table(sensitivity, metric="npv"):
+    # Metric at the lowest and highest change of every variable, sorted by swing (largest first)
+    low = sensitivity.loc[sensitivity.groupby("Variable", sort=False)["Change"].idxmin()]
+    high = sensitivity.loc[sensitivity.groupby("Variable", sort=False)["Change"].idxmax()]
+    table = pd.DataFrame({
+        "Variable": low["Variable"].to_numpy(),
+        "Label": low["Label"].to_numpy(),
+        "Low Input": low["Value"].to_numpy(),
+        "High Input": high["Value"].to_numpy(),
+        "Low Case": low[metric].to_numpy(),
+        "High Case": high[metric].to_numpy(),
+    })
+    table["Swing"] = (table["High Case"] - table["Low Case"]).abs()
+    return table.sort_values("Swing", ascending=False).reset_index(drop=True)
+
+
+def plot_tornado(ax, table, base_value, metric_label="NPV (MM$)"):
+    table = table.iloc[::-1]  # largest swing on top
+    y = np.arange(len(table))
+    ax.barh(y, table["Low Case"] - base_value, left=base_value, color="red", label="Input -")
+    ax.barh(y, table["High Case"] - base_value, left=base_value, color="green", label="Input +")
+    ax.set_yticks(y)
+    ax.set_yticklabels(table["Label"])
+    ax.axvline(base_value, color="black", linewidth=0.8)
+    ax.set_xlabel(metric_label)
+    ax.legend()
+    ax.grid(True, axis="x")
+
+
+def plot_spider(ax, sensitivity, metric="npv", metric_label="NPV (MM$)"):
+    for label, group in sensitivity.groupby("Label", sort=False):
+        ax.plot(group["Change"] * 100, group[metric], marker="o", markersize=3, label=label)
+    ax.set_xlabel("Change in Input (%)")
+    ax.set_ylabel(metric_label)
+    ax.axvline(0, color="gray", linewidth=0.8)
+    ax.grid(True)
+    ax.legend(fontsize=7)
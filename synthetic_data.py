@@ -0,0 +1,144 @@
+import argparse
+import os
+import random
+
+# Synthetic inputs for benchmarking the three pipeline stages:
+# - simulator summary files in the Prod_all_cases.txt layout read by 1_Prod_Data_Prep.py
+# - .PRT files with connection open/close messages read by 2_Multiple_Workover_Extraction.py
+# Run and case names follow the study naming (BDPRODUCERS 2027/2029/2032, 4VINFILL, 12VINFILL)
+# so the business rules in both scripts are exercised.
+
+MONTHS = ["JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+CASE_NAMES = ["BASE", "4VINFILL", "12VINFILL", "BDPRODUCERS_2027", "BDPRODUCERS_2029", "BDPRODUCERS_2032",
+              "4VINFILL_BDPRODUCERS_2029", "12VINFILL_BDPRODUCERS_2032"]
+CHOPPED_SHARE = 0.22  # share of .PRT steps that are "Timestep chopped" messages
+MAX_EVENT_DENSITY = 1 - CHOPPED_SHARE  # the rest of the steps are report steps
+
+
+def case_name(index):
+    return f"CASE{index:04d}_{CASE_NAMES[index % len(CASE_NAMES)]}"
+
+
+def write_summary_file(file_path, runs=10, start_year=2024, years=26, steps_per_year=1,
+                       size_gb=None, seed=0):
+    # One "SUMMARY OF RUN" block per run with DATE ... GPT OPT rows (yearly by default).
+    # With size_gb, runs are added until the file reaches that size.
+    rng = random.Random(seed)
+    target = size_gb * 1024 ** 3 if size_gb else None
+    n_runs = 0
+    with open(file_path, "w") as file:
+        while (n_runs < runs) if target is None else (file.tell() < target):
+            name = case_name(n_runs).replace("_", " ")
+            file.write(f"\n SUMMARY OF RUN: {name} : ECLIPSE  VERSION 2023.1\n")
+            file.write(" DATE         YEARS        FOPR         FGPR         FWCT         GPT          OPT\n")
+            file.write("              YEARS        STB/DAY      MSCF/DAY                  MSCF         STB\n")
+            file.write(" -------------------------------------------------------------------------------------\n")
+            opt = gpt = 0.0
+            oil_rate = rng.uniform(5e3, 3e4)
+            decline = rng.uniform(0.05, 0.2)
+            for step in range(years * steps_per_year + 1):
+                year = start_year + step // steps_per_year
+                month = MONTHS[(step % steps_per_year) * 12 // steps_per_year]
+                rate = oil_rate * (1 - decline) ** (step / steps_per_year)
+                gas_rate = rate * rng.uniform(0.8, 1.2)
+                opt += rate * 365 / steps_per_year
+                gpt += gas_rate * 365 / steps_per_year
+                file.write(f" 01-{month}-{year}  {step / steps_per_year:10.4f}  {rate:11.2f}  {gas_rate:11.2f}"
+                           f"  {rng.random():10.4f}  {gpt:13.1f}  {opt:13.1f}\n")
+            n_runs += 1
+    return n_runs
+
+
+def write_synthetic_prt(file_path, size_mb, wells=40, event_density=0.08, report_density=0.1,
+                        start_year=2024, years=26, seed=0):
+    # Message blocks and report steps until the file reaches size_mb. event_density is the
+    # share of steps carrying a closing/opening connection message (5:3), report_density the
+    # share followed by a well report table. Step times advance with the bytes written, so the
+    # steps span `years` from start_year whatever the size.
+    if not 0 < event_density < MAX_EVENT_DENSITY:
+        raise ValueError(f"event_density must be between 0 and {MAX_EVENT_DENSITY:g} (exclusive), got {event_density}")
+    if years <= 0:
+        raise ValueError(f"years must be positive, got {years}")
+    rng = random.Random(seed)
+    target = size_mb * 1024 * 1024
+    days = 0.0
+    closing_share = event_density * 5 / 8
+    with open(file_path, "w", encoding="utf-8") as file:
+        while file.tell() < target:
+            days = max(days + rng.random() * 1e-3, years * 365 * file.tell() / target)
+            year = start_year + int(days // 365)
+            date = f"{rng.randint(1, 28)} {MONTHS[int(days % 365) // 31]} {year}"
+            well = f"P{rng.randint(1, wells)}"
+            kind = rng.random()
+            if kind < closing_share:
+                file.write(f"@--Message at {days:.5f} Days {date}  Report step\n")
+                file.write(f"@ Closing connection ({rng.randint(1, 99)}, {rng.randint(1, 99)}, {rng.randint(1, 20)}) in well {well}\n")
+                file.write("@ well water cut is above limit\n")
+                file.write(f"@ Value is {rng.uniform(0.9, 1):.4f}, limit is 0.9000\n")
+            elif kind < event_density:
+                file.write(f"@--Message at {days:.5f} Days {date}  Report step\n")
+                file.write(f"@ Opening connection {rng.randint(1, 20)} in well {well}\n")
+            elif kind < event_density + CHOPPED_SHARE:
+                file.write(f"@--Message at {days:.5f} Days {date}  Report step\n")
+                file.write("@ Timestep chopped, convergence failure\n")
+            else:
+                # Report step: convergence line plus a well report table, as in real .PRT output
+                file.write(f" STEP {int(days * 10):6d} TIME= {days:10.2f} DAYS  NEWTON ITERATIONS {rng.randint(1, 12)}\n")
+                if rng.random() < report_density / (MAX_EVENT_DENSITY - event_density):
+                    for w in range(1, wells + 1):
+                        file.write(f":P{w:<7d}:{rng.uniform(0, 5e3):10.1f}:{rng.uniform(0, 1):8.4f}:{rng.uniform(0, 5e4):10.1f}:{rng.uniform(1e3, 4e3):9.1f}:\n")
+
+
+def write_prt_study(root_dir, cases=4, size_mb=10, wells=40, event_density=0.08, years=26, seed=0):
+    # prt_files-style tree: one sub-folder and .PRT per case
+    paths = []
+    for i in range(cases):
+        case_dir = os.path.join(root_dir, case_name(i))
+        os.makedirs(case_dir, exist_ok=True)
+        path = os.path.join(case_dir, f"{case_name(i)}.PRT")
+        write_synthetic_prt(path, size_mb, wells=wells, event_density=event_density, years=years, seed=seed + i)
+        paths.append(path)
+    return paths
+
+
+def event_density_arg(value):
+    density = float(value)
+    if not 0 < density < MAX_EVENT_DENSITY:
+        raise argparse.ArgumentTypeError(f"must be between 0 and {MAX_EVENT_DENSITY:g} (exclusive)")
+    return density
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic summary and .PRT files")
+    sub = parser.add_subparsers(dest="kind", required=True)
+
+    p_summary = sub.add_parser("summary", help="Prod_all_cases.txt-style summary file")
+    p_summary.add_argument("path")
+    p_summary.add_argument("--runs", type=int, default=10)
+    p_summary.add_argument("--years", type=int, default=26)
+    p_summary.add_argument("--steps-per-year", type=int, default=1)
+    p_summary.add_argument("--size-gb", type=float, help="grow the file to this size instead of --runs")
+
+    p_prt = sub.add_parser("prt", help="prt_files-style folder of .PRT files")
+    p_prt.add_argument("root_dir")
+    p_prt.add_argument("--cases", type=int, default=4)
+    p_prt.add_argument("--size-mb", type=float, default=10)
+    p_prt.add_argument("--size-gb", type=float, help="size per case in GB (overrides --size-mb)")
+    p_prt.add_argument("--wells", type=int, default=40)
+    p_prt.add_argument("--event-density", type=event_density_arg, default=0.08,
+                       help=f"share of steps with a connection message (0 to {MAX_EVENT_DENSITY:g})")
+    p_prt.add_argument("--years", type=int, default=26, help="simulated years the steps span")
+
+    for p in (p_summary, p_prt):
+        p.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.kind == "summary":
+        n = write_summary_file(args.path, args.runs, years=args.years, steps_per_year=args.steps_per_year,
+                               size_gb=args.size_gb, seed=args.seed)
+        print(f"Wrote {n} runs to {args.path}")
+    else:
+        size_mb = args.size_gb * 1024 if args.size_gb else args.size_mb
+        paths = write_prt_study(args.root_dir, args.cases, size_mb, args.wells, args.event_density, args.years,
+                                args.seed)
+        print(f"Wrote {len(paths)} .PRT files under {args.root_dir}")
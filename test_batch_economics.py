@@ -0,0 +1,56 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from batch_economics import evaluate_schedule, load_parameter_file, parameter_template, run_case_jobs, scenario_params
+from eco_engine import evaluate
+
+
+def test_load_parameter_file(tmp_path):
+    path = tmp_path / "params.json"
+    path.write_text(json.dumps({"base": {"oil_price": 75.0}}))
+    config = load_parameter_file(path)
+    assert config["start_year"] == 2023 and config["fixed_price"] is True
+    assert config["scenarios"] == {"Base": {}}
+
+    path.write_text(json.dumps({"scenarios": {"High": {"oil_prize": 80.0}}}))
+    with pytest.raises(ValueError, match="oil_prize"):
+        load_parameter_file(path)
+
+
+def test_evaluate_schedule_matches_engine(make_schedule):
+    # One vectorized evaluation of every scenario gives each scenario's own NPV
+    schedule = make_schedule()
+    config = parameter_template()
+    names, params = scenario_params(config)
+    table, yearly = evaluate_schedule("CASE0001", schedule, config, yearly=True)
+
+    assert table["Scenario"].tolist() == names
+    for i, name in enumerate(names):
+        single = {k: v[i] for k, v in params.items()}
+        result = evaluate(schedule, single, config["start_year"], config["fixed_price"], keep_series=False)
+        assert np.isclose(table["NPV (MM$)"].iloc[i], result["npv"][0])
+        scenario_yearly = yearly[yearly["Scenario"] == name]
+        assert scenario_yearly["Year"].tolist() == schedule["year"].tolist()
+        assert np.isclose(scenario_yearly["Discounted NCF"].sum(), result["npv"][0])
+
+
+def fake_case(case, npv, fail=False):
+    # Worker stand-in: (indicators, yearly vectors, error, seconds)
+    if fail:
+        return None, None, "ValueError: bad schedule", 0.0
+    table = pd.DataFrame({"Case": [case, case], "Scenario": ["Low", "High"], "NPV (MM$)": [npv, npv * 2]})
+    series = pd.DataFrame({"Case": case, "Scenario": ["Low", "Low"], "Year": [2024, 2025]})
+    return table, series, None, 0.0
+
+
+def test_run_case_jobs_orders_outputs():
+    jobs = [("C3", 5.0), ("C1", 9.0), ("C4", 0.0, True), ("C2", 7.0), ("C0", 0.0, True)]
+    ranked, errors, yearly = run_case_jobs(jobs, fake_case, fake_case, workers=1)
+
+    assert ranked[ranked["Scenario"] == "Low"]["Case"].tolist() == ["C1", "C2", "C3"]
+    assert ranked["NPV Rank"].tolist() == [1, 2, 3, 1, 2, 3]
+    assert errors["Case"].tolist() == ["C0", "C4"]
+    assert yearly["Case"].tolist() == ["C1", "C1", "C2", "C2", "C3", "C3"]
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from break_even import break_even, break_even_runs
+from eco_engine import evaluate
+
+INPUTS = ["oil_price", "cost_per_boe", "facilities_total_cost", "inflation_cost", "conversion_factor"]
+RATES = np.linspace(0.0, 0.3, 7)
+
+
+def npv_at_break_even(schedule, table, name, base_params=None, start_year=2024):
+    # NPV with the input set to its break-even, one scenario per discount rate
+    params = dict(base_params or {}, discount_rate=table["Discount Rate"].to_numpy())
+    params[name] = table[name].to_numpy()
+    return evaluate(schedule, params, start_year, keep_series=False)["npv"]
+
+
+def test_npv_is_zero_at_break_even(make_schedule):
+    schedule = make_schedule()
+    base_params = {"oil_price": 70.0}
+    table = break_even(schedule, base_params, INPUTS, RATES, start_year=2024)
+    scale = evaluate(schedule, base_params, 2024, keep_series=False)["total_revenue"][0]
+    for name in INPUTS:
+        solved = table[name].notna()
+        assert solved.any(), name
+        npv = npv_at_break_even(schedule, table[solved], name, base_params)
+        assert np.all(np.abs(npv) <= 1e-6 * scale), name
+
+
+def test_no_break_even_when_npv_does_not_depend_on_input(make_schedule):
+    schedule = make_schedule()
+    schedule["cond"] = np.zeros_like(schedule["cond"])
+    table = break_even(schedule, {}, ["condensate_price"], RATES, start_year=2024)
+    assert table["condensate_price"].isna().all()
+
+
+def test_unknown_input(make_schedule):
+    with pytest.raises(ValueError, match="availability"):
+        break_even(make_schedule(), {}, ["availability"], RATES)
+
+
+def test_runs_match_single_runs(make_schedule):
+    # Runs with different year spans solved together give each run's own break-evens
+    schedules = {"RUN_A": make_schedule(seed=1), "RUN_B": make_schedule(seed=2, start_year=2026, years=14),
+                 "RUN_C": make_schedule(seed=3, years=25)}
+    table = break_even_runs(schedules, {"oil_price": 70.0}, INPUTS, RATES, start_year=2024)
+    assert table["Run"].tolist() == [run for run in schedules for _ in RATES]
+    for run, schedule in schedules.items():
+        expected = break_even(schedule, {"oil_price": 70.0}, INPUTS, RATES, start_year=2024)
+        got = table[table["Run"] == run].drop(columns="Run").reset_index(drop=True)
+        pd.testing.assert_frame_equal(got, expected, rtol=1e-8)
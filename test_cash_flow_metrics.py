@@ -0,0 +1,41 @@
+import numpy as np
+
+from cash_flow_metrics import irr, payback_period
+
+
+def scalar_irr(cash_flows, lo=-0.95, hi=10.0):
+    # Plain bisection on one cash-flow vector with a single sign change of NPV in [lo, hi]
+    npv = lambda rate: sum(cf / (1 + rate) ** t for t, cf in enumerate(cash_flows))  # noqa: E731
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        if npv(lo) * npv(mid) <= 0:
+            hi = mid
+        else:
+            lo = mid
+    return (lo + hi) / 2
+
+
+def test_irr_matches_scalar_root():
+    # Investment-type cash flows (outflows first, then inflows) have exactly one IRR
+    rng = np.random.default_rng(0)
+    cash_flows = np.hstack([-rng.uniform(50, 500, (300, 2)), rng.uniform(0, 120, (300, 18))])
+    values, roots = irr(cash_flows)
+    expected = np.array([scalar_irr(cf) for cf in cash_flows])
+    assert np.all(roots == 1)
+    assert np.allclose(values, expected, atol=1e-8)
+
+
+def test_irr_without_root():
+    # No up-front investment, or no inflows at all: no IRR
+    values, roots = irr(np.array([[10.0, 20.0, 30.0], [-100.0, 0.0, -5.0]]))
+    assert np.isnan(values).all()
+    assert roots.tolist() == [0, 0]
+
+
+def test_payback_period():
+    cash_flows = np.array([[-100.0, 60.0, 60.0], [10.0, 5.0, 5.0], [-100.0, 10.0, 10.0], [-100.0, 200.0, -150.0]])
+    period = payback_period(cash_flows)
+    assert np.isclose(period[0], 2 + 40 / 60)
+    assert period[1] == 0.0
+    assert np.isnan(period[2])
+    assert np.isnan(period[3])  # negative again at the end
@@ -0,0 +1,61 @@
+import numpy as np
+
+from eco_engine import MODEL_NODES, SERIES_NODES, evaluate
+
+
+def downstream(inputs):
+    # Nodes that depend, directly or not, on any of the inputs
+    affected = set(inputs)
+    for name, (dependencies, _) in MODEL_NODES.items():
+        if affected.intersection(dependencies):
+            affected.add(name)
+    return affected - set(inputs)
+
+
+def assert_same_result(a, b):
+    for key in ("npv", "total_revenue", "total_cost", "cpi", "pir", "ncf", "discounted_ncf", "irr", "payback"):
+        assert np.allclose(a[key], b[key], equal_nan=True), key
+    for key in SERIES_NODES:
+        assert np.allclose(a[key], b[key], equal_nan=True), key
+
+
+def test_reuse_recomputes_only_downstream_nodes(make_schedule):
+    schedule = make_schedule()
+    params = {"oil_price": np.array([50.0, 60.0, 70.0]), "cost_per_boe": 9.0}
+    base = evaluate(schedule, params, 2024, keep_series=True, with_cash_flow_metrics=True)
+    assert set(base["recomputed"]) == set(MODEL_NODES)
+
+    for changed in ({"oil_price": np.array([55.0, 65.0, 75.0])}, {"cost_per_boe": 12.0},
+                    {"inflation_cost": 0.03}, {"discount_rate": np.array([0.08, 0.1, 0.12])}):
+        new_params = dict(params, **changed)
+        reused = evaluate(schedule, new_params, 2024, keep_series=True, with_cash_flow_metrics=True, previous=base)
+        assert set(reused["recomputed"]) == downstream(changed)
+        assert_same_result(reused, evaluate(schedule, new_params, 2024, keep_series=True, with_cash_flow_metrics=True))
+
+
+def test_price_change_reuses_costs(make_schedule):
+    schedule = make_schedule()
+    base = evaluate(schedule, {"oil_price": 60.0}, 2024)
+    reused = evaluate(schedule, {"oil_price": 80.0}, 2024, previous=base)
+    for name in ("total_capex", "escalated_capex", "escalated_opex", "escalated_cost", "discount_factor"):
+        assert name not in reused["recomputed"]
+        assert reused["model"][name] is base["model"][name]
+
+
+def test_unchanged_inputs_recompute_nothing(make_schedule):
+    schedule = make_schedule()
+    params = {"oil_price": np.array([50.0, 70.0])}
+    base = evaluate(schedule, params, 2024)
+    # Equal values in new arrays count as unchanged, and a scalar equals a length-1 vector
+    again = evaluate(schedule, {"oil_price": np.array([50.0, 70.0])}, 2024, previous=base)
+    assert again["recomputed"] == []
+    single = evaluate(schedule, {"oil_price": 50.0}, 2024)
+    assert evaluate(schedule, {"oil_price": [50.0]}, 2024, previous=single)["recomputed"] == []
+
+
+def test_previous_without_model(make_schedule):
+    # A result without a model (e.g. read from the result store) starts from scratch
+    schedule = make_schedule()
+    result = evaluate(schedule, {"oil_price": 65.0}, 2024, previous={"npv": np.zeros(1)})
+    assert set(result["recomputed"]) >= {"ncf", "npv"}
+    assert np.allclose(result["npv"], evaluate(schedule, {"oil_price": 65.0}, 2024)["npv"])
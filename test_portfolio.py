@@ -0,0 +1,57 @@
+import itertools
+
+import numpy as np
+
+from portfolio import select_portfolio
+
+
+def brute_force(npv, capex, budget, groups):
+    # Best NPV over every subset with at most one run per group that fits every yearly budget
+    best = 0.0
+    for mask in itertools.product([False, True], repeat=len(npv)):
+        chosen = np.flatnonzero(mask)
+        if len(set(groups[chosen])) < len(chosen):
+            continue
+        if np.all(capex[chosen].sum(axis=0) <= budget + 1e-9):
+            best = max(best, npv[chosen].sum())
+    return best
+
+
+def random_instance(rng):
+    n, years = int(rng.integers(1, 12)), int(rng.integers(1, 5))
+    capex = rng.uniform(0, 50, (n, years)) * (rng.random((n, years)) < 0.7)
+    npv = rng.normal(20, 30, n)
+    budget = rng.uniform(20, 120, years)
+    if rng.random() < 0.3:
+        budget[0] = np.inf
+    groups = rng.integers(0, max(1, n // 2), n) if rng.random() < 0.5 else None
+    return npv, capex, budget, groups
+
+
+def test_matches_brute_force():
+    rng = np.random.default_rng(1)
+    for _ in range(150):
+        npv, capex, budget, groups = random_instance(rng)
+        result = select_portfolio(npv, capex, budget, groups)
+        expected = brute_force(npv, capex, budget, np.arange(len(npv)) if groups is None else groups)
+
+        assert result["optimal"] and result["gap"] == 0.0
+        assert np.isclose(result["npv"], expected)
+        assert np.all(result["capex_used"] <= budget + 1e-6)
+        if groups is not None:
+            assert len(set(groups[result["selected"]])) == len(result["selected"])
+
+
+def test_node_limit_reports_gap():
+    # A search stopped early still returns a feasible portfolio and a valid upper bound
+    rng = np.random.default_rng(2)
+    capex = rng.uniform(0, 30, (14, 6)) * (rng.random((14, 6)) < 0.5)
+    npv = rng.normal(30, 20, 14)
+    budget = np.full(6, 40.0)
+    expected = brute_force(npv, capex, budget, np.arange(14))
+
+    result = select_portfolio(npv, capex, budget, node_limit=1)
+    assert not result["optimal"] and result["gap"] > 0
+    assert np.all(result["capex_used"] <= budget + 1e-6)
+    assert result["npv"] <= expected + 1e-9 <= result["upper_bound"] + 2e-9
+    assert np.isclose(result["gap"], result["upper_bound"] - result["npv"])
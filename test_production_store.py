@@ -0,0 +1,49 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from production_store import list_runs, load_all_runs, load_run, save_production_store  # noqa: E402
+
+
+def production_frames():
+    # Runs of different lengths, not in name order
+    frames = {}
+    for i, run in enumerate(["RUN_B", "RUN_A", "RUN_C_2029"]):
+        years = list(range(2024, 2030 + i))
+        frames[run] = pd.DataFrame({
+            "Year": years,
+            "Oil": [1e6 * (i + 1) + k for k in range(len(years))],
+            "Condensate": [0.0] * len(years),
+            "Gas": [2.5e6 + 10 * k for k in range(len(years))],
+        })
+    return frames
+
+
+def test_round_trip(tmp_path):
+    frames = production_frames()
+    store = save_production_store(frames, tmp_path / "production.parquet")
+
+    assert list_runs(store) == sorted(frames)
+    for run, df in frames.items():
+        pd.testing.assert_frame_equal(load_run(store, run), df, check_dtype=False)
+    loaded = load_all_runs(store)
+    assert sorted(loaded) == sorted(frames)
+    for run, df in frames.items():
+        pd.testing.assert_frame_equal(loaded[run], df, check_dtype=False)
+
+
+def test_store_without_run_index(tmp_path):
+    # Stores written before the run list was kept in the metadata are read with a Run filter
+    frames = production_frames()
+    store = tmp_path / "plain.parquet"
+    pd.concat([df.assign(Run=run) for run, df in frames.items()], ignore_index=True).to_parquet(store, index=False)
+
+    assert list_runs(store) == sorted(frames)
+    pd.testing.assert_frame_equal(load_run(store, "RUN_A"), frames["RUN_A"], check_dtype=False)
+
+
+def test_unknown_run(tmp_path):
+    store = save_production_store(production_frames(), tmp_path / "production.parquet")
+    with pytest.raises(KeyError):
+        load_run(store, "RUN_Z")
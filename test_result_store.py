@@ -0,0 +1,66 @@
+import numpy as np
+
+from eco_engine import evaluate
+from result_store import STORED_INDICATORS, STORED_SERIES, TABLE_SERIES, evaluate_stored, store_stats
+
+
+def assert_matches_engine(stored, direct, series):
+    for key in STORED_INDICATORS + tuple(series):
+        assert np.allclose(stored[key], direct[key], equal_nan=True), key
+
+
+def test_round_trip(tmp_path, make_schedule):
+    path = str(tmp_path / "results.sqlite")
+    schedule = make_schedule()
+    params = {"oil_price": np.array([50.0, 60.0, 70.0]), "discount_rate": 0.1}
+    direct = evaluate(schedule, params, 2024, with_cash_flow_metrics=True)
+
+    first = evaluate_stored(schedule, params, 2024, path=path)
+    assert first["hits"] == 0
+    assert_matches_engine(first, direct, STORED_SERIES)
+    assert store_stats(path)["entries"] == 3
+
+    second = evaluate_stored(schedule, params, 2024, path=path)
+    assert second["hits"] == 3
+    assert_matches_engine(second, direct, STORED_SERIES)
+    assert second["irr_roots"].dtype.kind == "i"
+
+
+def test_only_new_scenarios_are_evaluated(tmp_path, make_schedule):
+    path = str(tmp_path / "results.sqlite")
+    schedule = make_schedule()
+    evaluate_stored(schedule, {"oil_price": np.array([50.0, 60.0])}, 2024, path=path)
+
+    params = {"oil_price": np.array([60.0, 65.0, 50.0])}
+    result = evaluate_stored(schedule, params, 2024, path=path)
+    assert result["hits"] == 2
+    assert_matches_engine(result, evaluate(schedule, params, 2024, with_cash_flow_metrics=True), STORED_SERIES)
+
+    # A different schedule, start year or price mode is a different scenario
+    assert evaluate_stored(make_schedule(seed=1), params, 2024, path=path)["hits"] == 0
+    assert evaluate_stored(schedule, params, 2025, path=path)["hits"] == 0
+    assert evaluate_stored(schedule, params, 2024, fixed_price=False, path=path)["hits"] == 0
+
+
+def test_table_series_round_trip(tmp_path, make_schedule):
+    # The app's cash-flow table keeps every series; they are stored under their own keys
+    path = str(tmp_path / "results.sqlite")
+    schedule = make_schedule()
+    params = {"cost_per_boe": np.array([8.0, 11.0])}
+    direct = evaluate(schedule, params, 2024, with_cash_flow_metrics=True)
+
+    evaluate_stored(schedule, params, 2024, path=path)
+    first = evaluate_stored(schedule, params, 2024, path=path, series=TABLE_SERIES)
+    assert first["hits"] == 0
+    second = evaluate_stored(schedule, params, 2024, path=path, series=TABLE_SERIES)
+    assert second["hits"] == 2
+    assert_matches_engine(second, direct, TABLE_SERIES)
+
+
+def test_unreadable_store_falls_back(tmp_path, make_schedule):
+    schedule = make_schedule()
+    path = tmp_path / "not_a_database.sqlite"
+    path.write_bytes(b"not a database" * 100)
+    result = evaluate_stored(schedule, {"oil_price": 60.0}, 2024, path=str(path))
+    assert result["hits"] == 0
+    assert np.allclose(result["npv"], evaluate(schedule, {"oil_price": 60.0}, 2024)["npv"])
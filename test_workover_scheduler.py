@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from script_loader import WORKOVER_EXTRACTION, load_script
+from workover_scheduler import cap_with_carry_forward, parameter_grid, raw_workovers, sweep_workover_schedules
+
+extraction = load_script(WORKOVER_EXTRACTION)
+
+
+def carry_forward_loop(raw, max_workovers):
+    # The row-by-row loop enforce_max_workover used to run
+    excess = 0
+    adjusted = []
+    for workovers in raw:
+        workovers = workovers + excess
+        if workovers > max_workovers:
+            excess = workovers - max_workovers
+            workovers = max_workovers
+        else:
+            excess = 0
+        adjusted.append(workovers)
+    return np.array(adjusted)
+
+
+def connection_table(rng, rows=600):
+    return pd.DataFrame({
+        "Year": rng.integers(2024, 2040, rows),
+        "Well": rng.integers(1, 60, rows),
+        "Closed_Connections": rng.integers(0, 6, rows),
+        "Opened_Connections": rng.integers(0, 4, rows),
+    })
+
+
+def test_carry_forward_matches_loop():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        raw = rng.integers(0, 12, rng.integers(1, 30))
+        raw[rng.random(len(raw)) < 0.3] = 0
+        cap = int(rng.integers(1, 8))
+        workover_years = raw > 0
+
+        # Default: empty years are skipped, as enforce_max_workover's table has only workover years
+        adjusted, _ = cap_with_carry_forward(raw, cap)
+        assert np.array_equal(adjusted[workover_years], carry_forward_loop(raw[workover_years], cap))
+        assert not adjusted[~workover_years].any()
+
+        adjusted, _ = cap_with_carry_forward(raw, cap, carry_into_empty_years=True)
+        assert np.array_equal(adjusted, carry_forward_loop(raw, cap))
+
+
+def test_carry_forward_grid_matches_rows():
+    # A (grid, years) array with one capacity per grid point is the same as each row on its own
+    rng = np.random.default_rng(1)
+    raw = rng.integers(0, 10, (8, 20))
+    caps = rng.integers(1, 6, 8)
+    adjusted, backlog = cap_with_carry_forward(raw, caps[:, None])
+    for row, cap in enumerate(caps):
+        expected, expected_backlog = cap_with_carry_forward(raw[row], cap)
+        assert np.array_equal(adjusted[row], expected)
+        assert np.array_equal(backlog[row], expected_backlog)
+
+
+def test_enforce_max_workover_matches_loop():
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame({"Year": rng.permutation(np.arange(2024, 2044)),
+                       "Workover (Perf or Shut-off)": rng.integers(1, 15, 20)})
+    expected = carry_forward_loop(df.sort_values("Year")["Workover (Perf or Shut-off)"].to_numpy(), 6)
+    adjusted = extraction.enforce_max_workover(df.copy(), 6)
+    assert np.array_equal(adjusted["Year"], np.arange(2024, 2044))
+    assert np.array_equal(adjusted["Workover (Perf or Shut-off)"], expected)
+
+
+def test_sweep_matches_single_schedules():
+    # Every grid point of the sweep equals compute_workovers_per_year + enforce_max_workover
+    df_connections = connection_table(np.random.default_rng(3))
+    grid = parameter_grid([2, 3, 5], [1, 2], [2027, 2031], [3, 6])
+    years, raw = raw_workovers(df_connections, grid)
+    sweep = sweep_workover_schedules(df_connections, grid)
+
+    for i, settings in grid.iterrows():
+        workovers = extraction.compute_workovers_per_year(
+            df_connections.copy(), settings["Threshold Before"], settings["Threshold After"], settings["Cutover Year"])
+        counts = workovers.set_index("Year")["Workover (Perf or Shut-off)"].reindex(years, fill_value=0)
+        assert np.array_equal(raw[i], counts.to_numpy())
+
+        adjusted = extraction.enforce_max_workover(workovers, settings["Max Workovers"])
+        scheduled = pd.Series(sweep["adjusted"][i], index=years)
+        assert np.array_equal(scheduled[adjusted["Year"]].to_numpy(), adjusted["Workover (Perf or Shut-off)"])
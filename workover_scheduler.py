@@ -0,0 +1,126 @@
+import numpy as np
+import pandas as pd
+
+from eco_engine import DEFAULT_PARAMS
+
+# Vectorized workover scheduling for 2_Multiple_Workover_Extraction.py.
+# A well needs a workover in a year when its opened + closed connections exceed a threshold
+# (one threshold before the cutover year, another from it on). Workovers above the rig
+# capacity are carried forward to the next year that has workovers, as enforce_max_workover
+# does. Every function works on a whole grid of settings at once: arrays are (grid, years).
+# Workover CAPEX per grid point uses the economics engine's cost and escalation formulas; the
+# scheduled workovers are all perf/shut-off jobs (the extractor schedules no pump replacements).
+
+WORKOVER_COLUMN = "Workover (Perf or Shut-off)"
+
+
+def cap_with_carry_forward(raw, max_per_year, carry_into_empty_years=False):
+    # raw: (..., years) workovers per year; max_per_year broadcasts against raw[..., :1].
+    # Backlog follows the Lindley recursion B_t = max(0, B_{t-1} + raw_t - cap), which is
+    # S_t - min(0, min_{j<=t} S_j) with S the running sum of (raw - cap): no loop over years.
+    # carry_into_empty_years=False (default) skips years with no workovers: the backlog waits
+    # for the next year that has workovers, as enforce_max_workover does on its table of
+    # workover years. True lets empty years take backlog up to the cap. The last year's backlog
+    # is dropped.
+    raw = np.asarray(raw, dtype=float)
+    cap = np.asarray(max_per_year, dtype=float)
+    step = raw - cap
+    if not carry_into_empty_years:
+        step = np.where(raw > 0, step, 0.0)
+
+    running = np.cumsum(step, axis=-1)
+    backlog = running - np.minimum(np.minimum.accumulate(running, axis=-1), 0.0)
+    previous = np.concatenate([np.zeros_like(backlog[..., :1]), backlog[..., :-1]], axis=-1)
+    adjusted = raw + previous - backlog
+    if not carry_into_empty_years:
+        adjusted = np.where(raw > 0, adjusted, 0.0)
+    return adjusted, backlog
+
+
+def parameter_grid(thresholds_before=(3,), thresholds_after=(2,), cutover_years=(2027,), max_workovers=(6,)):
+    # Cartesian product of the settings, one row per grid point
+    mesh = np.meshgrid(thresholds_before, thresholds_after, cutover_years, max_workovers, indexing="ij")
+    return pd.DataFrame({
+        "Threshold Before": mesh[0].ravel(),
+        "Threshold After": mesh[1].ravel(),
+        "Cutover Year": mesh[2].ravel(),
+        "Max Workovers": mesh[3].ravel(),
+    })
+
+
+def raw_workovers(df_connections, grid):
+    # Count qualifying wells per year for every grid point -> (years, (grid, years) counts).
+    # Rows are first tallied by (year, total connections); a grid point's count in a year is the
+    # tally above its threshold for that year, so memory grows with years x distinct totals and
+    # grid x years, never with grid x rows.
+    total = (df_connections["Closed_Connections"] + df_connections["Opened_Connections"]).to_numpy()
+    years, year_index = np.unique(df_connections["Year"].to_numpy(), return_inverse=True)
+    totals, total_index = np.unique(total, return_inverse=True)
+    tally = np.zeros((len(years), len(totals) + 1), dtype=np.int64)
+    np.add.at(tally, (year_index, total_index), 1)
+    # above[y, k]: rows of year y whose total is totals[k] or more
+    above = np.cumsum(tally[:, ::-1], axis=1)[:, ::-1]
+
+    before = grid["Threshold Before"].to_numpy()[:, None]
+    after = grid["Threshold After"].to_numpy()[:, None]
+    cutover = grid["Cutover Year"].to_numpy()[:, None]
+    threshold = np.where(years[None, :] < cutover, before, after)
+    first_above = np.searchsorted(totals, threshold, side="right")
+    return years, above[np.arange(len(years))[None, :], first_above]
+
+
+def workover_capex(years, workovers, params=None, start_year=2023):
+    # Workover CAPEX in MM$ per (grid, years), as eco_engine's total_capex and escalated_capex
+    params = dict(DEFAULT_PARAMS, **(params or {}))
+    capex = workovers * params["workover_perf_cost"] / 1e6
+    inflation_factor = (1 + params["inflation_cost"]) ** (np.asarray(years) - start_year).astype(float)
+    return capex, capex * inflation_factor
+
+
+def sweep_workover_schedules(df_connections, grid, carry_into_empty_years=False, params=None, start_year=2023):
+    # Raw and rig-capped schedules and their workover CAPEX for every grid point in one pass;
+    # params: engine inputs for the costs (DEFAULT_PARAMS otherwise)
+    years, raw = raw_workovers(df_connections, grid)
+    cap = grid["Max Workovers"].to_numpy(dtype=float)[:, None]
+    adjusted, backlog = cap_with_carry_forward(raw, cap, carry_into_empty_years)
+    adjusted = np.rint(adjusted).astype(int)
+    capex, escalated_capex = workover_capex(years, adjusted, params, start_year)
+    return {
+        "grid": grid.reset_index(drop=True),
+        "years": years,
+        "raw": raw.astype(int),
+        "adjusted": adjusted,
+        "deferred_beyond_horizon": np.rint(backlog[:, -1]).astype(int) if len(years) else np.zeros(len(grid), int),
+        "capex": capex,
+        "escalated_capex": escalated_capex,
+    }
+
+
+def schedule_frame(sweep, index):
+    # Final Workovers per Year table of one grid point (same layout as enforce_max_workover)
+    years = sweep["years"]
+    mask = sweep["raw"][index] > 0
+    return pd.DataFrame({"Year": years[mask], WORKOVER_COLUMN: sweep["adjusted"][index][mask]})
+
+
+def sweep_summary(sweep):
+    # One row per grid point: settings, total workovers scheduled, backlog left at the end and
+    # the workover CAPEX of the schedule
+    summary = sweep["grid"].copy()
+    summary["Raw Workovers"] = sweep["raw"].sum(axis=1)
+    summary["Scheduled Workovers"] = sweep["adjusted"].sum(axis=1)
+    summary["Deferred Beyond Horizon"] = sweep["deferred_beyond_horizon"]
+    summary["Workover CAPEX MM$"] = sweep["capex"].sum(axis=1)
+    summary["Escalated Workover CAPEX MM$"] = sweep["escalated_capex"].sum(axis=1)
+    return summary
+
+
+def sweep_long_frame(sweep):
+    # Long format (grid point, Year, raw, adjusted, CAPEX) for plotting or export
+    n_grid, n_years = sweep["raw"].shape
+    long_df = sweep["grid"].loc[np.repeat(np.arange(n_grid), n_years)].reset_index(names="Grid Point")
+    long_df["Year"] = np.tile(sweep["years"], n_grid)
+    long_df["Raw Workovers"] = sweep["raw"].ravel()
+    long_df[WORKOVER_COLUMN] = sweep["adjusted"].ravel()
+    long_df["Escalated Workover CAPEX MM$"] = sweep["escalated_capex"].ravel()
+    return long_df